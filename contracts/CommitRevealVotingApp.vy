@@ -0,0 +1,235 @@
+# @version ^0.3.0
+
+# A `VotingApp` whose votes stay sealed until the voting phase ends. During the commit
+# phase a voter only stores keccak256(abi_encode(voter, proposal, salt)). After the
+# chairperson starts the reveal phase, anyone can reveal votes in batches; each run of
+# reveals for the same proposal is added to its vote count in a single write.
+
+struct Voter:
+    weight: uint256
+    voted: bool
+    vote: uint256
+    commitment: bytes32
+
+struct VoterWeight:
+    voter: address
+    weight: uint256
+
+struct Proposal:
+    name: String[100]
+    voteCount: uint256
+
+struct Reveal:
+    voter: address
+    proposal: uint256
+    salt: bytes32
+
+enum Phase:
+    COMMIT
+    REVEAL
+    CLOSED
+
+event ProposalAdded:
+    proposal: indexed(uint256)
+    name: String[100]
+
+event RightGranted:
+    voter: indexed(address)
+    weight: uint256
+
+event Committed:
+    voter: indexed(address)
+    commitment: bytes32
+
+event Voted:
+    voter: indexed(address)
+    proposal: indexed(uint256)
+    weight: uint256
+
+event PhaseChanged:
+    phase: Phase
+
+voters: public(HashMap[address, Voter])
+proposals: public(HashMap[uint256, Proposal])
+voterCount: public(uint256)
+chairperson: public(address)
+amountProposals: public(uint256)
+maxProposals: public(immutable(uint256))
+phase: public(Phase)
+# Index of the proposal with the most votes, lowest index first on ties.
+leadingProposal: uint256
+
+MAX_BATCH_SIZE: constant(uint256) = 1000
+MAX_PROPOSAL_BATCH_SIZE: constant(uint256) = 100
+MAX_REVEAL_BATCH_SIZE: constant(uint256) = 1000
+MAX_PROPOSAL_PAGE_SIZE: constant(uint256) = 100
+MAX_VOTER_PAGE_SIZE: constant(uint256) = 1000
+
+@external
+def __init__(_maxProposals: uint256):
+    assert _maxProposals > 0
+    self.chairperson = msg.sender
+    self.phase = Phase.COMMIT
+    maxProposals = _maxProposals
+
+@internal
+def _addProposal(_proposalName: String[100]):
+    assert self.amountProposals < maxProposals
+    i : uint256 = self.amountProposals
+    self.proposals[i] = Proposal({
+        name : _proposalName,
+        voteCount: 0
+    })
+    self.amountProposals += 1
+    log ProposalAdded(i, _proposalName)
+
+@external
+def addProposal(_proposalName: String[100]):
+    assert msg.sender == self.chairperson
+    assert self.phase == Phase.COMMIT
+    self._addProposal(_proposalName)
+
+@external
+def addProposalBatch(_proposalNames: DynArray[String[100], MAX_PROPOSAL_BATCH_SIZE]):
+    assert msg.sender == self.chairperson
+    assert self.phase == Phase.COMMIT
+    for name in _proposalNames:
+        self._addProposal(name)
+
+@internal
+def _grantWeight(voter: address, _weight: uint256):
+    assert not self.voters[voter].voted
+    assert self.voters[voter].weight == 0
+    self.voters[voter].weight = _weight
+    log RightGranted(voter, _weight)
+
+@external
+def giveRightToVote(voter:address,_weight:uint256):
+    assert msg.sender == self.chairperson
+    assert self.phase == Phase.COMMIT
+    self._grantWeight(voter, _weight)
+    self.voterCount += 1
+
+@external
+def giveRightToVoteBatch(_voters: DynArray[VoterWeight, MAX_BATCH_SIZE]):
+    assert msg.sender == self.chairperson
+    assert self.phase == Phase.COMMIT
+    for v in _voters:
+        self._grantWeight(v.voter, v.weight)
+    self.voterCount += len(_voters)
+
+@external
+def commitVote(commitment: bytes32):
+    # A later commitment replaces an earlier one until the reveal phase starts.
+    assert self.phase == Phase.COMMIT
+    assert self.voters[msg.sender].weight > 0
+    assert commitment != empty(bytes32)
+    self.voters[msg.sender].commitment = commitment
+    log Committed(msg.sender, commitment)
+
+@external
+def startReveal():
+    assert msg.sender == self.chairperson
+    assert self.phase == Phase.COMMIT
+    self.phase = Phase.REVEAL
+    log PhaseChanged(Phase.REVEAL)
+
+@external
+def closeReveal():
+    # Commitments that were not revealed by now are not counted.
+    assert msg.sender == self.chairperson
+    assert self.phase == Phase.REVEAL
+    self.phase = Phase.CLOSED
+    log PhaseChanged(Phase.CLOSED)
+
+@view
+@internal
+def _matchesCommitment(voter: address, proposal: uint256, salt: bytes32) -> bool:
+    commitment: bytes32 = self.voters[voter].commitment
+    if commitment == empty(bytes32) or proposal >= self.amountProposals:
+        return False
+    return keccak256(_abi_encode(voter, proposal, salt)) == commitment
+
+@internal
+def _applyReveal(voter: address, proposal: uint256) -> uint256:
+    weight: uint256 = self.voters[voter].weight
+    self.voters[voter].vote = proposal
+    self.voters[voter].voted = True
+    self.voters[voter].weight = 0
+    self.voters[voter].commitment = empty(bytes32)
+    log Voted(voter, proposal, weight)
+    return weight
+
+@internal
+def _addVotes(proposal: uint256, amount: uint256):
+    count: uint256 = self.proposals[proposal].voteCount + amount
+    self.proposals[proposal].voteCount = count
+    leader: uint256 = self.leadingProposal
+    if proposal != leader:
+        leader_count: uint256 = self.proposals[leader].voteCount
+        if count > leader_count or (count == leader_count and proposal < leader):
+            self.leadingProposal = proposal
+
+@external
+def revealVote(proposal: uint256, salt: bytes32):
+    assert self.phase == Phase.REVEAL
+    assert self._matchesCommitment(msg.sender, proposal, salt)
+    self._addVotes(proposal, self._applyReveal(msg.sender, proposal))
+
+@external
+def revealBatch(_reveals: DynArray[Reveal, MAX_REVEAL_BATCH_SIZE]) -> uint256:
+    # Anyone may submit reveals. A reveal that does not match an outstanding commitment,
+    # e.g. because its voter revealed in the meantime, is skipped rather than failing the
+    # whole batch. Sorting the batch by proposal makes every proposal a single run.
+    assert self.phase == Phase.REVEAL
+    applied: uint256 = 0
+    run_proposal: uint256 = 0
+    run_votes: uint256 = 0
+    for r in _reveals:
+        if not self._matchesCommitment(r.voter, r.proposal, r.salt):
+            continue
+        if r.proposal != run_proposal and run_votes > 0:
+            self._addVotes(run_proposal, run_votes)
+            run_votes = 0
+        run_proposal = r.proposal
+        run_votes += self._applyReveal(r.voter, r.proposal)
+        applied += 1
+    if run_votes > 0:
+        self._addVotes(run_proposal, run_votes)
+    return applied
+
+
+@view
+@internal
+def _winningProposal() -> uint256:
+    return self.leadingProposal
+
+@view
+@external
+def winningProposal() -> uint256:
+    return self._winningProposal()
+
+@view
+@external
+def winnerName() -> String[100]:
+    return self.proposals[self._winningProposal()].name
+
+
+@view
+@external
+def getProposals(start: uint256, count: uint256) -> DynArray[Proposal, MAX_PROPOSAL_PAGE_SIZE]:
+    assert count <= MAX_PROPOSAL_PAGE_SIZE
+    page: DynArray[Proposal, MAX_PROPOSAL_PAGE_SIZE] = []
+    for i in range(MAX_PROPOSAL_PAGE_SIZE):
+        if i >= count or start + i >= self.amountProposals:
+            break
+        page.append(self.proposals[start + i])
+    return page
+
+@view
+@external
+def getVoters(addrs: DynArray[address, MAX_VOTER_PAGE_SIZE]) -> DynArray[Voter, MAX_VOTER_PAGE_SIZE]:
+    page: DynArray[Voter, MAX_VOTER_PAGE_SIZE] = []
+    for addr in addrs:
+        page.append(self.voters[addr])
+    return page
@@ -6,17 +6,108 @@ struct Voter:
     delegate: address
     vote: uint256
 
+struct VoterWeight:
+    voter: address
+    weight: uint256
+
 struct Proposal:
     name: String[100]
     voteCount: uint256
 
+struct Checkpoint:
+    fromBlock: uint256
+    votes: uint256
+
+# A vote or delegation signed off-chain as EIP-712 typed data, submitted by a relayer.
+struct Intent:
+    voter: address
+    isDelegation: bool
+    proposal: uint256
+    to: address
+    nonce: uint256
+    v: uint8
+    r: bytes32
+    s: bytes32
+
+event ProposalAdded:
+    proposal: indexed(uint256)
+    name: String[100]
+
+event RightGranted:
+    voter: indexed(address)
+    weight: uint256
+
+event Voted:
+    voter: indexed(address)
+    proposal: indexed(uint256)
+    weight: uint256
+
+# Emitted once, when `finalize` has hashed every proposal.
+event Finalized:
+    commitment: bytes32
+    proposals: uint256
+    winningProposal: uint256
+
+event Delegated:
+    voter: indexed(address)
+    to: indexed(address)
+    delegate: address
+    weight: uint256
+
 voters: public(HashMap[address, Voter])
 proposals: public(HashMap[uint256, Proposal])
 voterCount: public(uint256)
 chairperson: public(address)
 amountProposals: public(uint256)
+# Storage rather than immutable, so each minimal proxy clone of ElectionFactory has its own cap.
+maxProposals: public(uint256)
+voterRoot: public(bytes32)
+# Index of the proposal with the most votes, lowest index first on ties.
+leadingProposal: uint256
+# Set by the first `finalize` call. Afterwards no proposals, voting rights or votes are accepted.
+closed: public(bool)
+# Hash chain over the name hash and vote count of every proposal in index order, see
+# `finalize`. Zero until the election is finalized.
+tallyCommitment: public(bytes32)
+# Proposals hashed into `partialCommitment` by earlier `finalize` calls.
+hashedProposals: public(uint256)
+partialCommitment: bytes32
+# Farthest known address down each delegate's chain, written by path compression.
+delegationShortcut: HashMap[address, address]
+# Nonce a signed intent must carry. A voter acts only once, so an applied intent is already
+# spent; the nonce only moves when the voter cancels the intents signed so far.
+nonces: public(HashMap[address, uint256])
+# Voting power history of each address, see `_writeCheckpoint`. Entry i packs the block it
+# starts at above the votes; entry 0 also holds the number of entries in its top bits, so the
+# first checkpoint of a voter costs a single storage write.
+votesCheckpoints: HashMap[address, HashMap[uint256, uint256]]
+# Addresses given weight by the chairperson or by a claim, so a granted voter cannot also claim.
+# Weight delegated to a voter does not register them.
+registered: HashMap[address, bool]
 
-MAX_NUM_PROPOSALS: constant(uint256) = 3
+MAX_BATCH_SIZE: constant(uint256) = 1000
+MAX_PROPOSAL_BATCH_SIZE: constant(uint256) = 100
+MAX_PROOF_DEPTH: constant(uint256) = 32
+MAX_PROPOSAL_PAGE_SIZE: constant(uint256) = 100
+MAX_VOTER_PAGE_SIZE: constant(uint256) = 1000
+MAX_FINALIZE_BATCH_SIZE: constant(uint256) = 1000
+MAX_DELEGATION_HOPS: constant(uint256) = 32
+# Walks through at most this many delegates are cheaper to repeat than to compress.
+MIN_COMPRESSED_HOPS: constant(uint256) = 4
+MAX_RELAY_BATCH_SIZE: constant(uint256) = 500
+EIP712_DOMAIN_TYPEHASH: constant(bytes32) = keccak256("EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)")
+EIP712_NAME: constant(String[17]) = "DelegateVotingApp"
+EIP712_VERSION: constant(String[1]) = "1"
+EIP712_NAME_HASH: constant(bytes32) = keccak256(EIP712_NAME)
+EIP712_VERSION_HASH: constant(bytes32) = keccak256(EIP712_VERSION)
+VOTE_TYPEHASH: constant(bytes32) = keccak256("Vote(address voter,uint256 proposal,uint256 nonce)")
+DELEGATE_TYPEHASH: constant(bytes32) = keccak256("Delegate(address voter,address to,uint256 nonce)")
+MAX_VOTES: constant(uint256) = 2**160 - 1
+BLOCK_MASK: constant(uint256) = 2**64 - 1
+CHECKPOINT_BLOCK_SHIFT: constant(uint256) = 160
+CHECKPOINT_COUNT_SHIFT: constant(uint256) = 224
+# Binary search steps for up to 2**32 checkpoints.
+MAX_CHECKPOINT_SEARCH_STEPS: constant(uint256) = 33
 
 
 @view
@@ -39,80 +130,370 @@ def _directlyVoted(addr: address) -> bool:
 def directlyVoted(addr: address) -> bool:
     return self._directlyVoted(addr)
 
+@view
+@internal
+def _checkpointCount(account: address) -> uint256:
+    return self.votesCheckpoints[account][0] >> CHECKPOINT_COUNT_SHIFT
+
+@view
+@internal
+def _checkpointBlock(account: address, index: uint256) -> uint256:
+    return (self.votesCheckpoints[account][index] >> CHECKPOINT_BLOCK_SHIFT) & BLOCK_MASK
+
+@view
+@internal
+def _getVotes(account: address) -> uint256:
+    count: uint256 = self._checkpointCount(account)
+    if count == 0:
+        return 0
+    return self.votesCheckpoints[account][count - 1] & MAX_VOTES
+
+@internal
+def _writeCheckpoint(account: address, votes: uint256):
+    # The votes of an address are the weight it was granted or claimed plus the weight
+    # delegated to it, whether still unspent or already cast. Delegating moves them all to the
+    # final delegate. Only the last value within a block is kept.
+    assert votes <= MAX_VOTES
+    checkpoint: uint256 = (block.number << CHECKPOINT_BLOCK_SHIFT) | votes
+    head: uint256 = self.votesCheckpoints[account][0]
+    count: uint256 = head >> CHECKPOINT_COUNT_SHIFT
+    if count == 0:
+        self.votesCheckpoints[account][0] = (1 << CHECKPOINT_COUNT_SHIFT) | checkpoint
+        return
+    if self._checkpointBlock(account, count - 1) != block.number:
+        self.votesCheckpoints[account][count] = checkpoint
+        self.votesCheckpoints[account][0] = head + (1 << CHECKPOINT_COUNT_SHIFT)
+    elif count == 1:
+        self.votesCheckpoints[account][0] = (1 << CHECKPOINT_COUNT_SHIFT) | checkpoint
+    else:
+        self.votesCheckpoints[account][count - 1] = checkpoint
+
+@view
+@internal
+def _checkpointsUpTo(account: address, blockNumber: uint256) -> uint256:
+    # Binary search for the number of checkpoints that start at or before `blockNumber`.
+    low: uint256 = 0
+    high: uint256 = self._checkpointCount(account)
+    for i in range(MAX_CHECKPOINT_SEARCH_STEPS):
+        if low >= high:
+            break
+        middle: uint256 = (low + high) >> 1
+        if self._checkpointBlock(account, middle) > blockNumber:
+            high = middle
+        else:
+            low = middle + 1
+    return high
+
+@view
 @external
-def __init__():
-    self.chairperson = msg.sender
+def numCheckpoints(account: address) -> uint256:
+    return self._checkpointCount(account)
 
+@view
 @external
-def addProposal(_proposalName: String[100]):
-    assert msg.sender == self.chairperson
+def checkpoints(account: address, index: uint256) -> Checkpoint:
+    assert index < self._checkpointCount(account)
+    return Checkpoint({
+        fromBlock: self._checkpointBlock(account, index),
+        votes: self.votesCheckpoints[account][index] & MAX_VOTES
+    })
+
+@view
+@external
+def getVotes(account: address) -> uint256:
+    return self._getVotes(account)
+
+@view
+@external
+def getPastVotes(account: address, blockNumber: uint256) -> uint256:
+    assert blockNumber < block.number
+    count: uint256 = self._checkpointsUpTo(account, blockNumber)
+    if count == 0:
+        return 0
+    return self.votesCheckpoints[account][count - 1] & MAX_VOTES
+
+@view
+@external
+def getPastDelegate(account: address, blockNumber: uint256) -> address:
+    assert blockNumber < block.number
+    to: address = self.voters[account].delegate
+    if to == empty(address):
+        return empty(address)
+    # Delegating zeroes the delegator's votes and nothing changes them afterwards, so its
+    # last checkpoint marks the block of the delegation.
+    if self._checkpointBlock(account, self._checkpointCount(account) - 1) > blockNumber:
+        return empty(address)
+    return to
+
+@internal
+def _initialize(_chairperson: address, _maxProposals: uint256):
+    assert _maxProposals > 0
+    self.chairperson = _chairperson
+    self.maxProposals = _maxProposals
+
+@external
+def __init__(_maxProposals: uint256):
+    self._initialize(msg.sender, _maxProposals)
+
+@external
+def initialize(_chairperson: address, _maxProposals: uint256):
+    # Sets up a minimal proxy clone created by ElectionFactory, whose storage starts empty.
+    # A contract that already has a chairperson cannot be initialized again.
+    assert self.chairperson == empty(address)
+    assert _chairperson != empty(address)
+    self._initialize(_chairperson, _maxProposals)
+
+@internal
+def _addProposal(_proposalName: String[100]):
+    assert self.amountProposals < self.maxProposals
     i: uint256 = self.amountProposals
     self.proposals[i] = Proposal({
         name: _proposalName,
         voteCount: 0
     })
     self.amountProposals += 1
+    log ProposalAdded(i, _proposalName)
 
 @external
-def giveRightToVote(voter: address, _weight: uint256):
+def addProposal(_proposalName: String[100]):
+    assert msg.sender == self.chairperson
+    assert not self.closed
+    self._addProposal(_proposalName)
+
+@external
+def addProposalBatch(_proposalNames: DynArray[String[100], MAX_PROPOSAL_BATCH_SIZE]):
     assert msg.sender == self.chairperson
+    assert not self.closed
+    for name in _proposalNames:
+        self._addProposal(name)
+
+@internal
+def _grantWeight(voter: address, _weight: uint256):
     assert not self.voters[voter].voted
     assert self.voters[voter].weight == 0
     self.voters[voter].weight = _weight
+    self.registered[voter] = True
+    if _weight > 0:
+        self._writeCheckpoint(voter, self._getVotes(voter) + _weight)
+    log RightGranted(voter, _weight)
+
+@external
+def giveRightToVote(voter: address, _weight: uint256):
+    assert msg.sender == self.chairperson
+    assert not self.closed
+    self._grantWeight(voter, _weight)
+    self.voterCount += 1
+
+@external
+def giveRightToVoteBatch(_voters: DynArray[VoterWeight, MAX_BATCH_SIZE]):
+    assert msg.sender == self.chairperson
+    assert not self.closed
+    for v in _voters:
+        self._grantWeight(v.voter, v.weight)
+    self.voterCount += len(_voters)
+
+@external
+def setVoterRoot(_root: bytes32):
+    assert msg.sender == self.chairperson
+    assert not self.closed
+    self.voterRoot = _root
+
+@pure
+@internal
+def _verifyProof(leaf: bytes32, proof: DynArray[bytes32, MAX_PROOF_DEPTH], root: bytes32) -> bool:
+    computed: bytes32 = leaf
+    for node in proof:
+        if convert(computed, uint256) < convert(node, uint256):
+            computed = keccak256(concat(computed, node))
+        else:
+            computed = keccak256(concat(node, computed))
+    return computed == root
+
+@internal
+def _claimWeight(voter: address, _weight: uint256, proof: DynArray[bytes32, MAX_PROOF_DEPTH]):
+    assert self.voterRoot != empty(bytes32)
+    assert not self.voters[voter].voted
+    assert not self.registered[voter]
+    leaf: bytes32 = keccak256(keccak256(_abi_encode(voter, _weight)))
+    assert self._verifyProof(leaf, proof, self.voterRoot)
+    # Added rather than set, so weight delegated to the voter before the claim is kept.
+    self.voters[voter].weight += _weight
+    self.registered[voter] = True
+    self._writeCheckpoint(voter, self._getVotes(voter) + _weight)
     self.voterCount += 1
+    log RightGranted(voter, _weight)
+
+@internal
+def _addVotes(proposal: uint256, amount: uint256):
+    count: uint256 = self.proposals[proposal].voteCount + amount
+    self.proposals[proposal].voteCount = count
+    leader: uint256 = self.leadingProposal
+    if proposal != leader:
+        leader_count: uint256 = self.proposals[leader].voteCount
+        if count > leader_count or (count == leader_count and proposal < leader):
+            self.leadingProposal = proposal
+
+@view
+@internal
+def _nextHop(addr: address, follow_shortcut: bool) -> address:
+    hop: address = self.voters[addr].delegate
+    if follow_shortcut and hop != empty(address):
+        shortcut: address = self.delegationShortcut[addr]
+        if shortcut != empty(address):
+            return shortcut
+    return hop
+
+@internal
+def _resolveDelegate(origin: address, min_compressed_hops: uint256) -> address:
+    visited: DynArray[address, MAX_DELEGATION_HOPS] = []
+    target: address = self._nextHop(origin, False)
+    for i in range(MAX_DELEGATION_HOPS):
+        if target == origin:
+            break
+        # Shortcuts are only read once the walk is long enough to be compressed, so shorter
+        # walks pay no storage read on top of the delegates they pass.
+        next_hop: address = self._nextHop(target, len(visited) >= MIN_COMPRESSED_HOPS)
+        if next_hop == empty(address):
+            break
+        visited.append(target)
+        target = next_hop
+
+    if len(visited) > min_compressed_hops:
+        for i in range(MAX_DELEGATION_HOPS):
+            if i + 1 >= len(visited):
+                break
+            self.delegationShortcut[visited[i]] = target
+    return target
+
+@external
+def compressDelegation(addr: address) -> bool:
+    if not self._delegated(addr):
+        return True
+    target: address = self._resolveDelegate(addr, 0)
+    return not self._delegated(target)
 
 @internal
 def _forwardWeight(delegate_with_weight_to_forward: address):
     assert self._delegated(delegate_with_weight_to_forward)
     assert self.voters[delegate_with_weight_to_forward].weight > 0
 
-    target: address = self.voters[delegate_with_weight_to_forward].delegate
-    for i in range(4):
-        if self._delegated(target):
-            target = self.voters[target].delegate
-        else:
-            break
+    target: address = self._resolveDelegate(delegate_with_weight_to_forward, MIN_COMPRESSED_HOPS)
+    assert target != delegate_with_weight_to_forward
+    assert not self._delegated(target)
 
     weight_to_forward: uint256 = self.voters[delegate_with_weight_to_forward].weight
     self.voters[delegate_with_weight_to_forward].weight = 0
     self.voters[target].weight += weight_to_forward
+    self._writeCheckpoint(delegate_with_weight_to_forward, 0)
+    self._writeCheckpoint(target, self._getVotes(target) + weight_to_forward)
 
     if self._directlyVoted(target):
-        self.proposals[self.voters[target].vote].voteCount += weight_to_forward
+        self._addVotes(self.voters[target].vote, weight_to_forward)
         self.voters[target].weight = 0
 
+    log Delegated(
+        delegate_with_weight_to_forward,
+        self.voters[delegate_with_weight_to_forward].delegate,
+        target,
+        weight_to_forward
+    )
+
+@internal
+def _delegate(voter: address, to: address):
+    assert not self.closed
+    assert not self.voters[voter].voted
+    assert to != voter
+    assert to != empty(address)
+
+    self.voters[voter].voted = True
+    self.voters[voter].delegate = to
+
+    self._forwardWeight(voter)
+
 @external
 def delegate(to: address):
-    assert not self.voters[msg.sender].voted
-    assert to != msg.sender
-    assert to != empty(address)
+    self._delegate(msg.sender, to)
 
-    self.voters[msg.sender].voted = True
-    self.voters[msg.sender].delegate = to
+@external
+def claimAndDelegate(to: address, _weight: uint256, proof: DynArray[bytes32, MAX_PROOF_DEPTH]):
+    self._claimWeight(msg.sender, _weight, proof)
+    self._delegate(msg.sender, to)
 
-    self._forwardWeight(msg.sender)
+@internal
+def _vote(voter: address, proposal: uint256):
+    assert not self.closed
+    assert not self.voters[voter].voted
+    assert proposal < self.amountProposals
+
+    self.voters[voter].vote = proposal
+    self.voters[voter].voted = True
+
+    weight: uint256 = self.voters[voter].weight
+    self._addVotes(proposal, weight)
+    self.voters[voter].weight = 0
+    log Voted(voter, proposal, weight)
 
 @external
 def vote(proposal: uint256):
-    assert not self.voters[msg.sender].voted
-    assert proposal < self.amountProposals
+    self._vote(msg.sender, proposal)
 
-    self.voters[msg.sender].vote = proposal
-    self.voters[msg.sender].voted = True
+@external
+def claimAndVote(proposal: uint256, _weight: uint256, proof: DynArray[bytes32, MAX_PROOF_DEPTH]):
+    self._claimWeight(msg.sender, _weight, proof)
+    self._vote(msg.sender, proposal)
 
-    self.proposals[proposal].voteCount += self.voters[msg.sender].weight
-    self.voters[msg.sender].weight = 0
+@view
+@internal
+def _domainSeparator() -> bytes32:
+    # Computed on every call rather than stored as an immutable, so that each ElectionFactory
+    # clone signs with its own address.
+    return keccak256(_abi_encode(EIP712_DOMAIN_TYPEHASH, EIP712_NAME_HASH, EIP712_VERSION_HASH, chain.id, self))
+
+@view
+@external
+def domainSeparator() -> bytes32:
+    return self._domainSeparator()
+
+@view
+@external
+def eip712Domain() -> (bytes1, String[17], String[1], uint256, address, bytes32, DynArray[uint256, 1]):
+    # EIP-5267: lets signers read the domain, including the chain id the contract sees.
+    # 0x0f marks name, version, chainId and verifyingContract as used.
+    return (0x0f, EIP712_NAME, EIP712_VERSION, chain.id, self, empty(bytes32), [])
+
+@view
+@internal
+def _checkIntent(intent: Intent, domain: bytes32):
+    struct_hash: bytes32 = empty(bytes32)
+    if intent.isDelegation:
+        struct_hash = keccak256(_abi_encode(DELEGATE_TYPEHASH, intent.voter, intent.to, intent.nonce))
+    else:
+        struct_hash = keccak256(_abi_encode(VOTE_TYPEHASH, intent.voter, intent.proposal, intent.nonce))
+    digest: bytes32 = keccak256(concat(b"\x19\x01", domain, struct_hash))
+    assert intent.voter != empty(address)
+    assert ecrecover(digest, intent.v, intent.r, intent.s) == intent.voter
+    assert intent.nonce == self.nonces[intent.voter]
+
+@external
+def relayBatch(_intents: DynArray[Intent, MAX_RELAY_BATCH_SIZE]):
+    # Anyone may relay. The batch reverts as a whole if any intent is invalid, so relayers
+    # simulate it first; see voting.relayer.
+    domain: bytes32 = self._domainSeparator()
+    for intent in _intents:
+        self._checkIntent(intent, domain)
+        if intent.isDelegation:
+            self._delegate(intent.voter, intent.to)
+        else:
+            self._vote(intent.voter, intent.proposal)
+
+@external
+def cancelIntents():
+    self.nonces[msg.sender] += 1
 
 @view
 @internal
 def _winningProposal() -> uint256:
-    winning_vote_count: uint256 = 0
-    winning_proposal: uint256 = 0
-    for i in range(MAX_NUM_PROPOSALS):
-        if self.proposals[i].voteCount > winning_vote_count:
-            winning_vote_count = self.proposals[i].voteCount
-            winning_proposal = i
-    return winning_proposal
+    return self.leadingProposal
 
 @view
 @external
@@ -122,4 +503,57 @@ def winningProposal() -> uint256:
 @view
 @external
 def winnerName() -> String[100]:
-    return self.proposals[self._winningProposal()].name
\ No newline at end of file
+    return self.proposals[self._winningProposal()].name
+
+@external
+def finalize(count: uint256) -> bool:
+    # Closes the election and hashes up to `count` more proposals into the tally commitment.
+    # Returns True once every proposal is hashed, when `tallyCommitment` is set and
+    # `Finalized` is logged. Starting from zero, each proposal in index order updates the
+    # chain to keccak256(_abi_encode(chain, keccak256(name), voteCount)); see voting.attestation.
+    # Ballots too large for one transaction are finalized over several calls, and nothing can
+    # change the tally between them.
+    assert msg.sender == self.chairperson
+    assert self.tallyCommitment == empty(bytes32)
+    assert count <= MAX_FINALIZE_BATCH_SIZE
+    amount: uint256 = self.amountProposals
+    assert amount > 0
+    self.closed = True
+
+    start: uint256 = self.hashedProposals
+    commitment: bytes32 = self.partialCommitment
+    for i in range(MAX_FINALIZE_BATCH_SIZE):
+        if i >= count or start + i >= amount:
+            break
+        commitment = keccak256(_abi_encode(
+            commitment,
+            keccak256(self.proposals[start + i].name),
+            self.proposals[start + i].voteCount
+        ))
+    hashed: uint256 = min(start + count, amount)
+    self.hashedProposals = hashed
+    if hashed < amount:
+        self.partialCommitment = commitment
+        return False
+    self.tallyCommitment = commitment
+    log Finalized(commitment, amount, self._winningProposal())
+    return True
+
+@view
+@external
+def getProposals(start: uint256, count: uint256) -> DynArray[Proposal, MAX_PROPOSAL_PAGE_SIZE]:
+    assert count <= MAX_PROPOSAL_PAGE_SIZE
+    page: DynArray[Proposal, MAX_PROPOSAL_PAGE_SIZE] = []
+    for i in range(MAX_PROPOSAL_PAGE_SIZE):
+        if i >= count or start + i >= self.amountProposals:
+            break
+        page.append(self.proposals[start + i])
+    return page
+
+@view
+@external
+def getVoters(addrs: DynArray[address, MAX_VOTER_PAGE_SIZE]) -> DynArray[Voter, MAX_VOTER_PAGE_SIZE]:
+    page: DynArray[Voter, MAX_VOTER_PAGE_SIZE] = []
+    for addr in addrs:
+        page.append(self.voters[addr])
+    return page
@@ -0,0 +1,53 @@
+# @version ^0.3.0
+
+# Creates elections as EIP-1167 minimal proxies of deployed VotingApp or DelegateVotingApp
+# implementations and keeps a registry of them. A clone only stores a 45-byte forwarder
+# and delegates every call to its implementation, so an election costs a fraction of a
+# full deployment.
+
+interface Election:
+    def initialize(_chairperson: address, _maxProposals: uint256): nonpayable
+
+event ElectionCreated:
+    election: indexed(address)
+    implementation: indexed(address)
+    chairperson: indexed(address)
+    maxProposals: uint256
+
+isImplementation: public(HashMap[address, bool])
+elections: public(HashMap[uint256, address])
+electionCount: public(uint256)
+# Implementation each election was cloned from; empty for addresses not created here.
+implementationOf: public(HashMap[address, address])
+
+MAX_IMPLEMENTATIONS: constant(uint256) = 8
+MAX_ELECTION_PAGE_SIZE: constant(uint256) = 100
+
+@external
+def __init__(_implementations: DynArray[address, MAX_IMPLEMENTATIONS]):
+    for implementation in _implementations:
+        assert implementation.is_contract
+        self.isImplementation[implementation] = True
+
+@external
+def createElection(_implementation: address, _maxProposals: uint256) -> address:
+    assert self.isImplementation[_implementation]
+    election: address = create_minimal_proxy_to(_implementation)
+    Election(election).initialize(msg.sender, _maxProposals)
+    i: uint256 = self.electionCount
+    self.elections[i] = election
+    self.electionCount = i + 1
+    self.implementationOf[election] = _implementation
+    log ElectionCreated(election, _implementation, msg.sender, _maxProposals)
+    return election
+
+@view
+@external
+def getElections(start: uint256, count: uint256) -> DynArray[address, MAX_ELECTION_PAGE_SIZE]:
+    assert count <= MAX_ELECTION_PAGE_SIZE
+    page: DynArray[address, MAX_ELECTION_PAGE_SIZE] = []
+    for i in range(MAX_ELECTION_PAGE_SIZE):
+        if i >= count or start + i >= self.electionCount:
+            break
+        page.append(self.elections[start + i])
+    return page
@@ -0,0 +1,296 @@
+# @version ^0.3.0
+
+# Gas-optimized layout of DelegateVotingApp. Each voter lives in a single storage word:
+#
+#   bits   0..159  delegate
+#   bits 160..183  vote
+#   bit       184  voted
+#   bits 192..255  weight
+#
+# Proposal names are stored as keccak256 hashes; the names themselves are kept off-chain.
+
+struct Voter:
+    weight: uint256
+    voted: bool
+    delegate: address
+    vote: uint256
+
+struct VoterWeight:
+    voter: address
+    weight: uint256
+
+struct Proposal:
+    nameHash: bytes32
+    voteCount: uint256
+
+event ProposalAdded:
+    proposal: indexed(uint256)
+    name: String[100]
+
+event RightGranted:
+    voter: indexed(address)
+    weight: uint256
+
+event Voted:
+    voter: indexed(address)
+    proposal: indexed(uint256)
+    weight: uint256
+
+event Delegated:
+    voter: indexed(address)
+    to: indexed(address)
+    delegate: address
+    weight: uint256
+
+packedVoters: HashMap[address, uint256]
+proposalNameHashes: HashMap[uint256, bytes32]
+voteCounts: HashMap[uint256, uint256]
+voterCount: public(uint256)
+chairperson: public(address)
+amountProposals: public(uint256)
+maxProposals: public(immutable(uint256))
+# Index of the proposal with the most votes, lowest index first on ties.
+leadingProposal: uint256
+# Farthest known address down each delegate's chain, written by path compression.
+delegationShortcut: HashMap[address, address]
+
+MAX_BATCH_SIZE: constant(uint256) = 1000
+MAX_PROPOSAL_BATCH_SIZE: constant(uint256) = 100
+MAX_PROPOSAL_PAGE_SIZE: constant(uint256) = 100
+MAX_VOTER_PAGE_SIZE: constant(uint256) = 1000
+MAX_WEIGHT: constant(uint256) = 2**64 - 1
+MAX_PACKED_PROPOSALS: constant(uint256) = 2**24
+MAX_DELEGATION_HOPS: constant(uint256) = 32
+# Walks through at most this many delegates are cheaper to repeat than to compress.
+MIN_COMPRESSED_HOPS: constant(uint256) = 4
+
+ADDRESS_MASK: constant(uint256) = 2**160 - 1
+VOTE_MASK: constant(uint256) = 2**24 - 1
+VOTE_SHIFT: constant(uint256) = 160
+VOTED_SHIFT: constant(uint256) = 184
+WEIGHT_SHIFT: constant(uint256) = 192
+
+
+@view
+@internal
+def _load(addr: address) -> Voter:
+    packed: uint256 = self.packedVoters[addr]
+    return Voter({
+        weight: packed >> WEIGHT_SHIFT,
+        voted: (packed >> VOTED_SHIFT) & 1 == 1,
+        delegate: convert(convert(packed & ADDRESS_MASK, uint160), address),
+        vote: (packed >> VOTE_SHIFT) & VOTE_MASK
+    })
+
+@internal
+def _store(addr: address, voter: Voter):
+    assert voter.weight <= MAX_WEIGHT
+    self.packedVoters[addr] = (
+        (voter.weight << WEIGHT_SHIFT)
+        | (convert(voter.voted, uint256) << VOTED_SHIFT)
+        | (voter.vote << VOTE_SHIFT)
+        | convert(voter.delegate, uint256)
+    )
+
+@view
+@external
+def voters(addr: address) -> Voter:
+    return self._load(addr)
+
+@view
+@external
+def proposals(i: uint256) -> Proposal:
+    return Proposal({
+        nameHash: self.proposalNameHashes[i],
+        voteCount: self.voteCounts[i]
+    })
+
+@view
+@internal
+def _delegated(addr: address) -> bool:
+    return self.packedVoters[addr] & ADDRESS_MASK != 0
+
+@view
+@external
+def delegated(addr: address) -> bool:
+    return self._delegated(addr)
+
+@view
+@internal
+def _directlyVoted(addr: address) -> bool:
+    voter: Voter = self._load(addr)
+    return voter.voted and (voter.delegate == empty(address))
+
+@view
+@external
+def directlyVoted(addr: address) -> bool:
+    return self._directlyVoted(addr)
+
+@external
+def __init__(_maxProposals: uint256):
+    assert _maxProposals > 0
+    assert _maxProposals <= MAX_PACKED_PROPOSALS
+    self.chairperson = msg.sender
+    maxProposals = _maxProposals
+
+@internal
+def _addProposal(_proposalName: String[100]):
+    assert self.amountProposals < maxProposals
+    i: uint256 = self.amountProposals
+    self.proposalNameHashes[i] = keccak256(_proposalName)
+    self.amountProposals += 1
+    log ProposalAdded(i, _proposalName)
+
+@external
+def addProposal(_proposalName: String[100]):
+    assert msg.sender == self.chairperson
+    self._addProposal(_proposalName)
+
+@external
+def addProposalBatch(_proposalNames: DynArray[String[100], MAX_PROPOSAL_BATCH_SIZE]):
+    assert msg.sender == self.chairperson
+    for name in _proposalNames:
+        self._addProposal(name)
+
+@internal
+def _grantWeight(addr: address, _weight: uint256):
+    voter: Voter = self._load(addr)
+    assert not voter.voted
+    assert voter.weight == 0
+    voter.weight = _weight
+    self._store(addr, voter)
+    log RightGranted(addr, _weight)
+
+@external
+def giveRightToVote(voter: address, _weight: uint256):
+    assert msg.sender == self.chairperson
+    self._grantWeight(voter, _weight)
+    self.voterCount += 1
+
+@external
+def giveRightToVoteBatch(_voters: DynArray[VoterWeight, MAX_BATCH_SIZE]):
+    assert msg.sender == self.chairperson
+    for v in _voters:
+        self._grantWeight(v.voter, v.weight)
+    self.voterCount += len(_voters)
+
+@internal
+def _addVotes(proposal: uint256, amount: uint256):
+    count: uint256 = self.voteCounts[proposal] + amount
+    self.voteCounts[proposal] = count
+    leader: uint256 = self.leadingProposal
+    if proposal != leader:
+        leader_count: uint256 = self.voteCounts[leader]
+        if count > leader_count or (count == leader_count and proposal < leader):
+            self.leadingProposal = proposal
+
+@view
+@internal
+def _nextHop(addr: address, follow_shortcut: bool) -> address:
+    hop: address = convert(convert(self.packedVoters[addr] & ADDRESS_MASK, uint160), address)
+    if follow_shortcut and hop != empty(address):
+        shortcut: address = self.delegationShortcut[addr]
+        if shortcut != empty(address):
+            return shortcut
+    return hop
+
+@internal
+def _resolveDelegate(origin: address, min_compressed_hops: uint256) -> address:
+    visited: DynArray[address, MAX_DELEGATION_HOPS] = []
+    target: address = self._nextHop(origin, False)
+    for i in range(MAX_DELEGATION_HOPS):
+        if target == origin:
+            break
+        # Shortcuts are only read once the walk is long enough to be compressed, so shorter
+        # walks pay no storage read on top of the delegates they pass.
+        next_hop: address = self._nextHop(target, len(visited) >= MIN_COMPRESSED_HOPS)
+        if next_hop == empty(address):
+            break
+        visited.append(target)
+        target = next_hop
+
+    if len(visited) > min_compressed_hops:
+        for i in range(MAX_DELEGATION_HOPS):
+            if i + 1 >= len(visited):
+                break
+            self.delegationShortcut[visited[i]] = target
+    return target
+
+@external
+def compressDelegation(addr: address) -> bool:
+    if not self._delegated(addr):
+        return True
+    target: address = self._resolveDelegate(addr, 0)
+    return not self._delegated(target)
+
+@external
+def delegate(to: address):
+    sender: Voter = self._load(msg.sender)
+    assert not sender.voted
+    assert to != msg.sender
+    assert to != empty(address)
+    assert sender.weight > 0
+
+    weight_to_forward: uint256 = sender.weight
+    sender.voted = True
+    sender.delegate = to
+    sender.weight = 0
+    self._store(msg.sender, sender)
+
+    target: address = self._resolveDelegate(msg.sender, MIN_COMPRESSED_HOPS)
+    assert target != msg.sender
+    assert not self._delegated(target)
+
+    receiver: Voter = self._load(target)
+    if receiver.voted and receiver.delegate == empty(address):
+        self._addVotes(receiver.vote, weight_to_forward)
+    else:
+        receiver.weight += weight_to_forward
+        self._store(target, receiver)
+
+    log Delegated(msg.sender, to, target, weight_to_forward)
+
+@external
+def vote(proposal: uint256):
+    voter: Voter = self._load(msg.sender)
+    assert not voter.voted
+    assert proposal < self.amountProposals
+
+    self._addVotes(proposal, voter.weight)
+    log Voted(msg.sender, proposal, voter.weight)
+    voter.vote = proposal
+    voter.voted = True
+    voter.weight = 0
+    self._store(msg.sender, voter)
+
+@view
+@external
+def winningProposal() -> uint256:
+    return self.leadingProposal
+
+@view
+@external
+def winnerNameHash() -> bytes32:
+    return self.proposalNameHashes[self.leadingProposal]
+
+@view
+@external
+def getProposals(start: uint256, count: uint256) -> DynArray[Proposal, MAX_PROPOSAL_PAGE_SIZE]:
+    assert count <= MAX_PROPOSAL_PAGE_SIZE
+    page: DynArray[Proposal, MAX_PROPOSAL_PAGE_SIZE] = []
+    for i in range(MAX_PROPOSAL_PAGE_SIZE):
+        if i >= count or start + i >= self.amountProposals:
+            break
+        page.append(Proposal({
+            nameHash: self.proposalNameHashes[start + i],
+            voteCount: self.voteCounts[start + i]
+        }))
+    return page
+
+@view
+@external
+def getVoters(addrs: DynArray[address, MAX_VOTER_PAGE_SIZE]) -> DynArray[Voter, MAX_VOTER_PAGE_SIZE]:
+    page: DynArray[Voter, MAX_VOTER_PAGE_SIZE] = []
+    for addr in addrs:
+        page.append(self._load(addr))
+    return page
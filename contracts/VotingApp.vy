@@ -5,62 +5,190 @@ struct Voter:
     voted: bool
     vote: uint256
 
+struct VoterWeight:
+    voter: address
+    weight: uint256
+
 struct Proposal:
     name: String[100]
     voteCount: uint256
 
+event ProposalAdded:
+    proposal: indexed(uint256)
+    name: String[100]
+
+event RightGranted:
+    voter: indexed(address)
+    weight: uint256
+
+event Voted:
+    voter: indexed(address)
+    proposal: indexed(uint256)
+    weight: uint256
+
+# Emitted once, when `finalize` has hashed every proposal.
+event Finalized:
+    commitment: bytes32
+    proposals: uint256
+    winningProposal: uint256
+
 voters: public(HashMap[address, Voter])
 proposals: public(HashMap[uint256, Proposal])
 voterCount: public(uint256)
 chairperson: public(address)
 amountProposals: public(uint256)
+# Storage rather than immutable, so each minimal proxy clone of ElectionFactory has its own cap.
+maxProposals: public(uint256)
+voterRoot: public(bytes32)
+# Index of the proposal with the most votes, lowest index first on ties.
+leadingProposal: uint256
+# Set by the first `finalize` call. Afterwards no proposals, voting rights or votes are accepted.
+closed: public(bool)
+# Hash chain over the name hash and vote count of every proposal in index order, see
+# `finalize`. Zero until the election is finalized.
+tallyCommitment: public(bytes32)
+# Proposals hashed into `partialCommitment` by earlier `finalize` calls.
+hashedProposals: public(uint256)
+partialCommitment: bytes32
 
-MAX_NUM_PROPOSALS: constant(uint256) = 3
+MAX_BATCH_SIZE: constant(uint256) = 1000
+MAX_PROPOSAL_BATCH_SIZE: constant(uint256) = 100
+MAX_PROOF_DEPTH: constant(uint256) = 32
+MAX_PROPOSAL_PAGE_SIZE: constant(uint256) = 100
+MAX_VOTER_PAGE_SIZE: constant(uint256) = 1000
+MAX_FINALIZE_BATCH_SIZE: constant(uint256) = 1000
+
+@internal
+def _initialize(_chairperson: address, _maxProposals: uint256):
+    assert _maxProposals > 0
+    self.chairperson = _chairperson
+    self.maxProposals = _maxProposals
 
 @external
-def __init__():
-    self.chairperson = msg.sender
+def __init__(_maxProposals: uint256):
+    self._initialize(msg.sender, _maxProposals)
 
 @external
-def addProposal(_proposalName:String[100]):
-    assert msg.sender == self.chairperson
+def initialize(_chairperson: address, _maxProposals: uint256):
+    # Sets up a minimal proxy clone created by ElectionFactory, whose storage starts empty.
+    # A contract that already has a chairperson cannot be initialized again.
+    assert self.chairperson == empty(address)
+    assert _chairperson != empty(address)
+    self._initialize(_chairperson, _maxProposals)
+
+@internal
+def _addProposal(_proposalName: String[100]):
+    assert self.amountProposals < self.maxProposals
     i : uint256 = self.amountProposals
     self.proposals[i] = Proposal({
         name : _proposalName,
         voteCount: 0
     })
     self.amountProposals += 1
+    log ProposalAdded(i, _proposalName)
 
 @external
-def giveRightToVote(voter:address,_weight:uint256):
+def addProposal(_proposalName: String[100]):
+    assert msg.sender == self.chairperson
+    assert not self.closed
+    self._addProposal(_proposalName)
+
+@external
+def addProposalBatch(_proposalNames: DynArray[String[100], MAX_PROPOSAL_BATCH_SIZE]):
     assert msg.sender == self.chairperson
+    assert not self.closed
+    for name in _proposalNames:
+        self._addProposal(name)
+
+@internal
+def _grantWeight(voter: address, _weight: uint256):
     assert not self.voters[voter].voted
     assert self.voters[voter].weight == 0
     self.voters[voter].weight = _weight
+    log RightGranted(voter, _weight)
+
+@external
+def giveRightToVote(voter:address,_weight:uint256):
+    assert msg.sender == self.chairperson
+    assert not self.closed
+    self._grantWeight(voter, _weight)
     self.voterCount += 1
 
 @external
-def vote(proposal: uint256):
-    assert not self.voters[msg.sender].voted
+def giveRightToVoteBatch(_voters: DynArray[VoterWeight, MAX_BATCH_SIZE]):
+    assert msg.sender == self.chairperson
+    assert not self.closed
+    for v in _voters:
+        self._grantWeight(v.voter, v.weight)
+    self.voterCount += len(_voters)
+
+@external
+def setVoterRoot(_root: bytes32):
+    assert msg.sender == self.chairperson
+    assert not self.closed
+    self.voterRoot = _root
+
+@pure
+@internal
+def _verifyProof(leaf: bytes32, proof: DynArray[bytes32, MAX_PROOF_DEPTH], root: bytes32) -> bool:
+    computed: bytes32 = leaf
+    for node in proof:
+        if convert(computed, uint256) < convert(node, uint256):
+            computed = keccak256(concat(computed, node))
+        else:
+            computed = keccak256(concat(node, computed))
+    return computed == root
+
+@internal
+def _claimWeight(voter: address, _weight: uint256, proof: DynArray[bytes32, MAX_PROOF_DEPTH]):
+    assert self.voterRoot != empty(bytes32)
+    assert not self.voters[voter].voted
+    # A claim is always followed by the voter's vote, so any weight here was granted by the chairperson.
+    assert self.voters[voter].weight == 0
+    leaf: bytes32 = keccak256(keccak256(_abi_encode(voter, _weight)))
+    assert self._verifyProof(leaf, proof, self.voterRoot)
+    self.voters[voter].weight = _weight
+    self.voterCount += 1
+    log RightGranted(voter, _weight)
+
+@internal
+def _addVotes(proposal: uint256, amount: uint256):
+    count: uint256 = self.proposals[proposal].voteCount + amount
+    self.proposals[proposal].voteCount = count
+    leader: uint256 = self.leadingProposal
+    if proposal != leader:
+        leader_count: uint256 = self.proposals[leader].voteCount
+        if count > leader_count or (count == leader_count and proposal < leader):
+            self.leadingProposal = proposal
+
+@internal
+def _vote(voter: address, proposal: uint256):
+    assert not self.closed
+    assert not self.voters[voter].voted
     assert proposal < self.amountProposals
 
-    self.voters[msg.sender].vote = proposal
-    self.voters[msg.sender].voted = True
+    self.voters[voter].vote = proposal
+    self.voters[voter].voted = True
     
-    self.proposals[proposal].voteCount += self.voters[msg.sender].weight
-    self.voters[msg.sender].weight = 0
+    weight: uint256 = self.voters[voter].weight
+    self._addVotes(proposal, weight)
+    self.voters[voter].weight = 0
+    log Voted(voter, proposal, weight)
+
+@external
+def vote(proposal: uint256):
+    self._vote(msg.sender, proposal)
+
+@external
+def claimAndVote(proposal: uint256, _weight: uint256, proof: DynArray[bytes32, MAX_PROOF_DEPTH]):
+    self._claimWeight(msg.sender, _weight, proof)
+    self._vote(msg.sender, proposal)
 
 
 @view
 @internal
 def _winningProposal() -> uint256:
-    winning_vote_count: uint256 = 0
-    winning_proposal: uint256 = 0
-    for i in range(MAX_NUM_PROPOSALS):
-        if self.proposals[i].voteCount > winning_vote_count:
-            winning_vote_count = self.proposals[i].voteCount
-            winning_proposal = i
-    return winning_proposal
+    return self.leadingProposal
 
 @view
 @external
@@ -73,3 +201,55 @@ def winnerName() -> String[100]:
     return self.proposals[self._winningProposal()].name
     
 
+@external
+def finalize(count: uint256) -> bool:
+    # Closes the election and hashes up to `count` more proposals into the tally commitment.
+    # Returns True once every proposal is hashed, when `tallyCommitment` is set and
+    # `Finalized` is logged. Starting from zero, each proposal in index order updates the
+    # chain to keccak256(_abi_encode(chain, keccak256(name), voteCount)); see voting.attestation.
+    # Ballots too large for one transaction are finalized over several calls, and nothing can
+    # change the tally between them.
+    assert msg.sender == self.chairperson
+    assert self.tallyCommitment == empty(bytes32)
+    assert count <= MAX_FINALIZE_BATCH_SIZE
+    amount: uint256 = self.amountProposals
+    assert amount > 0
+    self.closed = True
+
+    start: uint256 = self.hashedProposals
+    commitment: bytes32 = self.partialCommitment
+    for i in range(MAX_FINALIZE_BATCH_SIZE):
+        if i >= count or start + i >= amount:
+            break
+        commitment = keccak256(_abi_encode(
+            commitment,
+            keccak256(self.proposals[start + i].name),
+            self.proposals[start + i].voteCount
+        ))
+    hashed: uint256 = min(start + count, amount)
+    self.hashedProposals = hashed
+    if hashed < amount:
+        self.partialCommitment = commitment
+        return False
+    self.tallyCommitment = commitment
+    log Finalized(commitment, amount, self._winningProposal())
+    return True
+
+@view
+@external
+def getProposals(start: uint256, count: uint256) -> DynArray[Proposal, MAX_PROPOSAL_PAGE_SIZE]:
+    assert count <= MAX_PROPOSAL_PAGE_SIZE
+    page: DynArray[Proposal, MAX_PROPOSAL_PAGE_SIZE] = []
+    for i in range(MAX_PROPOSAL_PAGE_SIZE):
+        if i >= count or start + i >= self.amountProposals:
+            break
+        page.append(self.proposals[start + i])
+    return page
+
+@view
+@external
+def getVoters(addrs: DynArray[address, MAX_VOTER_PAGE_SIZE]) -> DynArray[Voter, MAX_VOTER_PAGE_SIZE]:
+    page: DynArray[Voter, MAX_VOTER_PAGE_SIZE] = []
+    for addr in addrs:
+        page.append(self.voters[addr])
+    return page
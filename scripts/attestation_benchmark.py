@@ -0,0 +1,64 @@
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import click
+from ape import project
+from ape.cli import ConnectedProviderCommand, account_option
+
+from voting.attestation import fetch_tally, finalize_election, read_tally, tally_commitment, verify_tally, write_tally
+
+
+def _timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+
+@click.command(cls=ConnectedProviderCommand)
+@account_option()
+@click.option("--proposals", "proposal_count", type=int, default=1000, show_default=True, help="Proposals of the election finalized on chain.")
+@click.option(
+    "--ballot-sizes",
+    default="10000,100000,1000000",
+    show_default=True,
+    help="Comma-separated proposal counts of the synthetic tally files hashed off-chain.",
+)
+@click.option("--seed", type=int, default=0, show_default=True, help="Seed of the synthetic vote counts.")
+def cli(account, proposal_count, ballot_sizes, seed):
+    """
+    Finalizes a DelegateVotingApp and compares checking its tally through the per-proposal
+    getter, through `fetch_tally`, and against the commitment with `verify_tally`. Then times
+    `verify_tally`'s hashing of synthetic tally files too large to finalize on the local chain.
+    """
+    contract = account.deploy(project.DelegateVotingApp, proposal_count)
+    names = [f"proposal {i}" for i in range(proposal_count)]
+    for start in range(0, proposal_count, 100):
+        contract.addProposalBatch(names[start : start + 100], sender=account)
+    receipts = list(finalize_election(contract, account))
+    finalize_gas = sum(receipt.gas_used for receipt in receipts)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "tally.csv"
+        write_tally(path, fetch_tally(contract))
+        per_getter, per_getter_seconds = _timed(
+            lambda: [(p.name, p.voteCount) for p in (contract.proposals(i) for i in range(contract.amountProposals()))]
+        )
+        paged, paged_seconds = _timed(lambda: fetch_tally(contract))
+        matches, verify_seconds = _timed(lambda: verify_tally(contract, path))
+        assert per_getter == paged == list(read_tally(path)) and matches
+
+        click.echo(f"{proposal_count} proposals finalized in {len(receipts)} transactions, {finalize_gas} gas")
+        click.echo(f"{'method':22}{'calls':>8}{'seconds':>10}")
+        click.echo(f"{'proposals(i)':22}{proposal_count + 1:>8}{per_getter_seconds:>10.2f}")
+        click.echo(f"{'fetch_tally':22}{-(-proposal_count // 100) + 2:>8}{paged_seconds:>10.2f}")
+        click.echo(f"{'verify_tally':22}{1:>8}{verify_seconds:>10.2f}")
+
+        rng = random.Random(seed)
+        click.echo(f"\n{'ballot':>10}{'file MB':>10}{'seconds':>10}{'us/proposal':>13}")
+        for size in (int(size) for size in ballot_sizes.split(",")):
+            write_tally(path, ((f"proposal {i}", rng.randrange(10**6)) for i in range(size)))
+            _, seconds = _timed(lambda: tally_commitment(read_tally(path)))
+            megabytes = path.stat().st_size / 1e6
+            click.echo(f"{size:>10}{megabytes:>10.1f}{seconds:>10.2f}{seconds / size * 1e6:>13.2f}")
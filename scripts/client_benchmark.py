@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+import click
+from ape import chain, project
+from ape.cli import ConnectedProviderCommand, account_option
+from eth_account import Account
+from eth_utils import to_checksum_address
+from web3 import HTTPProvider, Web3
+
+from voting.batching import register_voters
+from voting.client import AsyncClient
+from voting.localnode import LocalNode
+
+
+def _addresses(start, count):
+    return [to_checksum_address((start + i + 1).to_bytes(20, "big")) for i in range(count)]
+
+
+def _sync_path(url, address, abi, signer, readers, writers):
+    """
+    Reads and writes one blocking request at a time through web3's HTTP provider, as an ad-hoc script does.
+    """
+    web3 = Web3(HTTPProvider(url))
+    contract = web3.eth.contract(address=address, abi=abi)
+    started = time.perf_counter()
+    reads = [contract.functions.voters(reader).call() for reader in readers]
+    read_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for writer in writers:
+        transaction = contract.functions.giveRightToVote(writer, 1).build_transaction(
+            {"from": signer.address, "nonce": web3.eth.get_transaction_count(signer.address)}
+        )
+        tx_hash = web3.eth.send_raw_transaction(signer.sign_transaction(transaction).rawTransaction)
+        web3.eth.wait_for_transaction_receipt(tx_hash)
+    return reads, read_seconds, time.perf_counter() - started
+
+
+async def _async_path(url, address, abi, signer, readers, writers, max_connections, max_batch_size):
+    """
+    Reads and writes concurrently through `voting.client.AsyncClient`.
+    """
+    async with AsyncClient(url, max_connections=max_connections, max_batch_size=max_batch_size) as client:
+        contract = client.contract(address, abi)
+        started = time.perf_counter()
+        reads = await asyncio.gather(*(contract.voters(reader) for reader in readers))
+        read_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        await asyncio.gather(*(contract.giveRightToVote(writer, 1, sender=signer) for writer in writers))
+        return reads, read_seconds, time.perf_counter() - started, client.rpc.http_requests
+
+
+@click.command(cls=ConnectedProviderCommand)
+@account_option()
+@click.option("--reads", "read_count", type=int, default=1000, show_default=True, help="Voters read per path.")
+@click.option("--writes", "write_count", type=int, default=100, show_default=True, help="Voters registered per path.")
+@click.option("--latency", type=float, default=0.002, show_default=True, help="Seconds the stand-in node delays each HTTP request.")
+@click.option("--connections", type=int, default=16, show_default=True, help="HTTP connections of the async client.")
+@click.option("--batch-size", type=int, default=100, show_default=True, help="Calls per JSON-RPC batch of the async client.")
+def cli(account, read_count, write_count, latency, connections, batch_size):
+    """
+    Serves the local test chain through a `LocalNode` and compares the throughput of reading
+    voters and registering voters one blocking RPC at a time with `voting.client.AsyncClient`.
+    """
+    contract = account.deploy(project.DelegateVotingApp, 1)
+    readers = _addresses(0, read_count)
+    for _ in register_voters(contract, ((a, 1) for a in readers), account, batch_size=200):
+        pass
+    abi = [entry.model_dump(mode="json", by_alias=True, exclude_none=True) for entry in contract.contract_type.abi]
+    signer = Account.from_key(account.private_key)
+
+    with LocalNode(chain.provider.web3, latency=latency) as node:
+        sync_reads, sync_read_seconds, sync_write_seconds = _sync_path(
+            node.url, contract.address, abi, signer, readers, _addresses(read_count, write_count)
+        )
+        sync_requests = node.http_requests
+        async_reads, async_read_seconds, async_write_seconds, async_requests = asyncio.run(
+            _async_path(
+                node.url,
+                contract.address,
+                abi,
+                signer,
+                readers,
+                _addresses(read_count + write_count, write_count),
+                connections,
+                batch_size,
+            )
+        )
+    assert [tuple(voter) for voter in async_reads] == [tuple(voter) for voter in sync_reads]
+    assert contract.voterCount() == read_count + 2 * write_count
+
+    click.echo(f"{read_count} reads, {write_count} writes, {latency * 1000:g} ms latency per HTTP request")
+    click.echo(f"{'':12}{'reads/s':>10}{'writes/s':>10}{'HTTP requests':>15}")
+    click.echo(f"{'sync':12}{read_count / sync_read_seconds:>10.0f}{write_count / sync_write_seconds:>10.0f}{sync_requests:>15}")
+    click.echo(f"{'AsyncClient':12}{read_count / async_read_seconds:>10.0f}{write_count / async_write_seconds:>10.0f}{async_requests:>15}")
@@ -0,0 +1,63 @@
+import random
+import time
+
+import click
+
+from voting.delegation import DelegationIndex
+
+
+def _per_call(function, calls):
+    started = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return (time.perf_counter() - started) / calls
+
+
+@click.command()
+@click.option("--voters", "voter_count", type=int, default=1_000_000, show_default=True, help="Registered voters.")
+@click.option("--delegate-share", type=float, default=0.6, show_default=True, help="Share of voters who delegate.")
+@click.option("--top", type=int, default=10, show_default=True, help="K of the top-K query.")
+@click.option("--seed", type=int, default=0, show_default=True, help="Seed of the synthetic election.")
+def cli(voter_count, delegate_share, top, seed):
+    """
+    Feeds a `DelegationIndex` the events of a synthetic election and times its updates and queries.
+
+    Voter `i` may only delegate to a voter with a lower index, so there are no cycles, and
+    targets are skewed towards low indices, so a few delegates gather most of the weight.
+    The delegations arrive in random order, so trees are linked below nodes of other trees.
+    """
+    rng = random.Random(seed)
+    addresses = [f"0x{i + 1:040x}" for i in range(voter_count)]
+    index = DelegationIndex()
+
+    started = time.perf_counter()
+    for address in addresses:
+        index.apply("RightGranted", {"voter": address, "weight": rng.randint(1, 100)})
+    grant_seconds = time.perf_counter() - started
+
+    delegators = [i for i in range(1, voter_count) if rng.random() < delegate_share]
+    rng.shuffle(delegators)
+    started = time.perf_counter()
+    for i in delegators:
+        voter, to = addresses[i], addresses[int(i * rng.random() ** 3)]
+        args = {"voter": voter, "to": to, "delegate": index.final_delegate(to), "weight": index.effective_weight(voter)}
+        index.apply("Delegated", args)
+    delegate_seconds = time.perf_counter() - started
+
+    samples = [rng.choice(addresses) for _ in range(10_000)]
+    lookups = iter(samples * 10)
+    timings = {
+        f"top_delegates({top})": _per_call(lambda: index.top_delegates(top), 1000),
+        "depth_histogram()": _per_call(index.depth_histogram, 1000),
+        "effective_weight(address)": _per_call(lambda: index.effective_weight(next(lookups)), 10_000),
+        "final_delegate(address)": _per_call(lambda: index.final_delegate(next(lookups)), 10_000),
+        "depth(address)": _per_call(lambda: index.depth(next(lookups)), 10_000),
+    }
+
+    histogram = index.depth_histogram()
+    click.echo(f"{voter_count} voters, {len(delegators)} delegations, deepest chain {max(histogram)} hops")
+    click.echo(f"grants:      {grant_seconds:6.2f}s, {grant_seconds / voter_count * 1e6:5.1f} us per event")
+    click.echo(f"delegations: {delegate_seconds:6.2f}s, {delegate_seconds / len(delegators) * 1e6:5.1f} us per event")
+    for name, seconds in timings.items():
+        click.echo(f"{name:28}{seconds * 1e6:8.1f} us")
+    click.echo(f"top {top}: {index.top_delegates(top)[:3]} ...")
@@ -0,0 +1,73 @@
+import random
+
+import click
+from ape import accounts, project
+from ape.cli import ConnectedProviderCommand, account_option
+
+from voting.batching import register_voters
+from voting.loadsim import check_tallies, new_model, plan_operations, replay, run_operations, summarize
+
+# Gas fee each simulated voter receives to pay for its one transaction.
+VOTER_FUNDING = 10**16
+
+
+@click.command(cls=ConnectedProviderCommand)
+@account_option()
+@click.option(
+    "--contract",
+    "contract_name",
+    type=click.Choice(["VotingApp", "DelegateVotingApp", "PackedDelegateVotingApp"]),
+    default="DelegateVotingApp",
+    show_default=True,
+)
+@click.option("--voters", "voter_count", type=int, default=200, show_default=True, help="Simulated voters.")
+@click.option("--proposals", "proposal_count", type=int, default=5, show_default=True, help="Proposals on the ballot.")
+@click.option("--max-weight", type=int, default=100, show_default=True, help="Voter weights are drawn from 1..MAX_WEIGHT.")
+@click.option("--delegate-share", type=float, default=0.4, show_default=True, help="Share of voters that delegate.")
+@click.option("--chain-share", type=float, default=0.5, show_default=True, help="Share of delegations that extend a chain.")
+@click.option("--concurrency", type=int, default=4, show_default=True, help="Transactions in flight.")
+@click.option("--seed", type=int, default=0, show_default=True)
+def cli(
+    account,
+    contract_name,
+    voter_count,
+    proposal_count,
+    max_weight,
+    delegate_share,
+    chain_share,
+    concurrency,
+    seed,
+):
+    """
+    Deploys an election, lets VOTERS simulated voters vote or delegate and reports throughput,
+    latency and gas. The final tallies are checked against `voting.model.DelegateElection`.
+    """
+    rng = random.Random(seed)
+    if contract_name == "VotingApp":
+        delegate_share = 0.0
+
+    contract = account.deploy(getattr(project, contract_name), proposal_count)
+    names = [f"proposal {i}" for i in range(proposal_count)]
+    for start in range(0, proposal_count, 100):
+        contract.addProposalBatch(names[start : start + 100], sender=account)
+
+    click.echo(f"funding {voter_count} voters")
+    voters = [accounts.test_accounts.generate_test_account() for _ in range(voter_count)]
+    for voter in voters:
+        account.transfer(voter, VOTER_FUNDING)
+    registrations = [(voter.address, rng.randint(1, max_weight)) for voter in voters]
+    for _ in register_voters(contract, registrations, account, batch_size=200):
+        pass
+
+    operations = plan_operations(voter_count, proposal_count, rng, delegate_share, chain_share)
+    click.echo(f"sending {len(operations)} transactions, {concurrency} in flight")
+    outcomes, seconds = run_operations(contract, voters, operations, concurrency)
+    click.echo(summarize(outcomes, seconds).format())
+
+    model = new_model(account.address, names, registrations)
+    replay(model, voters, outcomes)
+    mismatches = check_tallies(model, contract)
+    if mismatches:
+        raise click.ClickException("tallies differ from the model: " + "; ".join(mismatches))
+    counts = ", ".join(str(proposal.voteCount) for proposal in model.proposals)
+    click.echo(f"tallies match the model: [{counts}], winner {model.winningProposal()}")
@@ -0,0 +1,24 @@
+import click
+from ape import project
+from ape.cli import ConnectedProviderCommand, account_option
+
+from voting.batching import read_voters, register_voters
+
+
+@click.command(cls=ConnectedProviderCommand)
+@account_option()
+@click.option("--delegate", is_flag=True, help="Target a DelegateVotingApp instead of a VotingApp.")
+@click.option("--batch-size", type=int, default=None, help="Voters per transaction. Defaults to what fits in a block.")
+@click.argument("address")
+@click.argument("csv_path", type=click.Path(exists=True, dir_okay=False))
+def cli(account, delegate, batch_size, address, csv_path):
+    """
+    Registers every voter of CSV_PATH (`address,weight` rows) on the election at ADDRESS.
+    """
+    container = project.DelegateVotingApp if delegate else project.VotingApp
+    contract = container.at(address)
+    registered = 0
+    voters = read_voters(csv_path)
+    for batch, receipt in register_voters(contract, voters, account, batch_size=batch_size):
+        registered += len(batch)
+        click.echo(f"{receipt.txn_hash}: {registered} voters registered, {receipt.gas_used} gas")
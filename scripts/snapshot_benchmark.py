@@ -0,0 +1,50 @@
+import time
+
+import click
+from ape import project
+from ape.cli import ConnectedProviderCommand, account_option
+from eth_utils import to_checksum_address
+
+from voting.batching import register_voters
+from voting.snapshot import fetch_snapshot
+
+
+def _timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+
+@click.command(cls=ConnectedProviderCommand)
+@account_option()
+@click.option("--voters", "voter_count", type=int, default=10_000, show_default=True, help="Registered voters.")
+@click.option("--proposals", "proposal_count", type=int, default=10, show_default=True, help="Proposals on the ballot.")
+# Small batches keep blocks below the gas target, so the local base fee does not outgrow ape's fee estimate.
+@click.option("--batch-size", type=int, default=200, show_default=True, help="Voters per registration transaction.")
+@click.option("--workers", type=int, default=1, show_default=True, help="Pages fetched in parallel.")
+def cli(account, voter_count, proposal_count, batch_size, workers):
+    """
+    Deploys a DelegateVotingApp with a synthetic election and compares reading its full state
+    through the per-item getters with `voting.snapshot.fetch_snapshot`.
+    """
+    contract = account.deploy(project.DelegateVotingApp, proposal_count)
+    contract.addProposalBatch([f"proposal {i}" for i in range(proposal_count)], sender=account)
+    addresses = [to_checksum_address((i + 1).to_bytes(20, "big")) for i in range(voter_count)]
+    for _ in register_voters(contract, ((a, 1) for a in addresses), account, batch_size=batch_size):
+        pass
+
+    def per_getter():
+        proposals = [contract.proposals(i) for i in range(contract.amountProposals())]
+        voters = {a: contract.voters(a) for a in addresses}
+        return proposals, voters
+
+    (proposals, voters), getter_seconds = _timed(per_getter)
+    snapshot, snapshot_seconds = _timed(lambda: fetch_snapshot(contract, addresses, max_workers=workers))
+    assert [tuple(p) for p in snapshot.proposals] == [tuple(p) for p in proposals]
+    assert {a: tuple(v) for a, v in snapshot.voters.items()} == {a: tuple(v) for a, v in voters.items()}
+
+    getter_calls = 1 + proposal_count + voter_count
+    snapshot_calls = 2 + -(-proposal_count // 100) + -(-voter_count // 1000)
+    click.echo(f"{voter_count} voters, {proposal_count} proposals")
+    click.echo(f"per-item getters: {getter_calls:>6} calls {getter_seconds:8.2f}s")
+    click.echo(f"fetch_snapshot:   {snapshot_calls:>6} calls {snapshot_seconds:8.2f}s")
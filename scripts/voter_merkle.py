@@ -0,0 +1,24 @@
+import json
+from pathlib import Path
+
+import click
+
+from voting.batching import read_voters
+from voting.merkle import MerkleTree
+
+
+@click.command()
+@click.argument("csv_path", type=click.Path(exists=True, dir_okay=False))
+@click.argument("out_dir", type=click.Path(file_okay=False))
+def cli(csv_path, out_dir):
+    """
+    Builds the voter Merkle tree of CSV_PATH (`address,weight` rows) in OUT_DIR and writes one proof per voter to OUT_DIR/proofs.jsonl.
+    """
+    tree = MerkleTree.build(read_voters(csv_path), out_dir)
+    with open(Path(out_dir) / "proofs.jsonl", "w") as f:
+        for address, weight, proof in tree.proofs(read_voters(csv_path)):
+            f.write(
+                json.dumps({"address": address, "weight": weight, "proof": ["0x" + p.hex() for p in proof]})
+                + "\n"
+            )
+    click.echo(f"root 0x{tree.root.hex()} ({tree.size} voters, depth {tree.depth})")
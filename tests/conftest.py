@@ -1,7 +1,125 @@
+from pathlib import Path
+
 import pytest
+from eth_utils import to_checksum_address
+
+from voting.batching import register_voters
+from voting.gas import DEFAULT_TOLERANCE, GasBaseline
+from voting.profiler import GasProfiler
+
+GAS_BASELINE_PATH = Path(__file__).parent / "gas_baseline.json"
+# Proposal cap the `contract` and `delegate_contract` fixtures deploy with.
+MAX_PROPOSALS = 3
+CONTRACT_NAMES = ("VotingApp", "DelegateVotingApp", "PackedDelegateVotingApp", "CommitRevealVotingApp")
+# Contracts the gas profiler attributes gas to, including those deployed by the tests themselves.
+PROFILED_CONTRACT_NAMES = CONTRACT_NAMES + ("ElectionFactory",)
+# The `(contract_name, proposals, voters)` parameter sets of the `election` fixture besides its
+# default. Every one is seeded up front by `seeded_elections`.
+SEEDED_ELECTIONS = (
+    ("VotingApp", 3, 9),
+    ("DelegateVotingApp", 3, 9),
+    ("PackedDelegateVotingApp", 3, 9),
+    ("VotingApp", 5, 4),
+    ("DelegateVotingApp", 5, 4),
+)
+# Voters registered per `giveRightToVoteBatch` call when seeding an election; small enough
+# to keep blocks under the gas target so the local base fee stays flat.
+SEED_BATCH_SIZE = 200
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--update-gas-baseline",
+        action="store_true",
+        default=False,
+        help="Write the gas measured by the benchmark tests to tests/gas_baseline.json instead of checking it.",
+    )
+    parser.addoption(
+        "--gas-tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Allowed relative gas increase over the baseline before a benchmark fails.",
+    )
+    parser.addoption(
+        "--gas-profile",
+        metavar="PATH",
+        default=None,
+        help="Trace every transaction and write the gas per function, storage access and opcode to PATH as JSON and next to it as text.",
+    )
+
+
+def pytest_configure(config):
+    # Each xdist worker would write its own share of the measurements over the same file.
+    if config.getoption("--update-gas-baseline") and config.getoption("numprocesses", default=None):
+        raise pytest.UsageError("--update-gas-baseline cannot be combined with -n; regenerate the baseline serially")
+    if config.getoption("--gas-profile") and config.getoption("numprocesses", default=None):
+        raise pytest.UsageError("--gas-profile cannot be combined with -n; profile the tests serially")
+
+
+@pytest.fixture(scope="session")
+def gas_baseline(request):
+    """
+    This fixture provides the session-wide `GasBaseline` used by the benchmark tests and writes it back at the end of the session when `--update-gas-baseline` is given.
+    """
+    baseline = GasBaseline(
+        GAS_BASELINE_PATH, tolerance=request.config.getoption("--gas-tolerance")
+    )
+    yield baseline
+    if request.config.getoption("--update-gas-baseline"):
+        baseline.save()
+    if baseline.measured:
+        print("\n" + baseline.report())
+
+
+@pytest.fixture(scope="session")
+def contract_sources(project):
+    """
+    This fixture returns a function that pairs the compiled contract type of each named contract with its source, as `GasProfiler` takes them.
+    """
+
+    def sources(*names):
+        contract_types = [getattr(project, name).contract_type for name in names]
+        return [(contract_type, (project.contracts_folder / contract_type.source_id).read_text()) for contract_type in contract_types]
+
+    return sources
+
+
+@pytest.fixture(scope="session")
+def gas_profiler(request, chain, contract_sources):
+    """
+    This fixture traces every transaction of the session when `--gas-profile` is given, and writes and prints the hot-path report at the end of the session. It provides None otherwise.
+    """
+    path = request.config.getoption("--gas-profile")
+    if path is None:
+        yield None
+        return
+    profiler = GasProfiler(contract_sources(*PROFILED_CONTRACT_NAMES))
+    profiler.install(chain.provider)
+    yield profiler
+    profiler.uninstall()
+    profiler.profile.write(path)
+    print("\n" + profiler.profile.format())
 
 
 @pytest.fixture
+def gas_check(gas_baseline, request):
+    """
+    This fixture returns a function that checks the gas of a receipt or a raw gas amount against the baseline, or only records it when `--update-gas-baseline` is given.
+    """
+    update = request.config.getoption("--update-gas-baseline")
+
+    def check(name, gas):
+        gas = getattr(gas, "gas_used", gas)
+        if update:
+            gas_baseline.record(name, gas)
+        else:
+            gas_baseline.check(name, gas)
+        return gas
+
+    return check
+
+
+@pytest.fixture(scope="session")
 def deployer(accounts):
     """
     This fixture provides the first account from the `accounts` fixture as the deployer account.
@@ -10,16 +128,143 @@ def deployer(accounts):
 
 
 @pytest.fixture
-def contract(deployer, project):
+def make_accounts(accounts, deployer):
+    """
+    This fixture returns a function that generates `n` extra test accounts beyond the configured ones and funds each of them from the `deployer` account.
+    """
+
+    def make(n):
+        generated = [accounts.generate_test_account() for _ in range(n)]
+        for account in generated:
+            deployer.transfer(account, 10**18)
+        return generated
+
+    return make
+
+
+@pytest.fixture(scope="session")
+def scan_winner():
+    """
+    This fixture returns a function that finds the winner of a deployed election by reading every proposal, the reference for the incrementally tracked `winningProposal`: the most votes, lowest index first on ties.
+    """
+
+    def scan(contract):
+        counts = [contract.proposals(i).voteCount for i in range(contract.amountProposals())]
+        return counts.index(max(counts))
+
+    return scan
+
+
+@pytest.fixture(scope="session")
+def deployments(deployer, project, gas_profiler):
     """
-    This fixture deploys the `VotingApp` contract using the `deployer` account and returns the deployed contract instance.
+    This fixture deploys each contract once per session with a cap of `MAX_PROPOSALS` proposals, plus an `ElectionFactory` that clones the `VotingApp` and `DelegateVotingApp` deployments, and returns them by contract name.
+
+    `_function_isolation` depends on it, so the deployments always happen before ape takes the per-test chain snapshot. Every test then starts from the freshly deployed contracts and is reverted afterwards, also when a test looks up a contract fixture with `request.getfixturevalue`. It depends on `gas_profiler` so a profile also covers the deployments.
     """
-    return deployer.deploy(project.VotingApp)
+    deployed = {name: deployer.deploy(getattr(project, name), MAX_PROPOSALS) for name in CONTRACT_NAMES}
+    implementations = [deployed["VotingApp"], deployed["DelegateVotingApp"]]
+    deployed["ElectionFactory"] = deployer.deploy(project.ElectionFactory, implementations)
+    return deployed
+
+
+@pytest.fixture(scope="session")
+def contract(deployments):
+    """
+    This fixture provides the session-wide `VotingApp` deployment, reverted to its freshly deployed state for each test.
+    """
+    return deployments["VotingApp"]
+
+
+@pytest.fixture(scope="session")
+def delegate_contract(deployments):
+    """
+    This fixture provides the session-wide `DelegateVotingApp` deployment, reverted to its freshly deployed state for each test.
+    """
+    return deployments["DelegateVotingApp"]
+
+
+@pytest.fixture(scope="session")
+def packed_contract(deployments):
+    """
+    This fixture provides the session-wide `PackedDelegateVotingApp` deployment, reverted to its freshly deployed state for each test.
+    """
+    return deployments["PackedDelegateVotingApp"]
+
+
+@pytest.fixture(scope="session")
+def commit_reveal_contract(deployments):
+    """
+    This fixture provides the session-wide `CommitRevealVotingApp` deployment, reverted to its freshly deployed state for each test.
+    """
+    return deployments["CommitRevealVotingApp"]
+
+
+@pytest.fixture(scope="session")
+def factory(deployments):
+    """
+    This fixture provides the session-wide `ElectionFactory` deployment that clones the session-wide `VotingApp` and `DelegateVotingApp` deployments.
+    """
+    return deployments["ElectionFactory"]
+
+
+def election_voters(accounts, count):
+    """
+    Returns the `(address, weight)` pairs registered by the `election` fixture.
+
+    The first voters are the configured accounts after the deployer, so tests can send
+    transactions from them; the rest are synthetic addresses. Voter `k` has weight `k + 1`.
+    """
+    addresses = [account.address for account in accounts[1:]]
+    addresses += [to_checksum_address((k + 1).to_bytes(20, "big")) for k in range(count - len(addresses))]
+    return [(address, k + 1) for k, address in enumerate(addresses[:count])]
+
+
+def default_election(accounts):
+    """
+    Returns the parameters of the `election` fixture without parametrization: a `DelegateVotingApp` with `MAX_PROPOSALS` proposals and every configured account except the deployer registered.
+    """
+    return ("DelegateVotingApp", MAX_PROPOSALS, len(accounts) - 1)
+
+
+@pytest.fixture(scope="session")
+def seeded_elections(deployments, deployer, accounts, project):
+    """
+    This fixture seeds the default election and every election of `SEEDED_ELECTIONS` once per session and returns them by parameter set.
+
+    Each contract is deployed with a cap of `proposals`, filled with proposals named `proposal 0`, `proposal 1`, ..., and has the `election_voters(accounts, voters)` registered. Like `deployments` it is set up before ape takes the per-test chain snapshot, so no test can revert the seeding.
+    """
+    seeded = {}
+    for params in dict.fromkeys((default_election(accounts),) + SEEDED_ELECTIONS):
+        contract_name, proposals, voters = params
+        election = deployer.deploy(getattr(project, contract_name), proposals)
+        names = [f"proposal {i}" for i in range(proposals)]
+        for start in range(0, proposals, 100):
+            election.addProposalBatch(names[start : start + 100], sender=deployer)
+        for _ in register_voters(election, election_voters(accounts, voters), deployer, batch_size=SEED_BATCH_SIZE):
+            pass
+        seeded[params] = election
+    return seeded
+
+
+@pytest.fixture
+def _function_isolation(deployments, seeded_elections, _function_isolation):
+    """
+    This fixture extends ape's per-test chain snapshot so that it is always taken after the session-wide deployments and seeded elections exist.
+
+    Ape inserts its isolation fixture into each test by the order of its fixture registry, which can place the snapshot ahead of a session fixture first set up by that test. The deployment would then be reverted after the test while its cached instance lives on. Requesting the session fixtures here makes pytest set them up before the snapshot.
+    """
+    yield
 
 
 @pytest.fixture
-def delegate_contract(deployer, project):
+def election(request, accounts, seeded_elections):
     """
-    This fixture deploys the `DelegateVotingApp` contract using the `deployer` account and returns the deployed contract instance.
+    This fixture provides a seeded election, reverted to its seeded state for each test.
+
+    Parametrize it indirectly with one of the `(contract_name, proposals, voters)` sets in `SEEDED_ELECTIONS`; without parameters it is the `default_election(accounts)`. See `seeded_elections` for how they are seeded.
     """
-    return deployer.deploy(project.DelegateVotingApp)
+    params = tuple(getattr(request, "param", default_election(accounts)))
+    if params not in seeded_elections:
+        raise pytest.UsageError(f"election {params} is not seeded; add it to SEEDED_ELECTIONS in tests/conftest.py")
+    return seeded_elections[params]
@@ -0,0 +1,126 @@
+import pytest
+from ape.exceptions import ContractLogicError
+
+from voting.attestation import (
+    EMPTY_COMMITMENT,
+    MAX_FINALIZE_BATCH_SIZE,
+    fetch_tally,
+    finalize_election,
+    read_tally,
+    tally_commitment,
+    verify_tally,
+    write_tally,
+)
+
+ELECTIONS = [("VotingApp", 5, 4), ("DelegateVotingApp", 5, 4)]
+
+
+@pytest.mark.parametrize("election", ELECTIONS, indirect=True, ids=[name for name, _, _ in ELECTIONS])
+def test_finalize_freezes_election(election, deployer, accounts):
+    """
+    Tests that `finalize` closes the election on its first call, hashes the ballot over several calls, stores and logs the commitment of the final tally, and that nothing can change the tally afterwards.
+
+    Args:
+        election (Contract): A seeded election with 5 proposals and 4 voters, provided by the `election` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    first, second, third, fourth = accounts[1:5]
+    election.vote(3, sender=first)
+    election.vote(1, sender=second)
+    with pytest.raises(ContractLogicError):
+        election.finalize(2, sender=first)
+    with pytest.raises(ContractLogicError):
+        election.finalize(MAX_FINALIZE_BATCH_SIZE + 1, sender=deployer)
+
+    progress = []
+    for _ in range(3):
+        receipt = election.finalize(2, sender=deployer)
+        progress.append((election.hashedProposals(), election.tallyCommitment() != EMPTY_COMMITMENT))
+
+    assert progress == [(2, False), (4, False), (5, True)]
+    assert election.closed()
+    tally = [(f"proposal {i}", [0, 2, 0, 1, 0][i]) for i in range(5)]
+    assert fetch_tally(election) == tally
+    commitment = election.tallyCommitment()
+    assert commitment == tally_commitment(tally)
+    assert [log.commitment for log in receipt.events] == [commitment]
+    assert (receipt.events[0].proposals, receipt.events[0].winningProposal) == (5, 1)
+
+    frozen = [
+        lambda: election.vote(0, sender=third),
+        lambda: election.addProposal("late", sender=deployer),
+        lambda: election.addProposalBatch(["late"], sender=deployer),
+        lambda: election.giveRightToVote(accounts[6], 1, sender=deployer),
+        lambda: election.giveRightToVoteBatch([(accounts[6], 1)], sender=deployer),
+        lambda: election.setVoterRoot(b"\x01" * 32, sender=deployer),
+        lambda: election.finalize(1, sender=deployer),
+    ]
+    if election.contract_type.name == "DelegateVotingApp":
+        frozen.append(lambda: election.delegate(third, sender=fourth))
+    for transaction in frozen:
+        with pytest.raises(ContractLogicError):
+            transaction()
+    assert election.tallyCommitment() == commitment
+
+
+def test_votes_rejected_while_finalizing(delegate_contract, deployer, accounts):
+    """
+    Tests that an unfinished `finalize` already closes the election, and that an empty ballot cannot be finalized.
+
+    Args:
+        delegate_contract (Contract): The deployed `DelegateVotingApp`, provided by the `delegate_contract` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    app = delegate_contract
+    with pytest.raises(ContractLogicError):
+        app.finalize(1, sender=deployer)
+    app.addProposalBatch(["beach", "mountains"], sender=deployer)
+    app.giveRightToVote(accounts[1], 1, sender=deployer)
+
+    app.finalize(1, sender=deployer)
+
+    assert app.closed() and app.tallyCommitment() == EMPTY_COMMITMENT
+    with pytest.raises(ContractLogicError):
+        app.vote(0, sender=accounts[1])
+    assert len(list(finalize_election(app, deployer))) == 1
+    assert app.tallyCommitment() == tally_commitment([("beach", 0), ("mountains", 0)])
+
+
+def test_verify_tally(contract, deployer, accounts, tmp_path):
+    """
+    Tests that a tally file round-trips and matches the commitment only with every proposal, in order, with the final counts.
+
+    Args:
+        contract (Contract): The deployed `VotingApp`, provided by the `contract` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        tmp_path (Path): A temporary directory provided by pytest.
+    """
+    names = ["beach", 'mountains, "high"', "city"]
+    contract.addProposalBatch(names, sender=deployer)
+    contract.giveRightToVote(accounts[1], 7, sender=deployer)
+    contract.vote(1, sender=accounts[1])
+    path = tmp_path / "tally.csv"
+    write_tally(path, fetch_tally(contract))
+    with pytest.raises(ValueError):
+        verify_tally(contract, path)
+    with pytest.raises(ValueError):
+        list(finalize_election(contract, deployer, batch_size=0))
+
+    for _ in finalize_election(contract, deployer, batch_size=1):
+        pass
+
+    tally = [("beach", 0), ('mountains, "high"', 7), ("city", 0)]
+    assert list(read_tally(path)) == tally
+    assert verify_tally(contract, path)
+    tampered = [
+        [("beach", 0), ('mountains, "high"', 6), ("city", 0)],
+        [("beach", 0), ("city", 0), ('mountains, "high"', 7)],
+        tally[:2],
+        tally + [("late", 0)],
+    ]
+    for rows in tampered:
+        write_tally(path, rows)
+        assert not verify_tally(contract, path)
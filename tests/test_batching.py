@@ -0,0 +1,81 @@
+import pytest
+from eth_utils import to_checksum_address
+
+from voting.batching import (
+    MAX_BATCH_SIZE,
+    batch_size_for_gas_limit,
+    chunked,
+    read_voters,
+    register_voters,
+)
+
+
+def test_batch_size_for_gas_limit():
+    """
+    Tests that the batch size grows with the gas limit, is capped at `MAX_BATCH_SIZE` and rejects gas limits too small for one voter.
+    """
+    assert 1 <= batch_size_for_gas_limit(1_000_000) < batch_size_for_gas_limit(10_000_000)
+    assert batch_size_for_gas_limit(10**12) == MAX_BATCH_SIZE
+    with pytest.raises(ValueError):
+        batch_size_for_gas_limit(50_000)
+
+
+def test_chunked():
+    """
+    Tests that `chunked` splits a lazy iterable into full chunks and one remainder chunk.
+    """
+    assert list(chunked(iter(range(7)), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(chunked([], 3)) == []
+
+
+def test_read_voters(tmp_path):
+    """
+    Tests that `read_voters` skips the header row and checksums addresses.
+
+    Args:
+        tmp_path (Path): A temporary directory provided by pytest.
+    """
+    path = tmp_path / "voters.csv"
+    path.write_text("address,weight\n0x" + "ab" * 20 + ",3\n\n0x" + "01" * 20 + ",1\n")
+    assert list(read_voters(path)) == [
+        (to_checksum_address("0x" + "ab" * 20), 3),
+        (to_checksum_address("0x" + "01" * 20), 1),
+    ]
+
+
+def test_register_voters(contract, deployer):
+    """
+    Tests that `register_voters` submits one `giveRightToVoteBatch` transaction per chunk and registers every voter, and rejects a batch size the contract does not accept.
+
+    Args:
+        contract (Contract): The deployed instance of the `VotingApp` contract, provided by the `contract` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+    """
+    voters = [(to_checksum_address(f"0x{i + 1:040x}"), i + 1) for i in range(25)]
+    submitted = list(register_voters(contract, voters, deployer, batch_size=10))
+    assert [len(batch) for batch, _ in submitted] == [10, 10, 5]
+    assert contract.voterCount() == 25
+    assert contract.voters(voters[-1][0]).weight == 25
+    for batch_size in (0, MAX_BATCH_SIZE + 1):
+        with pytest.raises(ValueError):
+            next(register_voters(contract, voters, deployer, batch_size=batch_size))
+    assert contract.voterCount() == 25
+
+
+def test_register_voters_sizes_checkpointed_batches(contract, delegate_contract, deployer):
+    """
+    Tests that `register_voters` sizes batches for the extra checkpoint write of a contract with `getPastVotes`, so every batch stays under the gas limit.
+
+    Args:
+        contract (Contract): The deployed instance of the `VotingApp` contract, provided by the `contract` fixture.
+        delegate_contract (Contract): The deployed instance of the `DelegateVotingApp` contract, provided by the `delegate_contract` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+    """
+    gas_limit = 3_000_000
+    voters = [(to_checksum_address(f"0x{i + 1:040x}"), i + 1) for i in range(60)]
+    plain = [len(batch) for batch, _ in register_voters(contract, voters, deployer, gas_limit=gas_limit)]
+    submitted = list(register_voters(delegate_contract, voters, deployer, gas_limit=gas_limit))
+    assert plain == [60]
+    assert [len(batch) for batch, _ in submitted] == [36, 24]
+    assert all(receipt.gas_used < gas_limit for _, receipt in submitted)
+    assert delegate_contract.getVotes(voters[-1][0]) == 60
@@ -0,0 +1,118 @@
+import random
+
+import pytest
+from ape.exceptions import ContractLogicError
+
+from voting.loadsim import new_model
+from voting.model import ZERO_ADDRESS, Reverted
+from voting.relayer import sign_intent
+
+
+def test_checkpoints_record_history(delegate_contract, deployer, accounts, chain):
+    """
+    Tests that grants and delegations write one checkpoint per block and change of voting power, that votes keep the power, and that the past views answer for any earlier block.
+
+    Args:
+        delegate_contract (Contract): The deployed `DelegateVotingApp`, provided by the `delegate_contract` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        chain (ChainManager): The `chain` fixture of ape.
+    """
+    app = delegate_contract
+    first, second, third = accounts[1:4]
+    app.addProposal("beach", sender=deployer)
+    granted = app.giveRightToVoteBatch([(first, 1), (second, 2), (third, 3)], sender=deployer).block_number
+    delegated = app.delegate(second, sender=first).block_number
+    voted = app.vote(0, sender=third).block_number
+    forwarded = app.delegate(third, sender=second).block_number
+    # Calls run in the latest block, whose state is not final; past views need a later one.
+    chain.mine()
+
+    assert [app.numCheckpoints(user) for user in (first, second, third)] == [2, 3, 2]
+    assert [tuple(app.checkpoints(second, i)) for i in range(3)] == [(granted, 2), (delegated, 3), (forwarded, 0)]
+    with pytest.raises(ContractLogicError):
+        app.checkpoints(second, 3)
+    assert [app.getVotes(user) for user in (first, second, third)] == [0, 0, 6]
+
+    history = {
+        granted - 1: [0, 0, 0],
+        granted: [1, 2, 3],
+        delegated: [0, 3, 3],
+        voted: [0, 3, 3],
+        forwarded: [0, 0, 6],
+    }
+    for block, votes in history.items():
+        assert [app.getPastVotes(user, block) for user in (first, second, third)] == votes
+    assert app.getPastDelegate(first, granted) == ZERO_ADDRESS
+    assert app.getPastDelegate(first, delegated) == second.address
+    assert app.getPastDelegate(second, voted) == ZERO_ADDRESS
+    assert app.getPastDelegate(second, forwarded) == third.address
+    assert app.getPastDelegate(third, forwarded) == ZERO_ADDRESS
+
+    for view in (app.getPastVotes, app.getPastDelegate):
+        with pytest.raises(ContractLogicError):
+            view(first, chain.blocks.height)
+
+
+def test_checkpoint_per_block(delegate_contract, deployer, accounts):
+    """
+    Tests that several changes within one block leave a single checkpoint with the last value, and that voting power above 2**160 - 1 is rejected.
+
+    Args:
+        delegate_contract (Contract): The deployed `DelegateVotingApp`, provided by the `delegate_contract` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    app = delegate_contract
+    app.giveRightToVoteBatch([(user, 1) for user in accounts[1:5]], sender=deployer)
+    intents = [sign_intent(user, app, to=accounts[4]) for user in accounts[1:4]]
+    block = app.relayBatch([intent.as_tuple() for intent in intents], sender=deployer).block_number
+
+    assert app.numCheckpoints(accounts[4]) == 2
+    assert tuple(app.checkpoints(accounts[4], 1)) == (block, 4)
+
+    with pytest.raises(ContractLogicError):
+        app.giveRightToVote(accounts[5], 2**160, sender=deployer)
+    app.giveRightToVote(accounts[5], 2**160 - 1, sender=deployer)
+    assert app.getVotes(accounts[5]) == 2**160 - 1
+
+
+@pytest.mark.parametrize("seed", range(2))
+def test_past_votes_match_model(election, deployer, accounts, chain, seed):
+    """
+    Sends random votes and delegations, one per block, and checks `getPastVotes` and `getPastDelegate` of every voter at every block against the model's state at that block.
+
+    Args:
+        election (Contract): A seeded `DelegateVotingApp`, provided by the `election` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        chain (ChainManager): The `chain` fixture of ape.
+        seed (int): The seed of the random operations.
+    """
+    rng = random.Random(seed)
+    users = list(accounts[1:])
+    model = new_model(deployer.address, [f"proposal {i}" for i in range(3)], [(u.address, k + 1) for k, u in enumerate(users)])
+
+    def state():
+        return [(model.getVotes(u.address), model.voter(u.address).delegate) for u in users]
+
+    history = {chain.blocks.height: state()}
+    for user in rng.sample(users, len(users)):
+        if rng.random() < 0.5:
+            to = rng.choice([u for u in users if u != user])
+            try:
+                model.delegate(user.address, to.address)
+            except Reverted:
+                continue
+            receipt = election.delegate(to, sender=user)
+        else:
+            proposal = rng.randrange(3)
+            model.vote(user.address, proposal)
+            receipt = election.vote(proposal, sender=user)
+        history[receipt.block_number] = state()
+    chain.mine()
+
+    for block, expected in history.items():
+        actual = [(election.getPastVotes(u, block), election.getPastDelegate(u, block)) for u in users]
+        assert actual == expected
+    assert [election.getVotes(u) for u in users] == [votes for votes, _ in expected]
@@ -0,0 +1,175 @@
+import asyncio
+
+import pytest
+from eth_account import Account
+from eth_utils import to_checksum_address
+
+from voting.client import AsyncClient, AsyncContract, ContractFunction, RPCError, TransactionReverted
+from voting.localnode import LocalNode
+
+
+@pytest.fixture
+def node(chain):
+    """
+    This fixture serves the test chain over JSON-RPC through a `LocalNode` for the duration of the test.
+    """
+    with LocalNode(chain.provider.web3) as node:
+        yield node
+
+
+def _signer(account):
+    return Account.from_key(account.private_key)
+
+
+def _run(node, contract, work, **options):
+    async def run():
+        async with AsyncClient(node.url, **options) as client:
+            return await work(client.contract(contract.address, contract.contract_type)), client
+
+    return asyncio.run(run())
+
+
+def test_reads_are_batched(node, election, accounts):
+    """
+    Tests that concurrent reads of every getter and view return what ape reads and share JSON-RPC batches.
+
+    Args:
+        node (LocalNode): The JSON-RPC endpoint of the test chain, provided by the `node` fixture.
+        election (Contract): A seeded `DelegateVotingApp`, provided by the `election` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    users = list(accounts[1:])
+    election.delegate(users[1], sender=users[0])
+    election.vote(2, sender=users[1])
+
+    async def read(app):
+        return await asyncio.gather(
+            app.winningProposal(),
+            app.winnerName(),
+            app.amountProposals(),
+            app.proposals(2),
+            app.delegated(users[0]),
+            app.directlyVoted(users[1]),
+            app.getProposals(0, 3),
+            *(app.voters(user) for user in users),
+        )
+
+    (winning, name, amount, proposal, delegated, voted, proposals, *voters), client = _run(
+        node, election, read, max_batch_size=4
+    )
+
+    assert (winning, name, amount) == (2, "proposal 2", 3)
+    assert proposal.name == "proposal 2" and proposal.voteCount == 1 + 2
+    assert (delegated, voted) == (True, True)
+    assert proposals == [tuple(p) for p in election.getProposals(0, 3)]
+    assert voters == [tuple(election.voters(user)) for user in users]
+    assert voters[0].delegate == users[1].address
+    calls = 7 + len(users)
+    assert (client.rpc.rpc_requests, client.rpc.http_requests) == (calls, -(-calls // 4))
+    assert node.http_requests == client.rpc.http_requests
+
+
+def test_concurrent_writes_from_one_account(node, delegate_contract, deployer):
+    """
+    Tests that concurrent writes of one account get consecutive nonces, share JSON-RPC batches and all land.
+
+    Args:
+        node (LocalNode): The JSON-RPC endpoint of the test chain, provided by the `node` fixture.
+        delegate_contract (Contract): The deployed `DelegateVotingApp`, provided by the `delegate_contract` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+    """
+    chair = _signer(deployer)
+    voters = [to_checksum_address((k + 1).to_bytes(20, "big")) for k in range(20)]
+    nonce = deployer.nonce
+
+    async def register(app):
+        await app.addProposal("beach", sender=chair)
+        return await asyncio.gather(*(app.giveRightToVote(voter, k + 1, sender=chair) for k, voter in enumerate(voters)))
+
+    receipts, client = _run(node, delegate_contract, register)
+
+    assert all(int(receipt["status"], 16) == 1 for receipt in receipts)
+    assert client.rpc.http_requests < len(voters)
+    assert deployer.nonce == nonce + 1 + len(voters)
+    assert [delegate_contract.voters(voter).weight for voter in voters] == list(range(1, len(voters) + 1))
+    assert delegate_contract.proposals(0).name == "beach"
+
+
+def test_votes_and_delegations(node, election, accounts):
+    """
+    Tests votes and delegations sent by several voters through the client.
+
+    Args:
+        node (LocalNode): The JSON-RPC endpoint of the test chain, provided by the `node` fixture.
+        election (Contract): A seeded `DelegateVotingApp`, provided by the `election` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    first, second, third = (_signer(accounts[k]) for k in (3, 1, 2))
+
+    async def vote(app):
+        await app.delegate(second.address, sender=first)
+        await asyncio.gather(app.vote(1, sender=second), app.vote(0, sender=third))
+        return await asyncio.gather(app.winningProposal(), app.winnerName(), app.delegated(first.address))
+
+    result, _ = _run(node, election, vote)
+
+    assert result == [1, "proposal 1", True]
+    assert (election.winningProposal(), election.winnerName()) == (1, "proposal 1")
+    assert [election.proposals(i).voteCount for i in range(2)] == [2, 1 + 3]
+
+
+def test_errors(node, election, accounts):
+    """
+    Tests that reverted calls and transactions raise, that a transaction the node rejects releases its nonce, and that a view called with a sender sends no transaction.
+
+    Args:
+        node (LocalNode): The JSON-RPC endpoint of the test chain, provided by the `node` fixture.
+        election (Contract): A seeded `DelegateVotingApp`, provided by the `election` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    voter = _signer(accounts[1])
+
+    async def fail(app):
+        reads = await asyncio.gather(app.getPastVotes(voter.address, 2**64), app.winnerName(), return_exceptions=True)
+        # A view stays a call when it is given a sender, and it refuses transaction options.
+        reads.append(await app.winnerName(sender=voter))
+        with pytest.raises(ValueError):
+            await app.winnerName(gas=100_000)
+        await app.vote(0, sender=voter)
+        errors = []
+        # Rejected by the estimate, rejected by the node for too little gas, and mined but reverted.
+        for options in ({}, {"gas": 21_000}, {"gas": 200_000}):
+            try:
+                await app.vote(1, **options, sender=voter)
+            except (RPCError, TransactionReverted) as exc:
+                errors.append(type(exc))
+        await app.cancelIntents(sender=voter)
+        with pytest.raises(ValueError):
+            await app.vote(0)
+        with pytest.raises(AttributeError):
+            app.missing
+        return reads, errors
+
+    (reads, errors), _ = _run(node, election, fail)
+
+    assert isinstance(reads[0], RPCError) and reads[1] == reads[2] == "proposal 0"
+    assert errors == [RPCError, RPCError, TransactionReverted]
+    assert election.nonces(accounts[1]) == 1
+    assert election.voters(accounts[1]).vote == 0
+
+
+def test_function_resolution():
+    """
+    Tests that overloads with the same number of arguments are rejected instead of picking one, and that an ABI entry without outputs decodes to None.
+    """
+    abi = [
+        {"type": "function", "name": "set", "stateMutability": "nonpayable", "inputs": [{"name": "a", "type": "uint256"}]},
+        {"type": "function", "name": "set", "stateMutability": "nonpayable", "inputs": [{"name": "a", "type": "address"}]},
+        {"type": "function", "name": "set", "stateMutability": "nonpayable", "inputs": []},
+    ]
+    app = AsyncContract(None, "0x" + "11" * 20, abi)
+
+    with pytest.raises(ValueError, match="ambiguous"):
+        asyncio.run(app.set(1))
+    function = ContractFunction(abi[2])
+    assert (function.encode([]), function.decode(b"")) == ("0x" + function.selector.hex(), None)
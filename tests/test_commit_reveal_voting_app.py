@@ -0,0 +1,225 @@
+import random
+
+import pytest
+from ape.exceptions import ContractLogicError
+
+from voting.commitreveal import CLOSED, COMMIT, MAX_REVEAL_BATCH_SIZE, REVEAL, commitment, new_salt, reveal_batches
+
+
+def _commit(contract, voter, proposal):
+    """
+    Commits a vote of `voter` and returns the salt needed to reveal it.
+    """
+    salt = new_salt()
+    contract.commitVote(commitment(voter.address, proposal, salt), sender=voter)
+    return salt
+
+
+def test_phase_transitions(commit_reveal_contract, deployer, accounts):
+    """
+    Tests that only the chairperson moves the election from commit to reveal to closed, one phase at a time.
+
+    Args:
+        commit_reveal_contract (Contract): The deployed `CommitRevealVotingApp`, provided by the `commit_reveal_contract` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    contract = commit_reveal_contract
+    assert contract.phase() == COMMIT
+    with pytest.raises(ContractLogicError):
+        contract.closeReveal(sender=deployer)
+    with pytest.raises(ContractLogicError):
+        contract.startReveal(sender=accounts[1])
+
+    receipt = contract.startReveal(sender=deployer)
+    assert contract.phase() == REVEAL
+    assert [log.phase for log in receipt.events] == [REVEAL]
+    with pytest.raises(ContractLogicError):
+        contract.startReveal(sender=deployer)
+    with pytest.raises(ContractLogicError):
+        contract.closeReveal(sender=accounts[1])
+
+    contract.closeReveal(sender=deployer)
+    assert contract.phase() == CLOSED
+    for transition in (contract.startReveal, contract.closeReveal):
+        with pytest.raises(ContractLogicError):
+            transition(sender=deployer)
+
+
+def test_setup_only_during_commit(commit_reveal_contract, deployer, accounts):
+    """
+    Tests that proposals, voting rights and commitments are only accepted during the commit phase and reveals only during the reveal phase.
+
+    Args:
+        commit_reveal_contract (Contract): The deployed `CommitRevealVotingApp`, provided by the `commit_reveal_contract` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    contract = commit_reveal_contract
+    contract.addProposal("beach", sender=deployer)
+    contract.giveRightToVote(accounts[1], 2, sender=deployer)
+    salt = _commit(contract, accounts[1], 0)
+    with pytest.raises(ContractLogicError):
+        contract.revealVote(0, salt, sender=accounts[1])
+    with pytest.raises(ContractLogicError):
+        contract.revealBatch([(accounts[1], 0, salt)], sender=deployer)
+
+    contract.startReveal(sender=deployer)
+    with pytest.raises(ContractLogicError):
+        contract.addProposal("mountain", sender=deployer)
+    with pytest.raises(ContractLogicError):
+        contract.addProposalBatch(["mountain"], sender=deployer)
+    with pytest.raises(ContractLogicError):
+        contract.giveRightToVote(accounts[2], 1, sender=deployer)
+    with pytest.raises(ContractLogicError):
+        contract.giveRightToVoteBatch([(accounts[2], 1)], sender=deployer)
+    with pytest.raises(ContractLogicError):
+        contract.commitVote(commitment(accounts[1].address, 0, salt), sender=accounts[1])
+
+    contract.closeReveal(sender=deployer)
+    with pytest.raises(ContractLogicError):
+        contract.revealVote(0, salt, sender=accounts[1])
+    assert contract.proposals(0).voteCount == 0
+
+
+def test_commitVote(commit_reveal_contract, deployer, accounts):
+    """
+    Tests that a registered voter's commitment is stored without touching the tally, that it can be replaced until the reveal phase, and that unregistered voters and empty commitments are rejected.
+
+    Args:
+        commit_reveal_contract (Contract): The deployed `CommitRevealVotingApp`, provided by the `commit_reveal_contract` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    contract = commit_reveal_contract
+    contract.addProposalBatch(["beach", "mountain"], sender=deployer)
+    contract.giveRightToVote(accounts[1], 3, sender=deployer)
+    with pytest.raises(ContractLogicError):
+        contract.commitVote(commitment(accounts[2].address, 0, new_salt()), sender=accounts[2])
+    with pytest.raises(ContractLogicError):
+        contract.commitVote(b"\x00" * 32, sender=accounts[1])
+
+    first = _commit(contract, accounts[1], 0)
+    second = _commit(contract, accounts[1], 1)
+    voter = contract.voters(accounts[1])
+    assert voter.commitment == commitment(accounts[1].address, 1, second)
+    assert (voter.weight, voter.voted) == (3, False)
+    assert [contract.proposals(i).voteCount for i in range(2)] == [0, 0]
+
+    contract.startReveal(sender=deployer)
+    with pytest.raises(ContractLogicError):
+        contract.revealVote(0, first, sender=accounts[1])
+    contract.revealVote(1, second, sender=accounts[1])
+    assert [contract.proposals(i).voteCount for i in range(2)] == [0, 3]
+
+
+def test_revealVote(commit_reveal_contract, deployer, accounts):
+    """
+    Tests that a reveal must match the commitment, counts the voter's weight once and emits `Voted`.
+
+    Args:
+        commit_reveal_contract (Contract): The deployed `CommitRevealVotingApp`, provided by the `commit_reveal_contract` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    contract = commit_reveal_contract
+    contract.addProposalBatch(["beach", "mountain"], sender=deployer)
+    contract.giveRightToVote(accounts[1], 4, sender=deployer)
+    salt = _commit(contract, accounts[1], 1)
+    contract.startReveal(sender=deployer)
+
+    with pytest.raises(ContractLogicError):
+        contract.revealVote(0, salt, sender=accounts[1])
+    with pytest.raises(ContractLogicError):
+        contract.revealVote(1, new_salt(), sender=accounts[1])
+    with pytest.raises(ContractLogicError):
+        contract.revealVote(1, salt, sender=accounts[2])
+
+    receipt = contract.revealVote(1, salt, sender=accounts[1])
+    assert [(log.voter, log.proposal, log.weight) for log in receipt.events] == [(accounts[1].address, 1, 4)]
+    voter = contract.voters(accounts[1])
+    assert (voter.weight, voter.voted, voter.vote, voter.commitment) == (0, True, 1, b"\x00" * 32)
+    assert contract.proposals(1).voteCount == 4
+    assert contract.winningProposal() == 1
+    with pytest.raises(ContractLogicError):
+        contract.revealVote(1, salt, sender=accounts[1])
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("batch_size", [1, 4, MAX_REVEAL_BATCH_SIZE])
+def test_revealBatch_matches_tally(commit_reveal_contract, deployer, accounts, seed, batch_size):
+    """
+    Commits random votes, reveals them in batches together with invalid and repeated reveals, and checks the counts, the winner and the skipped reveals.
+
+    Args:
+        commit_reveal_contract (Contract): The deployed `CommitRevealVotingApp`, provided by the `commit_reveal_contract` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        seed (int): The seed of the random election.
+        batch_size (int): The reveals per `revealBatch` call.
+    """
+    contract = commit_reveal_contract
+    rng = random.Random(seed)
+    contract.addProposalBatch(["beach", "mountain", "city"], sender=deployer)
+    users = list(accounts[1:])
+    weights = {user.address: rng.randint(1, 5) for user in users}
+    contract.giveRightToVoteBatch(list(weights.items()), sender=deployer)
+
+    reveals = []
+    for user in users:
+        proposal = rng.randrange(3)
+        reveals.append((user.address, proposal, _commit(contract, user, proposal)))
+    # One voter never reveals, so its weight is not counted.
+    silent = reveals.pop()
+    contract.startReveal(sender=deployer)
+
+    expected = [0, 0, 0]
+    for voter, proposal, _ in reveals:
+        expected[proposal] += weights[voter]
+    bogus = [(silent[0], (silent[1] + 1) % 3, silent[2]), (reveals[0][0], reveals[0][1], new_salt())]
+    applied = 0
+    for batch in reveal_batches(reveals + bogus + reveals[:2], batch_size):
+        applied += contract.revealBatch.call(batch)
+        contract.revealBatch(batch, sender=deployer)
+    assert applied == len(reveals)
+
+    counts = [contract.proposals(i).voteCount for i in range(3)]
+    assert counts == expected
+    assert contract.winningProposal() == counts.index(max(counts))
+    assert contract.voters(silent[0]).commitment == commitment(silent[0], silent[1], silent[2])
+    contract.closeReveal(sender=deployer)
+    assert contract.winnerName() == ["beach", "mountain", "city"][counts.index(max(counts))]
+
+
+def test_revealBatch_unsorted(commit_reveal_contract, deployer, accounts):
+    """
+    Tests that a batch that is not sorted by proposal is still counted correctly.
+
+    Args:
+        commit_reveal_contract (Contract): The deployed `CommitRevealVotingApp`, provided by the `commit_reveal_contract` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    contract = commit_reveal_contract
+    contract.addProposalBatch(["beach", "mountain"], sender=deployer)
+    users = accounts[1:5]
+    contract.giveRightToVoteBatch([(user, i + 1) for i, user in enumerate(users)], sender=deployer)
+    proposals = [0, 1, 0, 1]
+    reveals = [(user.address, p, _commit(contract, user, p)) for user, p in zip(users, proposals)]
+    contract.startReveal(sender=deployer)
+    contract.revealBatch(reveals, sender=accounts[6])
+    assert [contract.proposals(i).voteCount for i in range(2)] == [1 + 3, 2 + 4]
+    assert contract.winningProposal() == 1
+
+
+def test_reveal_batches():
+    """
+    Tests that `reveal_batches` orders the reveals by proposal and respects the batch size bounds.
+    """
+    reveals = [(f"0x{i:040x}", p, b"\x00" * 32) for i, p in enumerate([2, 0, 1, 0, 2])]
+    batches = list(reveal_batches(reveals, 2))
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [reveal[1] for batch in batches for reveal in batch] == [0, 0, 1, 2, 2]
+    for size in (0, MAX_REVEAL_BATCH_SIZE + 1):
+        with pytest.raises(ValueError):
+            list(reveal_batches(reveals, size))
@@ -1,6 +1,10 @@
+import random
+
 import pytest
 from ape.exceptions import ContractLogicError
 
+from voting.model import MAX_DELEGATION_HOPS
+
 
 def test_delegate(delegate_contract, deployer, accounts):
     """
@@ -341,3 +345,191 @@ def test_winnerName(delegate_contract, deployer, accounts):
     assert contract.proposals(0).voteCount == 1
     assert contract.proposals(1).voteCount == 2
     assert contract.winnerName() == "mountain"
+
+
+def test_giveRightToVoteBatch(delegate_contract, deployer, accounts):
+    """
+    Tests the `giveRightToVoteBatch` function of the `DelegateVotingApp` contract, followed by a delegation between two voters of the batch.
+
+    Args:
+        delegate_contract (Contract): The deployed instance of the `DelegateVotingApp` contract, provided by the `delegate_contract` fixture.
+        deployer (Account): The account used to deploy the contract and give voting rights, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    contract = delegate_contract
+    contract.giveRightToVoteBatch([(accounts[1], 2), (accounts[2], 3)], sender=deployer)
+    assert contract.voterCount() == 2
+    assert contract.voters(accounts[1]).weight == 2
+    assert contract.voters(accounts[2]).weight == 3
+    contract.delegate(accounts[1], sender=accounts[2])
+    assert contract.voters(accounts[1]).weight == 5
+
+
+def test_giveRightToVoteBatch_fail(delegate_contract, deployer, accounts):
+    """
+    Tests that the `giveRightToVoteBatch` function of the `DelegateVotingApp` contract fails when called by an account other than the chairperson or when a voter in the batch has already delegated.
+
+    Args:
+        delegate_contract (Contract): The deployed instance of the `DelegateVotingApp` contract, provided by the `delegate_contract` fixture.
+        deployer (Account): The account used to deploy the contract and give voting rights, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    contract = delegate_contract
+    with pytest.raises(ContractLogicError):
+        contract.giveRightToVoteBatch([(accounts[1], 1)], sender=accounts[1])
+    contract.giveRightToVote(accounts[1], 1, sender=deployer)
+    contract.giveRightToVote(accounts[2], 1, sender=deployer)
+    contract.delegate(accounts[1], sender=accounts[2])
+    with pytest.raises(ContractLogicError):
+        contract.giveRightToVoteBatch([(accounts[2], 1)], sender=deployer)
+    assert contract.voterCount() == 2
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_winningProposal_matches_scan(delegate_contract, deployer, accounts, scan_winner, seed):
+    """
+    Tests that the incrementally tracked winner equals a full scan of the proposals after every vote or delegation of a randomized election, including weight forwarded to voters who already voted. Weights are random and include zero, so votes often tie.
+
+    Args:
+        delegate_contract (Contract): The deployed instance of the DelegateVotingApp contract, provided by the `delegate_contract` fixture.
+        deployer (Account): The account used to deploy the contract and give voting rights, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        scan_winner (Callable): Finds the winner by reading every proposal, provided by the `scan_winner` fixture.
+        seed (int): The seed of the random weights and operation sequence.
+    """
+    rng = random.Random(seed)
+    contract = delegate_contract
+    contract.addProposalBatch(["beach", "mountain", "city"], sender=deployer)
+    users = list(accounts)[1:]
+    rng.shuffle(users)
+    contract.giveRightToVoteBatch([(user, rng.randint(0, 3)) for user in users], sender=deployer)
+    for i, user in enumerate(users):
+        # A delegation must forward weight, so voters without any vote instead.
+        if i > 0 and rng.random() < 0.5 and contract.voters(user).weight > 0:
+            contract.delegate(rng.choice(users[:i]), sender=user)
+        else:
+            contract.vote(rng.randrange(3), sender=user)
+        assert contract.winningProposal() == scan_winner(contract)
+
+
+def test_maxProposals(delegate_contract, deployer):
+    """
+    Tests that `addProposal` of the `DelegateVotingApp` contract stops at the proposal cap given at deployment.
+
+    Args:
+        delegate_contract (Contract): The deployed instance of the DelegateVotingApp contract, provided by the `delegate_contract` fixture.
+        deployer (Account): The account used to deploy the contract and add proposals, provided by the `deployer` fixture.
+    """
+    contract = delegate_contract
+    assert contract.maxProposals() == 3
+    for name in ("beach", "mountain", "city"):
+        contract.addProposal(name, sender=deployer)
+    with pytest.raises(ContractLogicError):
+        contract.addProposal("desert", sender=deployer)
+
+
+def test_addProposalBatch_fail(delegate_contract, deployer, accounts):
+    """
+    Tests that `addProposalBatch` of the `DelegateVotingApp` contract is reserved to the chairperson and cannot overflow the proposal cap.
+
+    Args:
+        delegate_contract (Contract): The deployed instance of the DelegateVotingApp contract, provided by the `delegate_contract` fixture.
+        deployer (Account): The account used to deploy the contract and add proposals, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    contract = delegate_contract
+    with pytest.raises(ContractLogicError):
+        contract.addProposalBatch(["beach"], sender=accounts[1])
+    with pytest.raises(ContractLogicError):
+        contract.addProposalBatch(["beach", "mountain", "city", "desert"], sender=deployer)
+    contract.addProposalBatch(["beach", "mountain"], sender=deployer)
+    assert contract.amountProposals() == 2
+
+
+def test_delegate_chain_longer_than_4(delegate_contract, deployer, accounts):
+    """
+    Tests that weight delegated into a chain of more than four hops reaches the voter at the end of the chain instead of stopping on an intermediate delegate.
+
+    Args:
+        delegate_contract (Contract): The deployed instance of the DelegateVotingApp contract, provided by the `delegate_contract` fixture.
+        deployer (Account): The account used to deploy the contract and give voting rights, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    contract = delegate_contract
+    chain = [accounts[i] for i in range(1, 8)]
+    contract.giveRightToVoteBatch([(user, 1) for user in chain], sender=deployer)
+    for i in range(1, len(chain) - 1):
+        contract.delegate(chain[i + 1], sender=chain[i])
+    contract.delegate(chain[1], sender=chain[0])
+    assert contract.voters(chain[-1]).weight == len(chain)
+    for user in chain[:-1]:
+        assert contract.voters(user).weight == 0
+
+
+def test_delegate_cycle_fail(delegate_contract, deployer, accounts):
+    """
+    Tests that a delegation closing a cycle is rejected, so no weight can circulate without reaching a voter.
+
+    Args:
+        delegate_contract (Contract): The deployed instance of the DelegateVotingApp contract, provided by the `delegate_contract` fixture.
+        deployer (Account): The account used to deploy the contract and give voting rights, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    contract = delegate_contract
+    user1, user2, user3 = accounts[1], accounts[2], accounts[3]
+    contract.giveRightToVoteBatch([(user1, 1), (user2, 1), (user3, 1)], sender=deployer)
+    contract.delegate(user2, sender=user1)
+    contract.delegate(user3, sender=user2)
+    with pytest.raises(ContractLogicError):
+        contract.delegate(user1, sender=user3)
+    assert contract.voters(user3).weight == 3
+    assert contract.voters(user3).voted is False
+
+
+def test_delegate_beyond_max_hops(delegate_contract, deployer, accounts, make_accounts):
+    """
+    Tests that a delegation whose chain is longer than `MAX_DELEGATION_HOPS` reverts instead of stranding weight, and succeeds once `compressDelegation` has shortened the chain.
+
+    Args:
+        delegate_contract (Contract): The deployed instance of the DelegateVotingApp contract, provided by the `delegate_contract` fixture.
+        deployer (Account): The account used to deploy the contract and give voting rights, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        make_accounts (Callable): Generates funded accounts, provided by the `make_accounts` fixture.
+    """
+    contract = delegate_contract
+    chain = [accounts[1]] + make_accounts(MAX_DELEGATION_HOPS + 3)
+    contract.giveRightToVoteBatch([(user, 1) for user in chain], sender=deployer)
+    for i in range(1, len(chain) - 1):
+        contract.delegate(chain[i + 1], sender=chain[i])
+    with pytest.raises(ContractLogicError):
+        contract.delegate(chain[1], sender=chain[0])
+    contract.compressDelegation(chain[1], sender=deployer)
+    assert contract.compressDelegation.call(chain[1]) is True
+    contract.delegate(chain[1], sender=chain[0])
+    assert contract.voters(chain[-1]).weight == len(chain)
+
+
+@pytest.mark.parametrize("app", ["delegate_contract", "packed_contract"])
+def test_delegated_event(request, deployer, accounts, app):
+    """
+    Tests that the `Delegated` event names the direct delegate, the final delegate of the chain and the forwarded weight.
+
+    Args:
+        request (FixtureRequest): Used to look up the contract fixture named by `app`.
+        deployer (Account): The account used to deploy the contract and give voting rights, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        app (str): The fixture deploying the contract under test.
+    """
+    contract = request.getfixturevalue(app)
+    contract.addProposal("beach", sender=deployer)
+    for user in accounts[1:4]:
+        contract.giveRightToVote(user, 2, sender=deployer)
+    contract.delegate(accounts[3], sender=accounts[2])
+    receipt = contract.vote(0, sender=accounts[3])
+    assert receipt.events == [contract.Voted(voter=accounts[3], proposal=0, weight=4)]
+
+    receipt = contract.delegate(accounts[2], sender=accounts[1])
+    assert receipt.events == [
+        contract.Delegated(voter=accounts[1], to=accounts[2], delegate=accounts[3], weight=2)
+    ]
+    assert contract.proposals(0).voteCount == 6
@@ -0,0 +1,81 @@
+import random
+
+import pytest
+from ape.exceptions import ContractLogicError
+
+from voting.delegation import DelegationIndex
+from voting.indexer import TallyIndexer
+from voting.model import ZERO_ADDRESS
+
+
+def _walk(contract, address):
+    """
+    Follows `voters(address).delegate` on chain and returns the final delegate and the number of hops.
+    """
+    hops = 0
+    while (delegate := contract.voters(address).delegate) != ZERO_ADDRESS:
+        address, hops = delegate, hops + 1
+    return address, hops
+
+
+@pytest.mark.parametrize("seed", range(2))
+def test_index_matches_contract(election, accounts, seed):
+    """
+    Lets every voter vote or delegate at random and checks after each transaction that the incrementally synced index agrees with `getVotes` and the delegation chains on chain.
+
+    Args:
+        election (Contract): A seeded `DelegateVotingApp`, provided by the `election` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        seed (int): The seed of the random election.
+    """
+    rng = random.Random(seed)
+    users = list(accounts[1:])
+    indexer = TallyIndexer(election, tally=DelegationIndex())
+    index = indexer.tally
+    for user in rng.sample(users, len(users)):
+        try:
+            if rng.random() < 0.7:
+                election.delegate(rng.choice(users), sender=user)
+            else:
+                election.vote(rng.randrange(3), sender=user)
+        except ContractLogicError:
+            continue
+        indexer.sync()
+        for other in users:
+            final, hops = _walk(election, other.address)
+            assert index.effective_weight(other.address) == election.getVotes(other)
+            assert (index.final_delegate(other.address), index.depth(other.address)) == (final, hops)
+
+    powers = sorted(((-election.getVotes(u), u.address) for u in users if election.getVotes(u)))
+    assert index.top_delegates(3) == [(address, -power) for power, address in powers[:3]]
+    depths = [_walk(election, user.address)[1] for user in users]
+    assert index.depth_histogram() == {depth: depths.count(depth) for depth in sorted(set(depths))}
+
+
+def _delegate(index, voter, to):
+    # The `Delegated` event the contract emits: the final delegate and the forwarded weight.
+    args = {"voter": voter, "to": to, "delegate": index.final_delegate(to), "weight": index.effective_weight(voter)}
+    index.apply("Delegated", args)
+
+
+def test_index_links_trees():
+    """
+    Builds two chains out of order, joins them, and checks the final delegates, depths, weights and histogram, and that a cycle is rejected.
+    """
+    index = DelegationIndex()
+    names = [f"voter {i}" for i in range(8)]
+    for name in names:
+        index.apply("RightGranted", {"voter": name, "weight": 1})
+    # voter 0 <- voter 1 <- voter 2 <- voter 3 and voter 4 <- voter 5 <- voter 6 <- voter 7, then voter 0 -> voter 6.
+    for voter, to in [(2, 1), (1, 0), (3, 2), (7, 6), (5, 4), (6, 5), (0, 6)]:
+        _delegate(index, names[voter], names[to])
+
+    assert {index.final_delegate(name) for name in names} == {"voter 4"}
+    assert [index.depth(name) for name in names] == [3, 4, 5, 6, 0, 1, 2, 3]
+    assert index.top_delegates(2) == [("voter 4", 8)]
+    assert index.effective_weight("voter 0") == 0
+    assert index.depth_histogram() == {0: 1, 1: 1, 2: 1, 3: 2, 4: 1, 5: 1, 6: 1}
+    assert (index.final_delegate("stranger"), index.depth("stranger")) == ("stranger", 0)
+    with pytest.raises(ValueError):
+        _delegate(index, names[4], names[3])
+    assert "voter 4" not in index.delegates
@@ -0,0 +1,146 @@
+import pytest
+from ape.exceptions import ContractLogicError
+
+from voting.factory import MAX_ELECTION_PAGE_SIZE, create_election, list_elections
+
+ZERO_ADDRESS = "0x" + "0" * 40
+
+
+def test_clone_runs_an_election(factory, contract, accounts):
+    """
+    Tests that a `VotingApp` clone is chaired by its creator, has its own proposal cap and runs a whole election.
+
+    Args:
+        factory (Contract): The deployed `ElectionFactory`, provided by the `factory` fixture.
+        contract (Contract): The `VotingApp` implementation, provided by the `contract` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    chair = accounts[1]
+    election = create_election(factory, contract, 5, sender=chair)
+    assert election.address != contract.address
+    assert election.chairperson() == chair
+    assert election.maxProposals() == 5
+
+    election.addProposalBatch([f"proposal {i}" for i in range(5)], sender=chair)
+    with pytest.raises(ContractLogicError):
+        election.addProposal("sixth", sender=chair)
+    election.giveRightToVoteBatch([(accounts[2], 2), (accounts[3], 3)], sender=chair)
+    election.vote(4, sender=accounts[2])
+    election.vote(1, sender=accounts[3])
+    assert election.winningProposal() == 1
+    assert election.winnerName() == "proposal 1"
+    assert contract.amountProposals() == 0
+
+
+def test_delegate_clone(factory, delegate_contract, accounts):
+    """
+    Tests delegation on a `DelegateVotingApp` clone.
+
+    Args:
+        factory (Contract): The deployed `ElectionFactory`, provided by the `factory` fixture.
+        delegate_contract (Contract): The `DelegateVotingApp` implementation, provided by the `delegate_contract` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    chair = accounts[1]
+    election = create_election(factory, delegate_contract, 2, sender=chair)
+    election.addProposalBatch(["beach", "mountain"], sender=chair)
+    election.giveRightToVoteBatch([(accounts[2], 2), (accounts[3], 3), (accounts[4], 4)], sender=chair)
+    election.delegate(accounts[3], sender=accounts[2])
+    election.vote(1, sender=accounts[3])
+    election.vote(0, sender=accounts[4])
+    assert [election.proposals(i).voteCount for i in range(2)] == [4, 5]
+
+
+def test_clones_are_independent(factory, contract, accounts):
+    """
+    Tests that clones of the same implementation keep separate state.
+
+    Args:
+        factory (Contract): The deployed `ElectionFactory`, provided by the `factory` fixture.
+        contract (Contract): The `VotingApp` implementation, provided by the `contract` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    first = create_election(factory, contract, 3, sender=accounts[1])
+    second = create_election(factory, contract, 4, sender=accounts[2])
+    first.addProposal("beach", sender=accounts[1])
+    first.giveRightToVote(accounts[3], 1, sender=accounts[1])
+    assert (second.amountProposals(), second.voters(accounts[3]).weight) == (0, 0)
+    assert (second.chairperson(), second.maxProposals()) == (accounts[2].address, 4)
+    with pytest.raises(ContractLogicError):
+        second.addProposal("beach", sender=accounts[1])
+
+
+def test_initialize_only_once(factory, contract, delegate_contract, deployer, accounts):
+    """
+    Tests that neither a clone nor a directly deployed contract can be initialized again.
+
+    Args:
+        factory (Contract): The deployed `ElectionFactory`, provided by the `factory` fixture.
+        contract (Contract): The `VotingApp` implementation, provided by the `contract` fixture.
+        delegate_contract (Contract): The `DelegateVotingApp` implementation, provided by the `delegate_contract` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    election = create_election(factory, delegate_contract, 3, sender=accounts[1])
+    for target in (election, contract, delegate_contract):
+        with pytest.raises(ContractLogicError):
+            target.initialize(accounts[2], 10, sender=accounts[2])
+    assert election.chairperson() == accounts[1]
+    assert contract.chairperson() == deployer
+
+
+def test_createElection_rejects(factory, contract, packed_contract, accounts):
+    """
+    Tests that the factory only clones its registered implementations and rejects a zero proposal cap.
+
+    Args:
+        factory (Contract): The deployed `ElectionFactory`, provided by the `factory` fixture.
+        contract (Contract): The `VotingApp` implementation, provided by the `contract` fixture.
+        packed_contract (Contract): A `PackedDelegateVotingApp`, which is not registered, provided by the `packed_contract` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    assert factory.isImplementation(contract)
+    assert not factory.isImplementation(packed_contract)
+    with pytest.raises(ContractLogicError):
+        factory.createElection(packed_contract, 3, sender=accounts[1])
+    with pytest.raises(ContractLogicError):
+        factory.createElection(accounts[2], 3, sender=accounts[1])
+    with pytest.raises(ContractLogicError):
+        factory.createElection(contract, 0, sender=accounts[1])
+    assert factory.electionCount() == 0
+
+
+def test_registry(factory, contract, delegate_contract, accounts):
+    """
+    Tests the election registry, its `ElectionCreated` events and reading it page by page.
+
+    Args:
+        factory (Contract): The deployed `ElectionFactory`, provided by the `factory` fixture.
+        contract (Contract): The `VotingApp` implementation, provided by the `contract` fixture.
+        delegate_contract (Contract): The `DelegateVotingApp` implementation, provided by the `delegate_contract` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    assert list_elections(factory) == []
+    created = []
+    for i in range(5):
+        implementation = contract if i % 2 else delegate_contract
+        receipt = factory.createElection(implementation, i + 1, sender=accounts[1 + i])
+        (event,) = factory.ElectionCreated.from_receipt(receipt)
+        assert (event.implementation, event.chairperson, event.maxProposals) == (
+            implementation.address,
+            accounts[1 + i].address,
+            i + 1,
+        )
+        created.append(event.election)
+
+    assert factory.electionCount() == 5
+    assert [factory.elections(i) for i in range(5)] == created
+    assert [factory.implementationOf(a) for a in created[:2]] == [delegate_contract.address, contract.address]
+    assert factory.implementationOf(contract) == ZERO_ADDRESS
+    assert factory.getElections(3, 10) == created[3:]
+    assert factory.getElections(5, 10) == []
+    with pytest.raises(ContractLogicError):
+        factory.getElections(0, MAX_ELECTION_PAGE_SIZE + 1)
+    assert list_elections(factory, page_size=2) == created
+    with pytest.raises(ValueError):
+        list_elections(factory, page_size=0)
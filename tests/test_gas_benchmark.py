@@ -0,0 +1,475 @@
+import pytest
+from eth_utils import keccak, to_checksum_address
+
+from voting.attestation import tally_commitment
+from voting.commitreveal import commitment, new_salt, reveal_batches
+from voting.merkle import hash_pair, leaf_hash
+from voting.relayer import eip712_domain, sign_intent
+
+APPS = ["contract", "delegate_contract", "packed_contract"]
+DELEGATE_APPS = ["delegate_contract", "packed_contract"]
+
+
+@pytest.fixture(params=APPS)
+def app(request):
+    """
+    This fixture runs a benchmark once against each contract in `APPS`, or against the contracts named by an indirect parametrization.
+    """
+    return request.getfixturevalue(request.param)
+
+
+def _name(app, entry_point, scenario):
+    return f"{app.contract_type.name}.{entry_point}[{scenario}]"
+
+
+def _address(i):
+    return to_checksum_address(f"0x{i + 1:040x}")
+
+
+def test_gas_addProposal(app, deployer, gas_check):
+    """
+    Benchmarks `addProposal` for the first proposal and for a proposal added after it.
+
+    Args:
+        app (Contract): The deployed contract under benchmark, provided by the `app` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        gas_check (Callable): Checks a receipt against the gas baseline, provided by the `gas_check` fixture.
+    """
+    gas_check(_name(app, "addProposal", "first"), app.addProposal("beach", sender=deployer))
+    gas_check(_name(app, "addProposal", "next"), app.addProposal("mountain", sender=deployer))
+
+
+def test_gas_giveRightToVote(app, deployer, accounts, gas_check):
+    """
+    Benchmarks `giveRightToVote` for the first voter, whose grant writes `voterCount` from zero, and for the next one, whose grant updates a nonzero `voterCount`. Every transaction starts with cold storage, so both scenarios read their slots cold.
+
+    Args:
+        app (Contract): The deployed contract under benchmark, provided by the `app` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        gas_check (Callable): Checks a receipt against the gas baseline, provided by the `gas_check` fixture.
+    """
+    gas_check(
+        _name(app, "giveRightToVote", "first"),
+        app.giveRightToVote(accounts[1], 10, sender=deployer),
+    )
+    gas_check(
+        _name(app, "giveRightToVote", "next"),
+        app.giveRightToVote(accounts[2], 10, sender=deployer),
+    )
+
+
+def test_gas_vote(app, deployer, accounts, gas_check):
+    """
+    Benchmarks `vote` for the first vote on a proposal, which writes its vote count from zero, and for the next vote on the same proposal, which updates a nonzero vote count.
+
+    Args:
+        app (Contract): The deployed contract under benchmark, provided by the `app` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        gas_check (Callable): Checks a receipt against the gas baseline, provided by the `gas_check` fixture.
+    """
+    app.addProposal("beach", sender=deployer)
+    app.giveRightToVote(accounts[1], 10, sender=deployer)
+    app.giveRightToVote(accounts[2], 10, sender=deployer)
+    gas_check(_name(app, "vote", "first"), app.vote(0, sender=accounts[1]))
+    gas_check(_name(app, "vote", "next"), app.vote(0, sender=accounts[2]))
+
+
+@pytest.mark.parametrize("num_proposals", [1, 2, 3])
+def test_gas_winner(app, deployer, accounts, gas_check, num_proposals):
+    """
+    Benchmarks the `winningProposal` and `winnerName` (`winnerNameHash` on the packed layout) views with 1 to N proposals, each holding votes. The views are sent as transactions so the receipt reports the exact gas an on-chain caller would pay.
+
+    Args:
+        app (Contract): The deployed contract under benchmark, provided by the `app` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        gas_check (Callable): Checks a receipt against the gas baseline, provided by the `gas_check` fixture.
+        num_proposals (int): The number of proposals on the ballot.
+    """
+    for i in range(num_proposals):
+        app.addProposal(f"proposal {i}", sender=deployer)
+        app.giveRightToVote(accounts[i + 1], i + 1, sender=deployer)
+        app.vote(i, sender=accounts[i + 1])
+    scenario = f"proposals={num_proposals}"
+    gas_check(
+        _name(app, "winningProposal", scenario),
+        app.winningProposal.transact(sender=deployer),
+    )
+    name_view = "winnerNameHash" if app.contract_type.name == "PackedDelegateVotingApp" else "winnerName"
+    gas_check(_name(app, name_view, scenario), getattr(app, name_view).transact(sender=deployer))
+
+
+@pytest.mark.parametrize("app", DELEGATE_APPS, indirect=True)
+@pytest.mark.parametrize("depth", [1, 2, 3, 4, 5])
+def test_gas_delegate(app, deployer, accounts, gas_check, depth):
+    """
+    Benchmarks `delegate` when the delegated weight has to travel `depth` hops before reaching a voter who has not delegated.
+
+    Args:
+        app (Contract): The deployed `DelegateVotingApp` or `PackedDelegateVotingApp` instance, provided by the `app` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        gas_check (Callable): Checks a receipt against the gas baseline, provided by the `gas_check` fixture.
+        depth (int): The length of the delegation chain walked by the measured call.
+    """
+    chain = [accounts[i + 1] for i in range(depth + 1)]
+    for user in chain:
+        app.giveRightToVote(user, 1, sender=deployer)
+    for i in range(depth - 1, 0, -1):
+        app.delegate(chain[i + 1], sender=chain[i])
+    receipt = app.delegate(chain[1], sender=chain[0])
+    assert app.voters(chain[-1]).weight == depth + 1
+    gas_check(_name(app, "delegate", f"depth={depth}"), receipt)
+
+
+@pytest.mark.parametrize("app", DELEGATE_APPS, indirect=True)
+def test_gas_delegate_to_voted(app, deployer, accounts, gas_check):
+    """
+    Benchmarks `delegate` to a voter who already voted, which forwards the weight straight into the proposal's vote count.
+
+    Args:
+        app (Contract): The deployed `DelegateVotingApp` or `PackedDelegateVotingApp` instance, provided by the `app` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        gas_check (Callable): Checks a receipt against the gas baseline, provided by the `gas_check` fixture.
+    """
+    app.addProposal("beach", sender=deployer)
+    app.giveRightToVote(accounts[1], 1, sender=deployer)
+    app.giveRightToVote(accounts[2], 1, sender=deployer)
+    app.vote(0, sender=accounts[1])
+    receipt = app.delegate(accounts[1], sender=accounts[2])
+    assert app.proposals(0).voteCount == 2
+    gas_check(_name(app, "delegate", "voted"), receipt)
+
+
+@pytest.mark.parametrize("size", [1, 10, 100])
+def test_gas_giveRightToVoteBatch(app, deployer, accounts, gas_check, size):
+    """
+    Benchmarks `giveRightToVoteBatch` for `size` fresh voters and checks that a batch is cheaper per voter than registering the same voters one call at a time.
+
+    Args:
+        app (Contract): The deployed contract under benchmark, provided by the `app` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        gas_check (Callable): Checks a receipt against the gas baseline, provided by the `gas_check` fixture.
+        size (int): The number of voters in the batch.
+    """
+    app.giveRightToVote(accounts[1], 1, sender=deployer)
+    single = app.giveRightToVote(accounts[2], 1, sender=deployer).gas_used
+    batch = [(_address(i), 1) for i in range(size)]
+    gas = gas_check(
+        _name(app, "giveRightToVoteBatch", f"size={size}"),
+        app.giveRightToVoteBatch(batch, sender=deployer),
+    )
+    assert app.voterCount() == size + 2
+    if size > 1:
+        assert gas / size < single
+
+
+@pytest.mark.parametrize("app", ["contract", "delegate_contract"], indirect=True)
+@pytest.mark.parametrize("depth", [1, 8, 16, 24, 32])
+def test_gas_claimAndVote(app, deployer, accounts, gas_check, depth):
+    """
+    Benchmarks `claimAndVote` with a proof of `depth` siblings. The root is folded from the voter's leaf and random siblings, which is a valid proof without building a tree of 2**depth voters.
+
+    Args:
+        app (Contract): The deployed contract under benchmark, provided by the `app` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        gas_check (Callable): Checks a receipt against the gas baseline, provided by the `gas_check` fixture.
+        depth (int): The length of the proof.
+    """
+    user = accounts[1]
+    proof = [keccak(i.to_bytes(32, "big")) for i in range(depth)]
+    root = leaf_hash(user.address, 5)
+    for node in proof:
+        root = hash_pair(root, node)
+    app.addProposal("beach", sender=deployer)
+    app.setVoterRoot(root, sender=deployer)
+    receipt = app.claimAndVote(0, 5, proof, sender=user)
+    assert app.proposals(0).voteCount == 5
+    gas_check(_name(app, "claimAndVote", f"depth={depth}"), receipt)
+
+
+@pytest.mark.parametrize("num_proposals", [3, 10, 100, 1000])
+@pytest.mark.parametrize("app_name", ["VotingApp", "DelegateVotingApp", "PackedDelegateVotingApp"])
+def test_gas_proposal_scaling(project, deployer, accounts, gas_check, app_name, num_proposals):
+    """
+    Benchmarks a ballot of `num_proposals` proposals: adding the last proposal, voting for it and reading the winner must not grow with the number of proposals.
+
+    Args:
+        project (Project): The ape project, provided by the `project` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        gas_check (Callable): Checks a receipt against the gas baseline, provided by the `gas_check` fixture.
+        app_name (str): The contract to deploy.
+        num_proposals (int): The proposal cap and the number of proposals added.
+    """
+    app = deployer.deploy(getattr(project, app_name), num_proposals)
+    names = [f"proposal {i}" for i in range(num_proposals - 1)]
+    for start in range(0, len(names), 100):
+        app.addProposalBatch(names[start : start + 100], sender=deployer)
+    scenario = f"proposals={num_proposals}"
+    gas_check(_name(app, "addProposal", scenario), app.addProposal("last", sender=deployer))
+    app.giveRightToVote(accounts[1], 1, sender=deployer)
+    gas_check(_name(app, "vote", scenario), app.vote(num_proposals - 1, sender=accounts[1]))
+    assert app.winningProposal() == num_proposals - 1
+    gas_check(
+        _name(app, "winningProposal", scenario),
+        app.winningProposal.transact(sender=deployer),
+    )
+
+
+def test_gas_addProposalBatch(app, project, deployer, gas_check):
+    """
+    Benchmarks `addProposalBatch` with a full batch of 100 proposals on a fresh ballot.
+
+    Args:
+        app (Contract): The deployed contract under benchmark, provided by the `app` fixture.
+        project (Project): The ape project, provided by the `project` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        gas_check (Callable): Checks a receipt against the gas baseline, provided by the `gas_check` fixture.
+    """
+    app = deployer.deploy(getattr(project, app.contract_type.name), 100)
+    receipt = app.addProposalBatch([f"proposal {i}" for i in range(100)], sender=deployer)
+    assert app.amountProposals() == 100
+    gas_check(_name(app, "addProposalBatch", "size=100"), receipt)
+
+
+def test_gas_packed_layout(delegate_contract, packed_contract, deployer, accounts):
+    """
+    Compares the packed storage layout with `DelegateVotingApp` on the same registration, delegation and vote, and checks the packed layout is cheaper for each.
+
+    Args:
+        delegate_contract (Contract): The deployed instance of the `DelegateVotingApp` contract, provided by the `delegate_contract` fixture.
+        packed_contract (Contract): The deployed instance of the `PackedDelegateVotingApp` contract, provided by the `packed_contract` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    gas = {}
+    for app in (delegate_contract, packed_contract):
+        app.addProposal("beach", sender=deployer)
+        gas[app.contract_type.name] = [
+            app.giveRightToVote(accounts[1], 1, sender=deployer).gas_used,
+            app.giveRightToVote(accounts[2], 1, sender=deployer).gas_used,
+            app.delegate(accounts[1], sender=accounts[2]).gas_used,
+            app.vote(0, sender=accounts[1]).gas_used,
+        ]
+    for unpacked, packed in zip(gas["DelegateVotingApp"], gas["PackedDelegateVotingApp"]):
+        assert packed < unpacked
+
+
+@pytest.mark.parametrize("app", DELEGATE_APPS, indirect=True)
+@pytest.mark.parametrize("depth", [5, 10, 20, 50])
+def test_gas_delegate_long_chain(app, deployer, accounts, make_accounts, gas_check, depth):
+    """
+    Benchmarks delegating into a chain of `depth` hops that was built front to back, so no shortcut exists yet. Chains longer than `MAX_DELEGATION_HOPS` first need `compressDelegation` calls; their gas is included. A second delegation into the same chain then shows the cost once the path is compressed.
+
+    Args:
+        app (Contract): The deployed `DelegateVotingApp` or `PackedDelegateVotingApp` instance, provided by the `app` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        make_accounts (Callable): Generates funded accounts, provided by the `make_accounts` fixture.
+        gas_check (Callable): Checks a receipt against the gas baseline, provided by the `gas_check` fixture.
+        depth (int): The number of hops between the measured delegator and the end of the chain.
+    """
+    first, second = accounts[1], accounts[2]
+    chain = make_accounts(depth)
+    app.giveRightToVoteBatch([(user, 1) for user in [first, second] + chain], sender=deployer)
+    for i in range(len(chain) - 1):
+        app.delegate(chain[i + 1], sender=chain[i])
+
+    gas = 0
+    while not app.compressDelegation.call(chain[0]):
+        gas += app.compressDelegation(chain[0], sender=deployer).gas_used
+    gas += app.delegate(chain[0], sender=first).gas_used
+    gas_check(_name(app, "delegate", f"chain={depth},uncompressed"), gas)
+    gas_check(
+        _name(app, "delegate", f"chain={depth},compressed"),
+        app.delegate(chain[0], sender=second),
+    )
+    assert app.voters(chain[-1]).weight == depth + 2
+
+
+def test_gas_commitVote(commit_reveal_contract, deployer, accounts, gas_check):
+    """
+    Benchmarks `commitVote` for a voter's first commitment and for replacing it.
+
+    Args:
+        commit_reveal_contract (Contract): The deployed `CommitRevealVotingApp`, provided by the `commit_reveal_contract` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        gas_check (Callable): Checks a receipt against the gas baseline, provided by the `gas_check` fixture.
+    """
+    app = commit_reveal_contract
+    app.addProposal("beach", sender=deployer)
+    app.giveRightToVote(accounts[1], 10, sender=deployer)
+    gas_check(
+        _name(app, "commitVote", "first"),
+        app.commitVote(commitment(accounts[1].address, 0, new_salt()), sender=accounts[1]),
+    )
+    gas_check(
+        _name(app, "commitVote", "replace"),
+        app.commitVote(commitment(accounts[1].address, 0, new_salt()), sender=accounts[1]),
+    )
+
+
+@pytest.mark.parametrize("size", [1, 10, 100])
+def test_gas_revealBatch(commit_reveal_contract, deployer, accounts, make_accounts, gas_check, size):
+    """
+    Benchmarks `revealBatch` for `size` voters spread over three proposals and checks that a batch costs less per voter than each voter calling `revealVote`.
+
+    Args:
+        commit_reveal_contract (Contract): The deployed `CommitRevealVotingApp`, provided by the `commit_reveal_contract` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        make_accounts (Callable): Generates funded accounts, provided by the `make_accounts` fixture.
+        gas_check (Callable): Checks a receipt against the gas baseline, provided by the `gas_check` fixture.
+        size (int): The number of reveals in the batch.
+    """
+    app = commit_reveal_contract
+    app.addProposalBatch(["beach", "mountain", "city"], sender=deployer)
+    single, users = accounts[1], make_accounts(size)
+    app.giveRightToVoteBatch([(user, 1) for user in [single] + users], sender=deployer)
+    single_salt = new_salt()
+    app.commitVote(commitment(single.address, 0, single_salt), sender=single)
+    reveals = []
+    for i, user in enumerate(users):
+        salt = new_salt()
+        app.commitVote(commitment(user.address, i % 3, salt), sender=user)
+        reveals.append((user.address, i % 3, salt))
+    app.startReveal(sender=deployer)
+
+    # Make the vote counts nonzero, as they are for every reveal but the first.
+    once = gas_check(_name(app, "revealVote", "first"), app.revealVote(0, single_salt, sender=single))
+    (batch,) = reveal_batches(reveals)
+    gas = gas_check(_name(app, "revealBatch", f"size={size}"), app.revealBatch(batch, sender=deployer))
+    assert [app.proposals(i).voteCount for i in range(3)] == [1 + len(range(0, size, 3)), len(range(1, size, 3)), len(range(2, size, 3))]
+    if size > 1:
+        assert gas / size < once
+
+
+@pytest.mark.parametrize("app", ["contract", "delegate_contract"], indirect=True)
+def test_gas_createElection(app, factory, project, deployer, accounts, gas_check):
+    """
+    Benchmarks creating 100 elections as minimal proxy clones through `ElectionFactory` against deploying the contract 100 times, and the extra gas a vote pays for going through a clone.
+
+    Args:
+        app (Contract): The implementation the factory clones, provided by the `app` fixture.
+        factory (Contract): The deployed `ElectionFactory`, provided by the `factory` fixture.
+        project (Project): The ape project, provided by the `project` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        gas_check (Callable): Checks a receipt against the gas baseline, provided by the `gas_check` fixture.
+    """
+    container = getattr(project, app.contract_type.name)
+    plain = sum(deployer.deploy(container, 3).receipt.gas_used for _ in range(100))
+    clones = [factory.createElection(app, 3, sender=deployer) for _ in range(100)]
+    cloned = sum(receipt.gas_used for receipt in clones)
+    gas_check(_name(app, "deploy", "elections=100"), plain)
+    gas_check(_name(factory, "createElection", f"{app.contract_type.name},elections=100"), cloned)
+    assert cloned * 5 < plain
+
+    (created,) = factory.ElectionCreated.from_receipt(clones[-1])
+    election = container.at(created.election)
+    for target in (app, election):
+        target.addProposal("beach", sender=deployer)
+        target.giveRightToVote(accounts[1], 1, sender=deployer)
+        target.giveRightToVote(accounts[2], 1, sender=deployer)
+        target.vote(0, sender=accounts[1])
+    gas_check(_name(app, "vote", "clone"), election.vote(0, sender=accounts[2]))
+
+
+@pytest.mark.parametrize("kind", ["votes", "delegations"])
+@pytest.mark.parametrize("size", [1, 10, 100])
+def test_gas_relayBatch(delegate_contract, deployer, accounts, gas_check, kind, size):
+    """
+    Benchmarks relaying `size` signed votes or delegations in one `relayBatch` call and compares the gas per intent with voters sending `vote` or `delegate` themselves. Delegations go to a voter who has not voted.
+
+    Args:
+        delegate_contract (Contract): The deployed instance of the `DelegateVotingApp` contract, provided by the `delegate_contract` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        gas_check (Callable): Checks a receipt against the gas baseline, provided by the `gas_check` fixture.
+        kind (str): Whether the intents are votes or delegations.
+        size (int): The number of intents in the batch.
+    """
+    app = delegate_contract
+    app.addProposal("beach", sender=deployer)
+    signers = [accounts.generate_test_account() for _ in range(size)]
+    app.giveRightToVoteBatch([(user, 1) for user in accounts[1:4] + signers], sender=deployer)
+    domain = eip712_domain(app)
+    if kind == "votes":
+        intents = [sign_intent(user, app, proposal=0, domain=domain) for user in signers]
+        app.vote(0, sender=accounts[1])
+        direct = app.vote(0, sender=accounts[2]).gas_used
+    else:
+        intents = [sign_intent(user, app, to=accounts[3], domain=domain) for user in signers]
+        direct = app.delegate(accounts[3], sender=accounts[2]).gas_used
+
+    gas = gas_check(
+        _name(app, "relayBatch", f"{kind}={size}"),
+        app.relayBatch([intent.as_tuple() for intent in intents], sender=deployer),
+    )
+    if size > 1:
+        assert gas / size < direct
+
+
+@pytest.mark.parametrize("checkpoints", [1, 1000])
+def test_gas_getPastVotes(delegate_contract, deployer, accounts, chain, gas_check, checkpoints):
+    """
+    Benchmarks `getPastVotes` for an address with 1 or 1000 voting power checkpoints, looked up at the block of the middle checkpoint and sent as a transaction. Each checkpoint after the first is a relayed delegation in its own block. `getVotes` is measured for comparison, since it reads the latest checkpoint directly.
+
+    Args:
+        delegate_contract (Contract): The deployed instance of the `DelegateVotingApp` contract, provided by the `delegate_contract` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        chain (ChainManager): The `chain` fixture of ape.
+        gas_check (Callable): Checks a receipt against the gas baseline, provided by the `gas_check` fixture.
+        checkpoints (int): The number of checkpoints of the looked up address.
+    """
+    app = delegate_contract
+    target = accounts[1]
+    signers = [accounts.generate_test_account() for _ in range(checkpoints - 1)]
+    voters = [(target, 1)] + [(user, 1) for user in signers]
+    for start in range(0, len(voters), 200):
+        app.giveRightToVoteBatch(voters[start : start + 200], sender=deployer)
+    domain = eip712_domain(app)
+    for user in signers:
+        app.relayBatch([sign_intent(user, app, to=target, domain=domain).as_tuple()], sender=deployer)
+    chain.mine()
+    assert app.numCheckpoints(target) == checkpoints
+
+    middle = app.checkpoints(target, checkpoints // 2)
+    assert app.getPastVotes(target, middle.fromBlock) == middle.votes
+    scenario = f"checkpoints={checkpoints}"
+    gas = gas_check(_name(app, "getPastVotes", scenario), app.getPastVotes.transact(target, middle.fromBlock, sender=deployer))
+    latest = gas_check(_name(app, "getVotes", scenario), app.getVotes.transact(target, sender=deployer))
+    assert latest <= gas
+
+
+@pytest.mark.parametrize("app", ["contract", "delegate_contract"], indirect=True)
+@pytest.mark.parametrize("num_proposals", [3, 100, 1000])
+def test_gas_finalize(app, project, deployer, accounts, gas_check, num_proposals):
+    """
+    Benchmarks `finalize` hashing a ballot of `num_proposals` proposals in a single call, which grows linearly with the ballot.
+
+    Args:
+        app (Contract): The deployed contract under benchmark, provided by the `app` fixture.
+        project (Project): The ape project, provided by the `project` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        gas_check (Callable): Checks a receipt against the gas baseline, provided by the `gas_check` fixture.
+        num_proposals (int): The proposal cap and the number of proposals added.
+    """
+    app = deployer.deploy(getattr(project, app.contract_type.name), num_proposals)
+    names = [f"proposal {i}" for i in range(num_proposals)]
+    for start in range(0, num_proposals, 100):
+        app.addProposalBatch(names[start : start + 100], sender=deployer)
+    app.giveRightToVote(accounts[1], 1, sender=deployer)
+    app.vote(num_proposals - 1, sender=accounts[1])
+    receipt = app.finalize(num_proposals, sender=deployer)
+    assert app.tallyCommitment() == tally_commitment((name, int(name == names[-1])) for name in names)
+    gas_check(_name(app, "finalize", f"proposals={num_proposals}"), receipt)
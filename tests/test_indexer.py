@@ -0,0 +1,109 @@
+import random
+
+import pytest
+from ape.exceptions import ContractLogicError
+
+from voting.indexer import SQLiteTally, Tally, TallyIndexer
+
+
+def _run_election(contract, users, seed, delegation=True):
+    """
+    Lets every user of a seeded election vote or delegate at random.
+    """
+    rng = random.Random(seed)
+    for user in rng.sample(users, len(users)):
+        try:
+            if delegation and rng.random() < 0.5:
+                contract.delegate(rng.choice(users), sender=user)
+            else:
+                contract.vote(rng.randrange(3), sender=user)
+        except ContractLogicError:
+            pass
+
+
+def _assert_matches_contract(tally, contract, users):
+    for i in range(contract.amountProposals()):
+        assert tally.vote_counts[i] == contract.proposals(i).voteCount
+    assert tally.winning_proposal() == contract.winningProposal()
+    for user in users:
+        voter = contract.voters(user)
+        assert tally.weights.get(user.address, 0) == voter.weight
+        if hasattr(voter, "delegate") and voter.delegate != "0x" + "0" * 40:
+            assert tally.delegates[user.address] == voter.delegate
+
+
+@pytest.mark.parametrize(
+    "election",
+    [("VotingApp", 3, 9), ("DelegateVotingApp", 3, 9), ("PackedDelegateVotingApp", 3, 9)],
+    indirect=True,
+)
+@pytest.mark.parametrize("seed", range(2))
+def test_indexer_matches_contract(election, accounts, seed):
+    """
+    Runs a random election and checks that the tally rebuilt from the events, including the seeding, matches the contract state.
+
+    Args:
+        election (Contract): An election with three proposals and nine registered voters, provided by the `election` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        seed (int): The seed of the random election.
+    """
+    users = list(accounts[1:])
+    _run_election(election, users, seed, delegation=hasattr(election, "delegate"))
+
+    indexer = TallyIndexer(election, block_range=3)
+    assert indexer.sync() > 0
+    _assert_matches_contract(indexer.tally, election, users)
+    assert indexer.tally.names == {0: "proposal 0", 1: "proposal 1", 2: "proposal 2"}
+
+
+def test_indexer_incremental_sync(delegate_contract, deployer, accounts):
+    """
+    Checks that a second `sync` only applies the events emitted since the first one.
+
+    Args:
+        delegate_contract (Contract): The deployed `DelegateVotingApp` contract instance.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    indexer = TallyIndexer(delegate_contract)
+    delegate_contract.addProposal("A", sender=deployer)
+    delegate_contract.giveRightToVote(accounts[1], 2, sender=deployer)
+    delegate_contract.giveRightToVote(accounts[2], 3, sender=deployer)
+    assert indexer.sync() == 3
+
+    delegate_contract.vote(0, sender=accounts[2])
+    delegate_contract.delegate(accounts[2], sender=accounts[1])
+    assert indexer.sync() == 2
+    assert indexer.sync() == 0
+    assert indexer.tally.vote_counts == {0: 5}
+    assert indexer.tally.delegation_chain(accounts[1].address) == [accounts[2].address]
+
+
+def test_sqlite_tally_resumes_from_checkpoint(election, accounts, chain, tmp_path):
+    """
+    Indexes part of an election into SQLite, reopens the database and checks that the resumed index matches a full in-memory one.
+
+    Args:
+        election (Contract): A seeded `DelegateVotingApp`, provided by the `election` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        chain (ChainManager): The `chain` fixture of ape.
+        tmp_path (Path): The pytest temporary directory.
+    """
+    users = list(accounts[1:])
+    _run_election(election, users, seed=0)
+    head = chain.blocks.height
+    path = str(tmp_path / "tally.db")
+
+    first = TallyIndexer(election, SQLiteTally(path), block_range=2)
+    first.sync(stop_block=head - 4)
+    first.tally.close()
+
+    resumed = TallyIndexer(election, SQLiteTally(path), block_range=2)
+    assert resumed.tally.block == head - 4
+    resumed.sync()
+
+    full = TallyIndexer(election, Tally())
+    full.sync()
+    for attribute in ("names", "vote_counts", "weights", "votes", "delegates"):
+        assert getattr(resumed.tally, attribute) == getattr(full.tally, attribute)
+    _assert_matches_contract(resumed.tally, election, users)
@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+from voting.loadsim import (
+    DELEGATE,
+    VOTE,
+    check_tallies,
+    new_model,
+    percentile,
+    plan_operations,
+    replay,
+    run_operations,
+    summarize,
+)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_plan_operations(seed):
+    """
+    Tests that every voter acts once and that delegations only point at voters acting earlier, so they cannot form a cycle.
+
+    Args:
+        seed (int): The seed of the plan.
+    """
+    operations = plan_operations(50, 4, random.Random(seed), delegate_share=0.6)
+    assert sorted(op.sender for op in operations) == list(range(50))
+    acted = set()
+    for op in operations:
+        if op.kind == DELEGATE:
+            assert op.target in acted
+        else:
+            assert op.kind == VOTE and 0 <= op.target < 4
+        acted.add(op.sender)
+    assert {op.kind for op in operations} == {VOTE, DELEGATE}
+
+
+def test_plan_operations_without_delegation():
+    """
+    Tests that a delegate share of zero plans only votes, as needed for a `VotingApp`.
+    """
+    operations = plan_operations(20, 3, random.Random(0), delegate_share=0.0)
+    assert {op.kind for op in operations} == {VOTE}
+
+
+def test_percentile():
+    """
+    Tests the nearest-rank percentile.
+    """
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([3.0], 90) == 3.0
+    assert percentile([], 50) == 0.0
+
+
+@pytest.mark.parametrize("app", ["delegate_contract", "packed_contract"])
+def test_simulated_election_matches_model(request, deployer, make_accounts, app):
+    """
+    Runs a small simulated election with concurrent senders and checks the report and the tallies against the model.
+
+    Args:
+        request (FixtureRequest): Used to look up the contract fixture named by `app`.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        make_accounts (function): Generates funded voter accounts, provided by the `make_accounts` fixture.
+        app (str): The fixture deploying the contract under test.
+    """
+    contract = request.getfixturevalue(app)
+    rng = random.Random(1)
+    names = ["beach", "mountain", "city"]
+    contract.addProposalBatch(names, sender=deployer)
+    voters = make_accounts(12)
+    registrations = [(voter.address, rng.randint(1, 9)) for voter in voters]
+    contract.giveRightToVoteBatch(registrations, sender=deployer)
+
+    operations = plan_operations(len(voters), len(names), rng, delegate_share=0.5)
+    outcomes, seconds = run_operations(contract, voters, operations, concurrency=3)
+    report = summarize(outcomes, seconds)
+    assert report.transactions == 12
+    assert report.failed == 0
+    assert report.gas_used == sum(outcome.receipt.gas_used for outcome in outcomes)
+    assert report.latencies[50] <= report.latencies[99]
+    assert report.queueing[50] <= report.queueing[99]
+    assert all(outcome.latency > 0 and outcome.queued >= 0 for outcome in outcomes)
+
+    model = new_model(deployer.address, names, registrations)
+    replay(model, voters, outcomes)
+    assert check_tallies(model, contract) == []
+    assert sum(p.voteCount for p in model.proposals) == sum(weight for _, weight in registrations)
@@ -0,0 +1,192 @@
+import pytest
+from ape.exceptions import ContractLogicError
+from eth_utils import to_checksum_address
+
+from voting.merkle import MerkleTree, hash_pair, leaf_hash, verify_proof
+
+
+def _voters(n):
+    return [(to_checksum_address(f"0x{i + 1:040x}"), i % 7 + 1) for i in range(n)]
+
+
+def _naive_root(leaves):
+    while len(leaves) > 1:
+        leaves = [
+            hash_pair(leaves[i], leaves[i + 1]) if i + 1 < len(leaves) else leaves[i]
+            for i in range(0, len(leaves), 2)
+        ]
+    return leaves[0]
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 7, 8, 9, 1000, 5000])
+def test_build_and_proofs(tmp_path, n):
+    """
+    Tests that the on-disk tree has the same root as an in-memory fold and that every streamed proof verifies.
+
+    Args:
+        tmp_path (Path): A temporary directory provided by pytest.
+        n (int): The number of voters.
+    """
+    voters = _voters(n)
+    tree = MerkleTree.build(iter(voters), tmp_path)
+    assert tree.size == n
+    assert tree.root == _naive_root([leaf_hash(*v) for v in voters])
+    for i, (address, weight, proof) in enumerate(tree.proofs(voters)):
+        assert len(proof) <= tree.depth
+        assert verify_proof(leaf_hash(address, weight), proof, tree.root)
+        if i % 97 == 0:
+            assert tree.proof(i) == proof
+    assert not verify_proof(leaf_hash(voters[0][0], voters[0][1] + 1), tree.proof(0), tree.root)
+
+
+def test_build_empty(tmp_path):
+    """
+    Tests that building a tree without voters is rejected.
+
+    Args:
+        tmp_path (Path): A temporary directory provided by pytest.
+    """
+    with pytest.raises(ValueError):
+        MerkleTree.build([], tmp_path)
+
+
+def test_rebuild_smaller_tree(tmp_path):
+    """
+    Tests that rebuilding a tree with fewer voters in the same directory drops the levels of the earlier, deeper tree.
+
+    Args:
+        tmp_path (Path): A temporary directory provided by pytest.
+    """
+    MerkleTree.build(_voters(9), tmp_path)
+    voters = _voters(2)
+    tree = MerkleTree.build(voters, tmp_path)
+    assert (tree.size, tree.depth) == (2, 1)
+    assert MerkleTree(tmp_path).root == _naive_root([leaf_hash(*v) for v in voters])
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["level_0.bin", "level_1.bin"]
+
+
+@pytest.fixture
+def voter_tree(tmp_path, accounts):
+    """
+    This fixture builds a voter tree over accounts 1 to 4 with weights 1 to 4.
+    """
+    voters = [(accounts[i].address, i) for i in range(1, 5)]
+    return MerkleTree.build(voters, tmp_path), dict(voters)
+
+
+def test_claimAndVote(contract, deployer, accounts, voter_tree):
+    """
+    Tests that `claimAndVote` of the `VotingApp` contract credits the weight proven against the root, once.
+
+    Args:
+        contract (Contract): The deployed instance of the `VotingApp` contract, provided by the `contract` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        voter_tree (tuple): The tree and the weight of each voter, provided by the `voter_tree` fixture.
+    """
+    tree, weights = voter_tree
+    contract.addProposal("beach", sender=deployer)
+    with pytest.raises(ContractLogicError):
+        contract.setVoterRoot(tree.root, sender=accounts[1])
+    contract.setVoterRoot(tree.root, sender=deployer)
+    user = accounts[3]
+    proof = tree.proof(2)
+    with pytest.raises(ContractLogicError):
+        contract.claimAndVote(0, weights[user.address] + 1, proof, sender=user)
+    contract.claimAndVote(0, weights[user.address], proof, sender=user)
+    assert contract.proposals(0).voteCount == 3
+    assert contract.voterCount() == 1
+    assert contract.voters(user).voted is True
+    with pytest.raises(ContractLogicError):
+        contract.claimAndVote(0, weights[user.address], proof, sender=user)
+
+
+def test_claimAndVote_without_root(contract, deployer, accounts):
+    """
+    Tests that claims are rejected while no voter root is set, even with an empty proof.
+
+    Args:
+        contract (Contract): The deployed instance of the `VotingApp` contract, provided by the `contract` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    contract.addProposal("beach", sender=deployer)
+    with pytest.raises(ContractLogicError):
+        contract.claimAndVote(0, 0, [], sender=accounts[1])
+
+
+def test_claimAndDelegate(delegate_contract, deployer, accounts, voter_tree):
+    """
+    Tests that `claimAndDelegate` of the `DelegateVotingApp` contract forwards the claimed weight, and that weight delegated to a voter before their own claim is kept.
+
+    Args:
+        delegate_contract (Contract): The deployed instance of the `DelegateVotingApp` contract, provided by the `delegate_contract` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        voter_tree (tuple): The tree and the weight of each voter, provided by the `voter_tree` fixture.
+    """
+    tree, _ = voter_tree
+    contract = delegate_contract
+    contract.addProposal("beach", sender=deployer)
+    contract.addProposal("mountain", sender=deployer)
+    contract.setVoterRoot(tree.root, sender=deployer)
+    contract.claimAndDelegate(accounts[1], 4, tree.proof(3), sender=accounts[4])
+    assert contract.voters(accounts[1]).weight == 4
+    contract.claimAndVote(1, 1, tree.proof(0), sender=accounts[1])
+    assert contract.proposals(1).voteCount == 5
+    assert contract.voterCount() == 2
+    contract.claimAndDelegate(accounts[1], 2, tree.proof(1), sender=accounts[2])
+    assert contract.proposals(1).voteCount == 7
+    assert contract.winnerName() == "mountain"
+
+
+@pytest.mark.parametrize("app", ["contract", "delegate_contract"])
+def test_claim_rejected_after_grant(request, app, deployer, accounts, voter_tree):
+    """
+    Tests that a voter granted weight with `giveRightToVote` cannot claim the weight of the root on top of it, and can still vote with the granted weight alone.
+
+    Args:
+        request (FixtureRequest): Used to look up the contract fixture named by `app`.
+        app (str): The fixture deploying the contract under test.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        voter_tree (tuple): The tree and the weight of each voter, provided by the `voter_tree` fixture.
+    """
+    contract = request.getfixturevalue(app)
+    tree, weights = voter_tree
+    contract.addProposal("beach", sender=deployer)
+    contract.setVoterRoot(tree.root, sender=deployer)
+    user = accounts[3]
+    contract.giveRightToVote(user, 5, sender=deployer)
+
+    with pytest.raises(ContractLogicError):
+        contract.claimAndVote(0, weights[user.address], tree.proof(2), sender=user)
+    contract.vote(0, sender=user)
+
+    assert contract.proposals(0).voteCount == 5
+    assert contract.voterCount() == 1
+
+
+def test_claimAndDelegate_rejected_after_zero_grant(delegate_contract, deployer, accounts, voter_tree):
+    """
+    Tests that `DelegateVotingApp` also rejects the claim of a voter whose grant was zero, while a voter who only received delegated weight can still claim.
+
+    Args:
+        delegate_contract (Contract): The deployed instance of the `DelegateVotingApp` contract, provided by the `delegate_contract` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        voter_tree (tuple): The tree and the weight of each voter, provided by the `voter_tree` fixture.
+    """
+    tree, _ = voter_tree
+    contract = delegate_contract
+    contract.addProposal("beach", sender=deployer)
+    contract.setVoterRoot(tree.root, sender=deployer)
+    contract.giveRightToVote(accounts[4], 0, sender=deployer)
+    with pytest.raises(ContractLogicError):
+        contract.claimAndDelegate(accounts[1], 4, tree.proof(3), sender=accounts[4])
+
+    contract.giveRightToVote(accounts[5], 2, sender=deployer)
+    contract.delegate(accounts[1], sender=accounts[5])
+    contract.claimAndVote(0, 1, tree.proof(0), sender=accounts[1])
+    assert contract.proposals(0).voteCount == 3
+    assert contract.voterCount() == 3
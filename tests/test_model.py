@@ -0,0 +1,178 @@
+import random
+
+import numpy as np
+import pytest
+from ape.exceptions import ContractLogicError
+
+from voting.model import DelegateElection, Election, Reverted, VoterArrays
+
+
+def _apply(target, method, *args, sender):
+    try:
+        if isinstance(target, Election):
+            getattr(target, method)(sender.address, *args)
+        else:
+            getattr(target, method)(*args, sender=sender)
+        return True
+    except (ContractLogicError, Reverted):
+        return False
+
+
+def _assert_same_state(model, contract, users):
+    for user in users:
+        voter = model.voter(user.address)
+        if isinstance(model, DelegateElection):
+            assert tuple(contract.voters(user)) == (voter.weight, voter.voted, voter.delegate, voter.vote)
+        else:
+            assert tuple(contract.voters(user)) == (voter.weight, voter.voted, voter.vote)
+    for i, proposal in enumerate(model.proposals):
+        assert contract.proposals(i).voteCount == proposal.voteCount
+    assert contract.winningProposal() == model.winningProposal()
+    assert contract.voterCount() == model.voterCount
+    arrays, _ = VoterArrays.from_election(model)
+    assert arrays.tally(len(model.proposals)).tolist() == [p.voteCount for p in model.proposals]
+
+
+def _resolve_by_walking(delegates):
+    roots = []
+    for voter in range(len(delegates)):
+        while delegates[voter] >= 0:
+            voter = delegates[voter]
+        roots.append(voter)
+    return roots
+
+
+@pytest.mark.parametrize("app", ["delegate_contract", "packed_contract"])
+@pytest.mark.parametrize("seed", range(3))
+def test_model_matches_contract(request, deployer, accounts, app, seed):
+    """
+    Replays a random sequence of registrations, votes, delegations and compressions against the contract and the `DelegateElection` model and compares the whole state after each step.
+
+    Args:
+        request (FixtureRequest): Used to look up the contract fixture named by `app`.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        app (str): The fixture deploying the contract under test.
+        seed (int): The seed of the random operation sequence.
+    """
+    rng = random.Random(seed)
+    contract = request.getfixturevalue(app)
+    model = DelegateElection(deployer.address, contract.maxProposals())
+    users = [accounts[i] for i in range(1, 8)]
+    for name in ("beach", "mountain", "city"):
+        assert _apply(model, "addProposal", name, sender=deployer)
+        assert _apply(contract, "addProposal", name, sender=deployer)
+    for _ in range(2 * len(users)):
+        user = rng.choice(users)
+        op = rng.random()
+        if op < 0.3:
+            call = ("giveRightToVote", user.address, rng.randint(0, 3))
+            sender = deployer
+        elif op < 0.65:
+            call = ("delegate", rng.choice(users).address)
+            sender = user
+        elif op < 0.9:
+            call = ("vote", rng.randrange(4))
+            sender = user
+        else:
+            call = ("compressDelegation", user.address)
+            sender = deployer
+        assert _apply(model, *call, sender=sender) == _apply(contract, *call, sender=sender)
+        _assert_same_state(model, contract, users)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_election_model_matches_voting_app(contract, deployer, accounts, seed):
+    """
+    Replays a random sequence of registrations and votes against the `VotingApp` contract and the `Election` model and compares the whole state after each step.
+
+    Args:
+        contract (Contract): The deployed instance of the `VotingApp` contract, provided by the `contract` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        seed (int): The seed of the random operation sequence.
+    """
+    rng = random.Random(seed)
+    model = Election(deployer.address, contract.maxProposals())
+    users = [accounts[i] for i in range(1, 8)]
+    for name in ("beach", "mountain", "city"):
+        assert _apply(model, "addProposal", name, sender=deployer)
+        assert _apply(contract, "addProposal", name, sender=deployer)
+    for _ in range(2 * len(users)):
+        user = rng.choice(users)
+        if rng.random() < 0.4:
+            call, sender = ("giveRightToVote", user.address, rng.randint(0, 3)), deployer
+        else:
+            call, sender = ("vote", rng.randrange(4)), user
+        assert _apply(model, *call, sender=sender) == _apply(contract, *call, sender=sender)
+        _assert_same_state(model, contract, users)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_vectorized_tally_matches_incremental_model(seed):
+    """
+    Drives a 20,000-voter election through the `DelegateElection` model, including chains and delegations to voters who already voted, and checks that the vectorized tally of the final state equals the incremental one.
+
+    Args:
+        seed (int): The seed of the random election.
+    """
+    rng = random.Random(seed)
+    voters = [f"0x{i:040x}" for i in range(1, 20_001)]
+    model = DelegateElection("chair", 5)
+    for name in "abcde":
+        model.addProposal("chair", name)
+    model.giveRightToVoteBatch("chair", [(voter, rng.randint(1, 1000)) for voter in voters])
+    acted = []
+    for voter in rng.sample(voters, len(voters)):
+        try:
+            if acted and rng.random() < 0.6:
+                model.delegate(voter, rng.choice(acted[-50:]))
+            else:
+                model.vote(voter, rng.randrange(5))
+        except Reverted:
+            continue
+        acted.append(voter)
+
+    arrays, _ = VoterArrays.from_election(model)
+    assert arrays.tally(5).tolist() == [p.voteCount for p in model.proposals]
+
+
+def test_vectorized_final_delegates():
+    """
+    Tests the pointer-doubling chain resolution against a plain walk on a random forest with long chains, and that a cycle is rejected.
+    """
+    rng = np.random.default_rng(0)
+    count = 100_000
+    # Each voter delegates to one of the 20 voters before it, which builds chains thousands of hops long.
+    delegates = np.arange(count) - rng.integers(1, 21, count)
+    delegates[rng.random(count) < 0.001] = -1
+    delegates[delegates < 0] = -1
+    arrays = VoterArrays(np.ones(count, dtype=np.uint64), np.zeros(count, dtype=np.int64), delegates)
+    assert arrays.final_delegates().tolist() == _resolve_by_walking(delegates.tolist())
+
+    cycle = VoterArrays(np.ones(3, dtype=np.uint64), np.full(3, -1), np.array([1, 2, 0]))
+    with pytest.raises(ValueError):
+        cycle.final_delegates()
+
+
+def test_model_long_chain(delegate_contract, deployer, accounts, make_accounts):
+    """
+    Tests that the model agrees with the contract on a 40-hop chain: the uncompressed delegation reverts in both, and after compression the weight lands on the end of the chain.
+
+    Args:
+        delegate_contract (Contract): The deployed instance of the `DelegateVotingApp` contract, provided by the `delegate_contract` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        make_accounts (Callable): Generates funded accounts, provided by the `make_accounts` fixture.
+    """
+    model = DelegateElection(deployer.address, 3)
+    chain = [accounts[1]] + make_accounts(40)
+    for target in (model, delegate_contract):
+        assert _apply(target, "giveRightToVoteBatch", [(u.address, 1) for u in chain], sender=deployer)
+        for i in range(1, len(chain) - 1):
+            assert _apply(target, "delegate", chain[i + 1].address, sender=chain[i])
+        assert not _apply(target, "delegate", chain[1].address, sender=chain[0])
+        assert _apply(target, "compressDelegation", chain[1].address, sender=deployer)
+        assert _apply(target, "delegate", chain[1].address, sender=chain[0])
+    _assert_same_state(model, delegate_contract, chain)
+    assert model.voter(chain[-1].address).weight == 41
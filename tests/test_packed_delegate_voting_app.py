@@ -0,0 +1,128 @@
+import random
+
+import pytest
+from ape.exceptions import ContractLogicError
+
+from voting.packed import ProposalNames, proposal_name_hash
+
+
+def test_voters_compatibility_view(packed_contract, deployer, accounts):
+    """
+    Tests that the `voters` view of the `PackedDelegateVotingApp` contract unpacks every field of a voter after registration, delegation and voting.
+
+    Args:
+        packed_contract (Contract): The deployed instance of the `PackedDelegateVotingApp` contract, provided by the `packed_contract` fixture.
+        deployer (Account): The account used to deploy the contract and give voting rights, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    contract = packed_contract
+    contract.addProposalBatch(["beach", "mountain", "city"], sender=deployer)
+    user, user2 = accounts[1], accounts[2]
+    contract.giveRightToVote(user, 2**64 - 1 - 5, sender=deployer)
+    contract.giveRightToVote(user2, 5, sender=deployer)
+    contract.delegate(user, sender=user2)
+    assert contract.voters(user2).weight == 0
+    assert contract.voters(user2).voted is True
+    assert contract.voters(user2).delegate == user
+    assert contract.voters(user2).vote == 0
+    assert contract.voters(user).weight == 2**64 - 1
+    contract.vote(2, sender=user)
+    assert contract.voters(user).weight == 0
+    assert contract.voters(user).voted is True
+    assert contract.voters(user).vote == 2
+    assert contract.directlyVoted(user) is True
+    assert contract.delegated(user2) is True
+    assert contract.proposals(2).voteCount == 2**64 - 1
+
+
+def test_weight_overflow(packed_contract, deployer, accounts):
+    """
+    Tests that weights which do not fit in the packed 64-bit field are rejected, both when granted and when accumulated through delegation.
+
+    Args:
+        packed_contract (Contract): The deployed instance of the `PackedDelegateVotingApp` contract, provided by the `packed_contract` fixture.
+        deployer (Account): The account used to deploy the contract and give voting rights, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    contract = packed_contract
+    with pytest.raises(ContractLogicError):
+        contract.giveRightToVote(accounts[1], 2**64, sender=deployer)
+    contract.giveRightToVote(accounts[1], 2**64 - 1, sender=deployer)
+    contract.giveRightToVote(accounts[2], 1, sender=deployer)
+    with pytest.raises(ContractLogicError):
+        contract.delegate(accounts[1], sender=accounts[2])
+
+
+def test_proposal_names(packed_contract, deployer, accounts):
+    """
+    Tests that proposal names are stored as hashes that the off-chain `ProposalNames` table resolves, including the winner.
+
+    Args:
+        packed_contract (Contract): The deployed instance of the `PackedDelegateVotingApp` contract, provided by the `packed_contract` fixture.
+        deployer (Account): The account used to deploy the contract and give voting rights, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    contract = packed_contract
+    names = ProposalNames(["beach", "mountain"])
+    contract.addProposal("beach", sender=deployer)
+    contract.addProposal("mountain", sender=deployer)
+    assert contract.proposals(1).nameHash == proposal_name_hash("mountain")
+    contract.giveRightToVote(accounts[1], 3, sender=deployer)
+    contract.vote(1, sender=accounts[1])
+    assert names.name(contract.proposals(0).nameHash) == "beach"
+    assert names.winner_name(contract) == "mountain"
+
+
+def test_chairperson_only(packed_contract, accounts):
+    """
+    Tests that proposals and voting rights of the `PackedDelegateVotingApp` contract are reserved to the chairperson.
+
+    Args:
+        packed_contract (Contract): The deployed instance of the `PackedDelegateVotingApp` contract, provided by the `packed_contract` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    with pytest.raises(ContractLogicError):
+        packed_contract.addProposal("beach", sender=accounts[1])
+    with pytest.raises(ContractLogicError):
+        packed_contract.giveRightToVote(accounts[1], 1, sender=accounts[1])
+    with pytest.raises(ContractLogicError):
+        packed_contract.giveRightToVoteBatch([(accounts[1], 1)], sender=accounts[1])
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_matches_delegate_voting_app(delegate_contract, packed_contract, deployer, accounts, seed):
+    """
+    Tests that the `PackedDelegateVotingApp` contract ends up in the same state as the `DelegateVotingApp` contract after every step of a randomized election, including failing operations.
+
+    Args:
+        delegate_contract (Contract): The deployed instance of the `DelegateVotingApp` contract, provided by the `delegate_contract` fixture.
+        packed_contract (Contract): The deployed instance of the `PackedDelegateVotingApp` contract, provided by the `packed_contract` fixture.
+        deployer (Account): The account used to deploy the contracts and give voting rights, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        seed (int): The seed of the random operation sequence.
+    """
+    rng = random.Random(seed)
+    users = list(accounts)[1:]
+    weights = [(user, rng.randint(0, 4)) for user in users]
+    for contract in (delegate_contract, packed_contract):
+        contract.addProposalBatch(["beach", "mountain", "city"], sender=deployer)
+        contract.giveRightToVoteBatch(weights, sender=deployer)
+    for _ in range(len(users)):
+        user = rng.choice(users)
+        if rng.random() < 0.5:
+            action, arg = "delegate", rng.choice(users)
+        else:
+            action, arg = "vote", rng.randrange(3)
+        outcomes = []
+        for contract in (delegate_contract, packed_contract):
+            try:
+                getattr(contract, action)(arg, sender=user)
+                outcomes.append(True)
+            except ContractLogicError:
+                outcomes.append(False)
+        assert outcomes[0] == outcomes[1]
+        for voter in users:
+            assert tuple(packed_contract.voters(voter)) == tuple(delegate_contract.voters(voter))
+        for i in range(3):
+            assert packed_contract.proposals(i).voteCount == delegate_contract.proposals(i).voteCount
+        assert packed_contract.winningProposal() == delegate_contract.winningProposal()
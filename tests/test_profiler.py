@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from voting.factory import create_election
+from voting.profiler import GasProfiler
+
+
+@pytest.fixture
+def profiler(chain, contract_sources):
+    """
+    This fixture provides a `GasProfiler` that knows `DelegateVotingApp` and `ElectionFactory` and traces the transactions of the test.
+    """
+    profiler = GasProfiler(contract_sources("DelegateVotingApp", "ElectionFactory"))
+    profiler.install(chain.provider)
+    yield profiler
+    profiler.uninstall()
+
+
+def test_profile_attributes_gas(profiler, delegate_contract, deployer, accounts):
+    """
+    Tests that transactions, internal functions and storage accesses are attributed to the contract and function they run in, and that calls are not traced.
+
+    Args:
+        profiler (GasProfiler): The installed profiler, provided by the `profiler` fixture.
+        delegate_contract (Contract): The deployed `DelegateVotingApp`, provided by the `delegate_contract` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    app = delegate_contract
+    app.addProposal("beach", sender=deployer)
+    app.giveRightToVoteBatch([(user, 1) for user in accounts[1:4]], sender=deployer)
+    app.delegate(accounts[2], sender=accounts[1])
+    app.delegate(accounts[3], sender=accounts[2])
+    receipt = app.vote(0, sender=accounts[3])
+    app.winningProposal()
+
+    profile = profiler.profile
+    assert profile.transactions[("DelegateVotingApp", "vote")] == [1, receipt.gas_used]
+    assert profile.transactions[("DelegateVotingApp", "delegate")][0] == 2
+    assert sum(count for count, _ in profile.transactions.values()) == 5
+    assert ("DelegateVotingApp", "winningProposal") not in profile.functions
+    assert profile.functions[("DelegateVotingApp", "_forwardWeight")][1] > 0
+    assert 0 < profile.execution_gas < profile.gas_used
+
+    storage = profile.storage
+    assert storage[("DelegateVotingApp", "voterCount", "SSTORE", "warm")][0] == 1
+    assert storage[("DelegateVotingApp", "voters[].delegate", "SSTORE", "cold")][0] == 2
+    assert storage[("DelegateVotingApp", "proposals[].voteCount", "SLOAD", "cold")][1] == 2100
+    sloads = sum(count for (_, _, opcode, _), (count, _) in storage.items() if opcode == "SLOAD")
+    assert sloads == profile.opcodes[("SLOAD",)][0]
+
+
+def test_profile_clone(profiler, factory, delegate_contract, accounts):
+    """
+    Tests that a transaction to an `ElectionFactory` clone is reported as a call of its implementation.
+
+    Args:
+        profiler (GasProfiler): The installed profiler, provided by the `profiler` fixture.
+        factory (Contract): The deployed `ElectionFactory`, provided by the `factory` fixture.
+        delegate_contract (Contract): The `DelegateVotingApp` implementation, provided by the `delegate_contract` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    election = create_election(factory, delegate_contract, 2, sender=accounts[1])
+    election.addProposal("beach", sender=accounts[1])
+
+    profile = profiler.profile
+    assert profile.transactions[("ElectionFactory", "createElection")][0] == 1
+    assert profile.transactions[("DelegateVotingApp", "addProposal")][0] == 1
+    assert ("DelegateVotingApp", "initialize") in profile.functions
+    assert ("EIP1167Proxy", "forward") in profile.functions
+    assert profile.storage[("DelegateVotingApp", "proposals[].name", "SSTORE", "cold")][0] > 0
+
+
+def test_report(profiler, delegate_contract, deployer, tmp_path):
+    """
+    Tests that the report ranks the hot paths by gas in the JSON and text files and that `uninstall` stops tracing.
+
+    Args:
+        profiler (GasProfiler): The installed profiler, provided by the `profiler` fixture.
+        delegate_contract (Contract): The deployed `DelegateVotingApp`, provided by the `delegate_contract` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        tmp_path (Path): A temporary directory provided by pytest.
+    """
+    delegate_contract.addProposalBatch(["beach", "mountain"], sender=deployer)
+    profiler.uninstall()
+    delegate_contract.addProposal("city", sender=deployer)
+    profiler.profile.write(tmp_path / "profile.json", rows=3)
+
+    data = json.loads((tmp_path / "profile.json").read_text())
+    assert data["transactions"] == [
+        {"contract": "DelegateVotingApp", "function": "addProposalBatch", "count": 1, "gas": data["gas_used"]}
+    ]
+    for table in ("functions", "storage", "opcodes"):
+        gas = [row["gas"] for row in data[table]]
+        assert gas == sorted(gas, reverse=True)
+    assert data["opcodes"][0]["opcode"] == "SSTORE"
+
+    text = (tmp_path / "profile.txt").read_text()
+    assert "DelegateVotingApp proposals[].name SSTORE cold" in text
+    assert len(text.split("\n\nOpcodes\n")[1].splitlines()) == 3
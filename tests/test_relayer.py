@@ -0,0 +1,231 @@
+import random
+
+import pytest
+from ape.exceptions import ContractLogicError
+
+from voting.factory import create_election
+from voting.loadsim import new_model
+from voting.relayer import (
+    GAS_PER_RELAYED_DELEGATION,
+    GAS_PER_RELAYED_VOTE,
+    RELAY_BASE_GAS,
+    Relayer,
+    eip712_domain,
+    recover_signer,
+    sign_intent,
+)
+
+
+def _relay(contract, intents, sender):
+    return contract.relayBatch([intent.as_tuple() for intent in intents], sender=sender)
+
+
+def test_relayBatch(election, accounts):
+    """
+    Tests that signed votes and delegations are applied for their voters, whoever relays them.
+
+    Args:
+        election (Contract): A seeded `DelegateVotingApp`, provided by the `election` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    intents = [
+        sign_intent(accounts[1], election, proposal=2),
+        sign_intent(accounts[2], election, to=accounts[1]),
+        sign_intent(accounts[3], election, to=accounts[2]),
+    ]
+    assert recover_signer(eip712_domain(election), intents[1]) == accounts[2].address
+    receipt = _relay(election, intents, sender=accounts[9])
+
+    assert [log.event_name for log in receipt.events] == ["Voted", "Delegated", "Delegated"]
+    assert election.proposals(2).voteCount == 1 + 2 + 3
+    assert election.voters(accounts[3]).delegate == accounts[2].address
+    assert election.voters(accounts[9]).voted is False
+
+
+@pytest.mark.parametrize(
+    "tamper",
+    ["signer", "voter", "proposal", "nonce", "contract"],
+)
+def test_relayBatch_rejects_invalid_intent(election, factory, delegate_contract, accounts, tamper):
+    """
+    Tests that a batch reverts as a whole when one intent does not carry a valid signature of its voter for this contract and nonce.
+
+    Args:
+        election (Contract): A seeded `DelegateVotingApp`, provided by the `election` fixture.
+        factory (Contract): The deployed `ElectionFactory`, provided by the `factory` fixture.
+        delegate_contract (Contract): The `DelegateVotingApp` implementation the factory clones, provided by the `delegate_contract` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        tamper (str): How the invalid intent is produced.
+    """
+    valid = sign_intent(accounts[1], election, proposal=0)
+    if tamper == "signer":
+        invalid = sign_intent(accounts[3], election, proposal=1)
+        invalid = type(invalid)(accounts[2].address, *invalid.as_tuple()[1:])
+    elif tamper == "voter":
+        invalid = sign_intent(accounts[2], election, proposal=1)
+        invalid = type(invalid)("0x" + "0" * 40, *invalid.as_tuple()[1:])
+    elif tamper == "proposal":
+        signed = sign_intent(accounts[2], election, proposal=1)
+        invalid = type(signed)(*signed.as_tuple()[:2], 2, *signed.as_tuple()[3:])
+    elif tamper == "nonce":
+        invalid = sign_intent(accounts[2], election, proposal=1, nonce=1)
+    else:
+        clone = create_election(factory, delegate_contract, 3, sender=accounts[1])
+        invalid = sign_intent(accounts[2], clone, proposal=1)
+
+    with pytest.raises(ContractLogicError):
+        _relay(election, [valid, invalid], sender=accounts[9])
+    assert election.voters(accounts[1]).voted is False
+    _relay(election, [valid], sender=accounts[9])
+
+
+def test_intent_is_spent_once(election, accounts):
+    """
+    Tests that an applied intent cannot be replayed and that `cancelIntents` voids intents that were signed but not relayed.
+
+    Args:
+        election (Contract): A seeded `DelegateVotingApp`, provided by the `election` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    used = sign_intent(accounts[1], election, proposal=0)
+    _relay(election, [used], sender=accounts[9])
+    with pytest.raises(ContractLogicError):
+        _relay(election, [used], sender=accounts[9])
+
+    cancelled = sign_intent(accounts[2], election, proposal=0)
+    election.cancelIntents(sender=accounts[2])
+    assert election.nonces(accounts[2]) == 1
+    with pytest.raises(ContractLogicError):
+        _relay(election, [cancelled], sender=accounts[9])
+    _relay(election, [sign_intent(accounts[2], election, proposal=1)], sender=accounts[9])
+    assert [election.proposals(i).voteCount for i in range(2)] == [1, 2]
+
+
+def test_clone_domain(factory, delegate_contract, accounts):
+    """
+    Tests that an `ElectionFactory` clone verifies intents signed for its own address.
+
+    Args:
+        factory (Contract): The deployed `ElectionFactory`, provided by the `factory` fixture.
+        delegate_contract (Contract): The `DelegateVotingApp` implementation, provided by the `delegate_contract` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    clone = create_election(factory, delegate_contract, 2, sender=accounts[1])
+    assert clone.domainSeparator() != delegate_contract.domainSeparator()
+    assert eip712_domain(clone)["verifyingContract"] == clone.address
+    clone.addProposal("beach", sender=accounts[1])
+    clone.giveRightToVote(accounts[2], 5, sender=accounts[1])
+    _relay(clone, [sign_intent(accounts[2], clone, proposal=0)], sender=accounts[3])
+    assert clone.proposals(0).voteCount == 5
+
+
+def test_sign_intent_requires_one_action(election, accounts):
+    """
+    Tests that an intent is either a vote or a delegation.
+
+    Args:
+        election (Contract): A seeded `DelegateVotingApp`, provided by the `election` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    with pytest.raises(ValueError):
+        sign_intent(accounts[1], election)
+    with pytest.raises(ValueError):
+        sign_intent(accounts[1], election, proposal=0, to=accounts[2])
+
+
+def test_relayer_batches_by_gas_budget(election, accounts):
+    """
+    Tests that the relayer splits intents so each batch fits the gas budget and the size cap, and rejects unsigned intents.
+
+    Args:
+        election (Contract): A seeded `DelegateVotingApp`, provided by the `election` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    relayer = Relayer(election, accounts[9], gas_budget=RELAY_BASE_GAS + 3 * GAS_PER_RELAYED_VOTE)
+    for user in accounts[1:8]:
+        relayer.add(sign_intent(user, election, proposal=0))
+    assert [len(batch) for batch in relayer.batches()] == [3, 3, 1]
+    relayer.max_batch_size = 2
+    assert [len(batch) for batch in relayer.batches()] == [2, 2, 2, 1]
+
+    forged = sign_intent(accounts[1], election, proposal=1)
+    with pytest.raises(ValueError):
+        relayer.add(type(forged)(accounts[8].address, *forged.as_tuple()[1:]))
+    for options in ({"gas_budget": RELAY_BASE_GAS}, {"max_batch_size": 0}):
+        with pytest.raises(ValueError):
+            Relayer(election, accounts[9], **options)
+
+
+def test_relayer_splits_batches_over_budget(delegate_contract, deployer, accounts, make_accounts):
+    """
+    Tests that delegations down long, uncompressed chains, which cost more than the flat per-delegation budget, are split into smaller batches that stay within the gas budget.
+
+    Args:
+        delegate_contract (Contract): The deployed instance of the `DelegateVotingApp` contract, provided by the `delegate_contract` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        make_accounts (Callable): Generates funded accounts, provided by the `make_accounts` fixture.
+    """
+    app = delegate_contract
+    signers = [accounts.generate_test_account() for _ in range(2)]
+    chains = [make_accounts(12) for _ in signers]
+    app.giveRightToVoteBatch([(user, 1) for user in signers + chains[0] + chains[1]], sender=deployer)
+    for chain in chains:
+        for i in range(len(chain) - 2, -1, -1):
+            app.delegate(chain[i + 1], sender=chain[i])
+
+    gas_budget = RELAY_BASE_GAS + 2 * GAS_PER_RELAYED_DELEGATION
+    relayer = Relayer(app, accounts[9], gas_budget=gas_budget)
+    for user, chain in zip(signers, chains):
+        relayer.add(sign_intent(user, app, to=chain[0]))
+    assert [len(batch) for batch in relayer.batches()] == [2]
+    result = relayer.submit()
+
+    assert len(result.receipts) == 2 and not result.rejected
+    assert all(receipt.gas_used <= gas_budget for receipt in result.receipts)
+    assert [app.voters(chain[-1]).weight for chain in chains] == [13, 13]
+
+
+@pytest.mark.parametrize("seed", range(2))
+def test_relayer_isolates_failing_intents(election, deployer, accounts, seed):
+    """
+    Relays a random mix of votes and delegations with some intents that revert, and checks that exactly those are rejected and the tallies match the model.
+
+    Args:
+        election (Contract): A seeded `DelegateVotingApp`, provided by the `election` fixture.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        seed (int): The seed of the random intents.
+    """
+    rng = random.Random(seed)
+    users = list(accounts[1:])
+    # Voters who already voted directly; their intents revert.
+    spent = rng.sample(users, 2)
+    for user in spent:
+        election.vote(0, sender=user)
+
+    intents = []
+    for user in rng.sample(users, len(users)):
+        earlier = [intent.voter for intent in intents]
+        if earlier and rng.random() < 0.5:
+            intents.append(sign_intent(user, election, to=rng.choice(earlier)))
+        else:
+            intents.append(sign_intent(user, election, proposal=rng.randrange(3)))
+    relayer = Relayer(election, deployer, max_batch_size=4)
+    for intent in intents:
+        relayer.add(intent)
+    result = relayer.submit()
+
+    assert relayer.pending == []
+    assert {intent.voter for intent in result.rejected} == {user.address for user in spent}
+    assert len(result.relayed) + len(result.rejected) == len(intents)
+
+    model = new_model(deployer.address, [f"proposal {i}" for i in range(3)], [(u.address, k + 1) for k, u in enumerate(users)])
+    for user in spent:
+        model.vote(user.address, 0)
+    for intent in result.relayed:
+        if intent.is_delegation:
+            model.delegate(intent.voter, intent.to)
+        else:
+            model.vote(intent.voter, intent.proposal)
+    assert [election.proposals(i).voteCount for i in range(3)] == [p.voteCount for p in model.proposals]
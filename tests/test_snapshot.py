@@ -0,0 +1,80 @@
+import pytest
+from ape.exceptions import ContractLogicError
+
+from voting.snapshot import MAX_PROPOSAL_PAGE_SIZE, fetch_snapshot
+
+APPS = ["contract", "delegate_contract", "packed_contract"]
+
+
+@pytest.mark.parametrize("app", APPS)
+def test_getProposals(request, deployer, app):
+    """
+    Tests that `getProposals` returns the requested page, truncated at the last proposal.
+
+    Args:
+        request (FixtureRequest): Used to look up the contract fixture named by `app`.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        app (str): The fixture deploying the contract under test.
+    """
+    contract = request.getfixturevalue(app)
+    assert contract.getProposals(0, 10) == []
+    contract.addProposalBatch(["beach", "mountain", "lake"], sender=deployer)
+
+    assert [tuple(p) for p in contract.getProposals(0, 3)] == [tuple(contract.proposals(i)) for i in range(3)]
+    assert [tuple(p) for p in contract.getProposals(1, 1)] == [tuple(contract.proposals(1))]
+    assert len(contract.getProposals(2, 10)) == 1
+    assert contract.getProposals(3, 10) == []
+    with pytest.raises(ContractLogicError):
+        contract.getProposals(0, MAX_PROPOSAL_PAGE_SIZE + 1)
+
+
+@pytest.mark.parametrize("app", APPS)
+def test_getVoters(request, deployer, accounts, app):
+    """
+    Tests that `getVoters` returns the same structs as the `voters(address)` getter, in the order of the addresses.
+
+    Args:
+        request (FixtureRequest): Used to look up the contract fixture named by `app`.
+        deployer (Account): The chairperson account, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        app (str): The fixture deploying the contract under test.
+    """
+    contract = request.getfixturevalue(app)
+    contract.addProposal("beach", sender=deployer)
+    contract.giveRightToVote(accounts[1], 2, sender=deployer)
+    contract.giveRightToVote(accounts[2], 3, sender=deployer)
+    contract.vote(0, sender=accounts[2])
+
+    addrs = [accounts[2], accounts[3], accounts[1]]
+    assert [tuple(v) for v in contract.getVoters(addrs)] == [tuple(contract.voters(a)) for a in addrs]
+    assert contract.getVoters([]) == []
+
+
+@pytest.mark.parametrize(
+    "election",
+    [("VotingApp", 3, 9), ("DelegateVotingApp", 3, 9), ("PackedDelegateVotingApp", 3, 9)],
+    indirect=True,
+)
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_fetch_snapshot(election, accounts, max_workers):
+    """
+    Tests that a snapshot read with small pages matches the per-item getters.
+
+    Args:
+        election (Contract): An election with three proposals and nine registered voters, provided by the `election` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        max_workers (int): The number of pages fetched in parallel.
+    """
+    contract = election
+    users = list(accounts[1:])
+    for i, user in enumerate(users):
+        contract.vote(i % 3, sender=user)
+
+    addrs = [user.address for user in users]
+    snapshot = fetch_snapshot(contract, addrs, proposal_page_size=2, voter_page_size=3, max_workers=max_workers)
+    assert [tuple(p) for p in snapshot.proposals] == [tuple(contract.proposals(i)) for i in range(3)]
+    assert {a: tuple(v) for a, v in snapshot.voters.items()} == {a: tuple(contract.voters(a)) for a in addrs}
+    assert snapshot.winning_proposal == contract.winningProposal()
+
+    with pytest.raises(ValueError):
+        fetch_snapshot(contract, addrs, voter_page_size=0)
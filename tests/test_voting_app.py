@@ -1,3 +1,5 @@
+import random
+
 import pytest
 from ape.exceptions import ContractLogicError
 
@@ -188,3 +190,145 @@ def test_winnerName(contract, deployer, accounts):
     assert contract.proposals(0).voteCount == 12
     assert contract.proposals(1).voteCount == 38
     assert contract.winnerName() == "mountain"
+
+
+def test_giveRightToVoteBatch(contract, deployer, accounts):
+    """
+    Tests the `giveRightToVoteBatch` function of the `VotingApp` contract.
+
+    Args:
+        contract (Contract): The deployed instance of the `VotingApp` contract, provided by the `contract` fixture.
+        deployer (Account): The account used to deploy the contract and give voting rights, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+
+    Raises:
+        AssertionError: If the voter count is not 3 after the batch or if any voter did not receive its weight.
+    """
+    batch = [(accounts[1], 4), (accounts[2], 7), (accounts[3], 1)]
+    contract.giveRightToVoteBatch(batch, sender=deployer)
+    assert contract.voterCount() == 3
+    for user, weight in batch:
+        assert contract.voters(user).weight == weight
+        assert contract.voters(user).voted is False
+
+
+def test_giveRightToVoteBatch_fail(contract, deployer, accounts):
+    """
+    Tests that the `giveRightToVoteBatch` function of the `VotingApp` contract fails when called by an account other than the chairperson or when a voter in the batch is already registered.
+
+    Args:
+        contract (Contract): The deployed instance of the `VotingApp` contract, provided by the `contract` fixture.
+        deployer (Account): The account used to deploy the contract and give voting rights, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+
+    Raises:
+        ContractLogicError: Expected to be raised for both failing batches, leaving the voter count unchanged.
+    """
+    with pytest.raises(ContractLogicError):
+        contract.giveRightToVoteBatch([(accounts[1], 4)], sender=accounts[2])
+    contract.giveRightToVote(accounts[1], 4, sender=deployer)
+    with pytest.raises(ContractLogicError):
+        contract.giveRightToVoteBatch([(accounts[2], 1), (accounts[1], 4)], sender=deployer)
+    assert contract.voterCount() == 1
+    assert contract.voters(accounts[2]).weight == 0
+
+
+def test_winningProposal_tie(contract, deployer, accounts):
+    """
+    Tests that the first proposal wins a tie even when the later proposal reached the tied count first.
+
+    Args:
+        contract (Contract): The deployed instance of the VotingApp contract, provided by the `contract` fixture.
+        deployer (Account): The account used to deploy the contract and give voting rights, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    contract.addProposal("beach", sender=deployer)
+    contract.addProposal("mountain", sender=deployer)
+    contract.giveRightToVote(accounts[1], 5, sender=deployer)
+    contract.giveRightToVote(accounts[2], 5, sender=deployer)
+    assert contract.winningProposal() == 0
+    contract.vote(1, sender=accounts[1])
+    assert contract.winningProposal() == 1
+    contract.vote(0, sender=accounts[2])
+    assert contract.winningProposal() == 0
+    assert contract.winnerName() == "beach"
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_winningProposal_matches_scan(contract, deployer, accounts, scan_winner, seed):
+    """
+    Tests that the incrementally tracked winner equals a full scan of the proposals after every vote of a randomized election, with random weights including zero so that votes often tie.
+
+    Args:
+        contract (Contract): The deployed instance of the VotingApp contract, provided by the `contract` fixture.
+        deployer (Account): The account used to deploy the contract and give voting rights, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        scan_winner (Callable): Finds the winner by reading every proposal, provided by the `scan_winner` fixture.
+        seed (int): The seed of the random weights and vote sequence.
+    """
+    rng = random.Random(seed)
+    contract.addProposalBatch(["beach", "mountain", "city"], sender=deployer)
+    users = list(accounts)[1:]
+    rng.shuffle(users)
+    contract.giveRightToVoteBatch([(user, rng.randint(0, 3)) for user in users], sender=deployer)
+    for user in users:
+        contract.vote(rng.randrange(3), sender=user)
+        assert contract.winningProposal() == scan_winner(contract)
+
+
+def test_maxProposals(contract, deployer, project):
+    """
+    Tests that `addProposal` of the `VotingApp` contract stops at the proposal cap given at deployment, and that a cap of zero is rejected.
+
+    Args:
+        contract (Contract): The deployed instance of the `VotingApp` contract, provided by the `contract` fixture.
+        deployer (Account): The account used to deploy the contract and add proposals, provided by the `deployer` fixture.
+        project (Project): The ape project, provided by the `project` fixture.
+    """
+    assert contract.maxProposals() == 3
+    for name in ("beach", "mountain", "city"):
+        contract.addProposal(name, sender=deployer)
+    with pytest.raises(ContractLogicError):
+        contract.addProposal("desert", sender=deployer)
+    assert contract.amountProposals() == 3
+    with pytest.raises(ContractLogicError):
+        deployer.deploy(project.VotingApp, 0)
+
+
+def test_winnerName_beyond_third_proposal(deployer, accounts, project):
+    """
+    Tests that a proposal past the third one can win when the contract is deployed with a larger cap and filled through `addProposalBatch`.
+
+    Args:
+        deployer (Account): The account used to deploy the contract and give voting rights, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+        project (Project): The ape project, provided by the `project` fixture.
+    """
+    contract = deployer.deploy(project.VotingApp, 10)
+    contract.addProposalBatch([f"proposal {i}" for i in range(10)], sender=deployer)
+    assert contract.amountProposals() == 10
+    assert contract.proposals(7).name == "proposal 7"
+    contract.giveRightToVote(accounts[1], 1, sender=deployer)
+    contract.giveRightToVote(accounts[2], 2, sender=deployer)
+    contract.vote(3, sender=accounts[1])
+    contract.vote(9, sender=accounts[2])
+    assert contract.winningProposal() == 9
+    assert contract.winnerName() == "proposal 9"
+
+
+def test_events(contract, deployer, accounts):
+    """
+    Tests that adding a proposal, granting a right and voting emit their events.
+
+    Args:
+        contract (Contract): The deployed instance of the VotingApp contract, provided by the `contract` fixture.
+        deployer (Account): The account used to deploy the contract and give voting rights, provided by the `deployer` fixture.
+        accounts (list): A list of accounts provided by the `accounts` fixture.
+    """
+    user = accounts[1]
+    receipt = contract.addProposal("beach", sender=deployer)
+    assert receipt.events == [contract.ProposalAdded(proposal=0, name="beach")]
+    receipt = contract.giveRightToVote(user, 3, sender=deployer)
+    assert receipt.events == [contract.RightGranted(voter=user, weight=3)]
+    receipt = contract.vote(0, sender=user)
+    assert receipt.events == [contract.Voted(voter=user, proposal=0, weight=3)]
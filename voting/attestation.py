@@ -0,0 +1,123 @@
+import csv
+
+from sha3 import keccak_256
+
+from voting.snapshot import fetch_snapshot
+
+# Mirrors `MAX_FINALIZE_BATCH_SIZE` in contracts/VotingApp.vy and contracts/DelegateVotingApp.vy.
+MAX_FINALIZE_BATCH_SIZE = 1000
+# `tallyCommitment()` of an election that is not finalized yet.
+EMPTY_COMMITMENT = bytes(32)
+
+
+def tally_commitment(tally):
+    """
+    Hashes a tally the way `finalize` does.
+
+    Starting from 32 zero bytes, each proposal in index order updates the commitment to
+    `keccak256(abi.encode(commitment, keccak256(name), voteCount))`. The ABI encoding of two
+    `bytes32` values and a `uint256` is their plain concatenation, so it is built directly.
+    The hashes call safe-pysha3 rather than `eth_utils.keccak`, whose dispatch costs several
+    times more than hashing these short inputs.
+
+    Args:
+        tally (Iterable): The `(name, vote_count)` pair of every proposal, in index order.
+
+    Returns:
+        bytes: The 32-byte commitment.
+    """
+    commitment = EMPTY_COMMITMENT
+    for name, vote_count in tally:
+        name_hash = keccak_256(name.encode()).digest()
+        commitment = keccak_256(commitment + name_hash + vote_count.to_bytes(32, "big")).digest()
+    return commitment
+
+
+def write_tally(path, tally):
+    """
+    Writes a tally to a CSV file with a `name,vote_count` header and one row per proposal.
+
+    Args:
+        path (str): Path of the file to write.
+        tally (Iterable): The `(name, vote_count)` pair of every proposal, in index order.
+    """
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("name", "vote_count"))
+        writer.writerows(tally)
+
+
+def read_tally(path):
+    """
+    Streams the `(name, vote_count)` pairs of a tally file written by `write_tally`.
+
+    Args:
+        path (str): Path to the CSV file.
+
+    Yields:
+        tuple: The proposal name and its integer vote count, in index order.
+    """
+    with open(path, newline="") as f:
+        rows = csv.reader(f)
+        next(rows, None)
+        for name, vote_count in rows:
+            yield name, int(vote_count)
+
+
+def fetch_tally(contract, **options):
+    """
+    Reads the `(name, vote_count)` pair of every proposal with the paginated `getProposals` view.
+
+    Args:
+        contract (Contract): A deployed `VotingApp` or `DelegateVotingApp`.
+        **options: Passed on to `voting.snapshot.fetch_snapshot`, e.g. `max_workers`.
+
+    Returns:
+        list: The pairs in index order, read at a single block.
+    """
+    return [(proposal.name, proposal.voteCount) for proposal in fetch_snapshot(contract, [], **options).proposals]
+
+
+def finalize_election(contract, sender, batch_size=MAX_FINALIZE_BATCH_SIZE):
+    """
+    Closes an election and stores its tally commitment, calling `finalize` until every proposal is hashed.
+
+    Args:
+        contract (Contract): A deployed `VotingApp` or `DelegateVotingApp`.
+        sender (Account): The chairperson account.
+        batch_size (int): Proposals hashed per transaction.
+
+    Yields:
+        Receipt: The receipt of each `finalize` transaction.
+
+    Raises:
+        ValueError: If `batch_size` is outside the bounds of the contract.
+    """
+    if not 1 <= batch_size <= MAX_FINALIZE_BATCH_SIZE:
+        raise ValueError(f"batch_size must be between 1 and {MAX_FINALIZE_BATCH_SIZE}")
+    while contract.tallyCommitment() == EMPTY_COMMITMENT:
+        yield contract.finalize(batch_size, sender=sender)
+
+
+def verify_tally(contract, path):
+    """
+    Checks a tally file against the commitment stored by a finalized election.
+
+    The contract is read once, through `tallyCommitment()`; the file is streamed once and
+    hashed like `tally_commitment`. A file matches only if it lists every proposal, in
+    index order, with the final name and vote count.
+
+    Args:
+        contract (Contract): A finalized `VotingApp` or `DelegateVotingApp`.
+        path (str): Path to a tally file in the format of `write_tally`.
+
+    Returns:
+        bool: True if the file hashes to the stored commitment.
+
+    Raises:
+        ValueError: If the election is not finalized yet.
+    """
+    commitment = contract.tallyCommitment()
+    if commitment == EMPTY_COMMITMENT:
+        raise ValueError(f"Election {contract.address} is not finalized")
+    return tally_commitment(read_tally(path)) == commitment
@@ -0,0 +1,109 @@
+import csv
+from itertools import islice
+
+from eth_utils import to_checksum_address
+
+# Mirrors `MAX_BATCH_SIZE` in contracts/VotingApp.vy and contracts/DelegateVotingApp.vy.
+MAX_BATCH_SIZE = 1000
+# Gas of one `giveRightToVoteBatch` call excluding the voters, and the gas added by each
+# freshly registered voter. Measured by tests/test_gas_benchmark.py, rounded up.
+BATCH_BASE_GAS = 45_000
+GAS_PER_VOTER = 27_000
+# A contract that checkpoints voting power, i.e. has `getPastVotes`, also writes the first
+# checkpoint of each voter and marks it registered.
+GAS_PER_CHECKPOINTED_VOTER = 72_000
+# Share of the block gas limit a single batch may use.
+GAS_LIMIT_MARGIN = 0.9
+
+
+def batch_size_for_gas_limit(
+    gas_limit,
+    base_gas=BATCH_BASE_GAS,
+    gas_per_voter=GAS_PER_VOTER,
+    max_batch_size=MAX_BATCH_SIZE,
+):
+    """
+    Computes how many voters fit into one `giveRightToVoteBatch` transaction.
+
+    Args:
+        gas_limit (int): The block gas limit of the target chain.
+        base_gas (int): The fixed gas of a batch call.
+        gas_per_voter (int): The gas added by each voter in the batch.
+        max_batch_size (int): The `MAX_BATCH_SIZE` bound of the contract.
+
+    Returns:
+        int: The batch size, capped at `max_batch_size`.
+
+    Raises:
+        ValueError: If not even one voter fits under the gas limit.
+    """
+    size = int((gas_limit * GAS_LIMIT_MARGIN - base_gas) // gas_per_voter)
+    if size < 1:
+        raise ValueError(f"Gas limit {gas_limit} is too low for a voter batch")
+    return min(size, max_batch_size)
+
+
+def read_voters(path):
+    """
+    Streams `(address, weight)` pairs from a CSV file with an `address,weight` row per voter.
+
+    A header row is skipped when its weight column is not a number.
+
+    Args:
+        path (str): Path to the CSV file.
+
+    Yields:
+        tuple: The checksummed voter address and its integer weight.
+    """
+    with open(path, newline="") as f:
+        for row_number, row in enumerate(csv.reader(f)):
+            if not row:
+                continue
+            address, weight = row[0].strip(), row[1].strip()
+            if row_number == 0 and not weight.isdigit():
+                continue
+            yield to_checksum_address(address), int(weight)
+
+
+def chunked(voters, size):
+    """
+    Splits an iterable of voters into lists of at most `size` items without materialising it.
+
+    Args:
+        voters (Iterable): The `(address, weight)` pairs.
+        size (int): The maximum length of each chunk.
+
+    Yields:
+        list: The next chunk of voters.
+    """
+    it = iter(voters)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def register_voters(contract, voters, sender, gas_limit=None, batch_size=None):
+    """
+    Registers voters on `contract` through `giveRightToVoteBatch`, one batch per transaction.
+
+    Args:
+        contract (Contract): A deployed `VotingApp` or `DelegateVotingApp` instance.
+        voters (Iterable): The `(address, weight)` pairs to register.
+        sender (Account): The chairperson account.
+        gas_limit (int): The gas limit used to size the batches. Defaults to the gas limit of the latest block.
+        batch_size (int): A fixed batch size that overrides `gas_limit`.
+
+    Yields:
+        tuple: Each submitted batch and its receipt.
+
+    Raises:
+        ValueError: If `batch_size` is outside the bounds of the contract.
+    """
+    if batch_size is not None and not 1 <= batch_size <= MAX_BATCH_SIZE:
+        raise ValueError(f"batch_size must be between 1 and {MAX_BATCH_SIZE}")
+    if batch_size is None:
+        if gas_limit is None:
+            gas_limit = contract.chain_manager.blocks.head.gas_limit
+        gas_per_voter = GAS_PER_CHECKPOINTED_VOTER if hasattr(contract, "getPastVotes") else GAS_PER_VOTER
+        batch_size = batch_size_for_gas_limit(gas_limit, gas_per_voter=gas_per_voter)
+    for batch in chunked(voters, batch_size):
+        yield batch, contract.giveRightToVoteBatch(batch, sender=sender)
@@ -0,0 +1,556 @@
+import asyncio
+import itertools
+from collections import defaultdict, namedtuple
+from contextlib import asynccontextmanager
+from functools import lru_cache, partial
+
+import aiohttp
+from eth_abi import decode, encode
+from eth_utils import function_signature_to_4byte_selector, to_checksum_address, to_hex
+
+# Calls per JSON-RPC batch; hosted nodes commonly accept batches of 100 to 1000 calls.
+DEFAULT_MAX_BATCH_SIZE = 100
+# HTTP connections kept open to the node.
+DEFAULT_MAX_CONNECTIONS = 16
+# Seconds between two `eth_getTransactionReceipt` polls of a sent transaction.
+RECEIPT_POLL_INTERVAL = 0.05
+# Headroom on gas estimates. Concurrent writes are estimated before the ones ahead of them
+# land, e.g. a vote estimated before another vote changes the leading proposal.
+GAS_ESTIMATE_MARGIN = 1.25
+
+
+class RPCError(Exception):
+    """
+    An error the node returned for a JSON-RPC request, e.g. a reverted `eth_call`.
+
+    Args:
+        code (int): The JSON-RPC error code.
+        message (str): The error message of the node.
+        data: The error data of the node, if any.
+    """
+
+    def __init__(self, code, message, data=None):
+        super().__init__(f"{message} (code {code})")
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+class TransactionReverted(Exception):
+    """
+    A transaction that was mined with status 0.
+
+    Args:
+        receipt (dict): The JSON-RPC receipt of the transaction.
+    """
+
+    def __init__(self, receipt):
+        super().__init__(f"transaction {receipt['transactionHash']} reverted")
+        self.receipt = receipt
+
+
+def _result(response):
+    if "error" in response:
+        error = response["error"]
+        raise RPCError(error.get("code"), error.get("message"), error.get("data"))
+    return response["result"]
+
+
+class AsyncRPC:
+    """
+    A JSON-RPC connection over a pool of HTTP connections.
+
+    `request` sends a call on its own. `batch_request` queues the call and sends every call
+    queued until the event loop is idle, or `max_batch_size` of them, as one JSON-RPC batch,
+    so reads issued together, e.g. through `asyncio.gather`, share one HTTP round trip. Batches
+    are sent concurrently over up to `max_connections` connections. Ordered calls, such as
+    signed transactions that must arrive in nonce order, are batched the same way but their
+    batches are sent one after the other.
+
+    Args:
+        url (str): The HTTP endpoint of the node.
+        max_connections (int): The most HTTP connections open at once.
+        max_batch_size (int): The most calls per JSON-RPC batch.
+        timeout (float): Seconds an HTTP request may take.
+
+    Attributes:
+        http_requests (int): The HTTP requests sent.
+        rpc_requests (int): The JSON-RPC calls sent, batched or not.
+    """
+
+    def __init__(self, url, max_connections=DEFAULT_MAX_CONNECTIONS, max_batch_size=DEFAULT_MAX_BATCH_SIZE, timeout=30):
+        if max_connections < 1:
+            raise ValueError("max_connections must be at least 1")
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.url = url
+        self.max_connections = max_connections
+        self.max_batch_size = max_batch_size
+        self.timeout = timeout
+        self.http_requests = 0
+        self.rpc_requests = 0
+        self._session = None
+        self._ids = itertools.count(1)
+        self._queue = []
+        self._ordered_queue = []
+        self._ordered_sender = None
+        self._batches = set()
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def open(self):
+        """
+        Opens the connection pool; called by `async with`.
+        """
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+
+    async def close(self):
+        """
+        Waits for the batches in flight and closes the connection pool.
+        """
+        self._send_queue()
+        while self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def request(self, method, *params):
+        """
+        Sends one JSON-RPC call in its own HTTP request.
+
+        Returns:
+            The `result` of the response.
+
+        Raises:
+            RPCError: If the node answers with an error.
+        """
+        (response,) = await self._post([self._payload(method, params)])
+        return _result(response)
+
+    async def batch_request(self, method, *params):
+        """
+        Queues a JSON-RPC call for the next batch and waits for its result.
+
+        Returns:
+            The `result` of the response.
+
+        Raises:
+            RPCError: If the node answers the call with an error; the other calls of the batch are not affected.
+        """
+        return await self.enqueue(method, *params)
+
+    def enqueue(self, method, *params, ordered=False):
+        """
+        Queues a JSON-RPC call for the next batch right away; `batch_request` without the wait.
+
+        Args:
+            method (str): The JSON-RPC method.
+            *params: Its parameters.
+            ordered (bool): Whether the node must receive the call after every ordered call queued before it.
+
+        Returns:
+            asyncio.Future: Resolves to the `result` of the response, or fails with `RPCError`.
+        """
+        future = asyncio.get_running_loop().create_future()
+        if ordered:
+            self._ordered_queue.append((self._payload(method, params), future))
+            if self._ordered_sender is None or self._ordered_sender.done():
+                self._ordered_sender = self._track(self._send_ordered_queue())
+            return future
+        self._queue.append((self._payload(method, params), future))
+        if len(self._queue) >= self.max_batch_size:
+            self._send_queue()
+        elif len(self._queue) == 1:
+            # Runs after every task that is already ready, so their calls join this batch.
+            asyncio.get_running_loop().call_soon(self._send_queue)
+        return future
+
+    def _payload(self, method, params):
+        return {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": list(params)}
+
+    def _track(self, coroutine):
+        task = asyncio.ensure_future(coroutine)
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+        return task
+
+    def _send_queue(self):
+        queued, self._queue = self._queue, []
+        for start in range(0, len(queued), self.max_batch_size):
+            self._track(self._send_batch(queued[start : start + self.max_batch_size]))
+
+    async def _send_ordered_queue(self):
+        while self._ordered_queue:
+            # Lets every task that is already ready queue its call first.
+            await asyncio.sleep(0)
+            queued = self._ordered_queue[: self.max_batch_size]
+            del self._ordered_queue[: self.max_batch_size]
+            await self._send_batch(queued)
+
+    async def _send_batch(self, queued):
+        try:
+            responses = await self._post([payload for payload, _ in queued])
+        except Exception as exc:
+            for _, future in queued:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        by_id = {response.get("id"): response for response in responses}
+        for payload, future in queued:
+            if future.done():
+                continue
+            response = by_id.get(payload["id"], {"error": {"code": -32603, "message": "no response for the call in the batch"}})
+            try:
+                future.set_result(_result(response))
+            except RPCError as exc:
+                future.set_exception(exc)
+
+    async def _post(self, payloads):
+        if self._session is None:
+            raise RuntimeError("the connection is not open; use `async with` or `open()`")
+        self.http_requests += 1
+        self.rpc_requests += len(payloads)
+        body = payloads if len(payloads) > 1 else payloads[0]
+        async with self._session.post(self.url, json=body) as response:
+            response.raise_for_status()
+            data = await response.json(content_type=None)
+        return data if isinstance(data, list) else [data]
+
+
+class NonceManager:
+    """
+    Hands out consecutive nonces to the accounts that send through one client.
+
+    The first nonce of an account is its pending transaction count on the node, later ones
+    are counted locally, so concurrent writes from one account neither wait for each other's
+    receipts nor reuse a nonce. Nonces are handed out one at a time, so transactions queued
+    while holding them reach the node in nonce order. When the node rejects a transaction,
+    `reset` drops the local count so the next nonce is read from the node again.
+
+    Args:
+        rpc (AsyncRPC): The connection to read the transaction counts with.
+    """
+
+    def __init__(self, rpc):
+        self.rpc = rpc
+        self._next = {}
+        self._locks = defaultdict(asyncio.Lock)
+
+    @asynccontextmanager
+    async def reserve(self, address):
+        """
+        Reserves the next nonce of `address` for the body of the `async with` block.
+
+        The nonce counts as used if the block completes, and is released if it raises.
+
+        Args:
+            address (str): The sending account.
+
+        Yields:
+            int: The nonce.
+        """
+        async with self._locks[address]:
+            if address not in self._next:
+                self._next[address] = int(await self.rpc.request("eth_getTransactionCount", address, "pending"), 16)
+            try:
+                yield self._next[address]
+            except BaseException:
+                self.reset(address)
+                raise
+            self._next[address] += 1
+
+    def reset(self, address):
+        """
+        Forgets the local nonce count of `address`, e.g. after the node rejected one of its transactions.
+        """
+        self._next.pop(address, None)
+
+
+class AsyncClient:
+    """
+    An asyncio client for voting contracts deployed on a JSON-RPC node.
+
+    Reads are batched `eth_call`s on a pooled connection. Writes are signed locally with an
+    `eth_account` account and sent with nonces from a `NonceManager`, so one account can
+    have many writes in flight:
+
+        async with AsyncClient(url) as client:
+            election = client.contract(address, abi)
+            await asyncio.gather(*(election.giveRightToVote(v, 1, sender=chair) for v in voters))
+            winner = await election.winnerName()
+
+    Args:
+        url (str): The HTTP endpoint of the node.
+        max_connections (int): The most HTTP connections open at once.
+        max_batch_size (int): The most calls per JSON-RPC batch.
+        gas_estimate_margin (float): The factor applied to the node's gas estimates.
+
+    Attributes:
+        rpc (AsyncRPC): The connection to the node.
+        nonces (NonceManager): The nonces of the sending accounts.
+    """
+
+    def __init__(
+        self,
+        url,
+        max_connections=DEFAULT_MAX_CONNECTIONS,
+        max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+        gas_estimate_margin=GAS_ESTIMATE_MARGIN,
+    ):
+        self.rpc = AsyncRPC(url, max_connections=max_connections, max_batch_size=max_batch_size)
+        self.nonces = NonceManager(self.rpc)
+        self.gas_estimate_margin = gas_estimate_margin
+        self._chain_id = None
+
+    async def __aenter__(self):
+        await self.rpc.open()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.rpc.close()
+
+    def contract(self, address, abi):
+        """
+        Returns the contract at `address` with the functions of `abi`.
+
+        Args:
+            address (str): The contract address.
+            abi: The JSON ABI as a list of dicts, or a `ContractType` such as `project.DelegateVotingApp.contract_type`.
+
+        Returns:
+            AsyncContract: The contract.
+        """
+        return AsyncContract(self, address, abi)
+
+    async def chain_id(self):
+        """
+        Returns the chain id of the node, read once per client.
+        """
+        if self._chain_id is None:
+            self._chain_id = int(await self.rpc.batch_request("eth_chainId"), 16)
+        return self._chain_id
+
+    async def call(self, to, data, block_identifier="latest", sender=None):
+        """
+        Runs a batched `eth_call`.
+
+        Args:
+            to (str): The contract address.
+            data (str): The hex-encoded calldata.
+            block_identifier: The block number or tag to call at.
+            sender (str): The address the call is made from, for views that read `msg.sender`.
+
+        Returns:
+            bytes: The return data.
+        """
+        block = hex(block_identifier) if isinstance(block_identifier, int) else block_identifier
+        call = {"to": to, "data": data}
+        if sender is not None:
+            call["from"] = sender
+        return bytes.fromhex((await self.rpc.batch_request("eth_call", call, block))[2:])
+
+    async def send_transaction(self, sender, to, data, gas=None, wait=True):
+        """
+        Signs and sends a transaction with the next nonce of `sender`.
+
+        The gas estimate, chain id and fees are read in the shared batch, and the signed
+        transaction is sent in the next one. If the node rejects it, the sender's nonce count
+        is read from the node again; transactions of the sender queued behind it in the same
+        batch may be rejected as well.
+
+        Args:
+            sender (LocalAccount): The `eth_account` account that signs the transaction.
+            to (str): The contract address.
+            data (str): The hex-encoded calldata.
+            gas (int): The gas limit; the node's estimate times `gas_estimate_margin` if not given.
+            wait (bool): Whether to wait for the receipt.
+
+        Returns:
+            The receipt if `wait` is set, else the transaction hash.
+
+        Raises:
+            RPCError: If the node rejects the estimate or the transaction.
+            TransactionReverted: If the mined transaction reverted.
+        """
+        reads = [
+            self.chain_id(),
+            self.rpc.batch_request("eth_getBlockByNumber", "latest", False),
+            self.rpc.batch_request("eth_maxPriorityFeePerGas"),
+        ]
+        if gas is None:
+            reads.append(self.rpc.batch_request("eth_estimateGas", {"from": sender.address, "to": to, "data": data}))
+        chain_id, block, tip, *estimate = await asyncio.gather(*reads)
+        tip = int(tip, 16)
+        transaction = {
+            "type": 2,
+            "chainId": chain_id,
+            "to": to,
+            "data": data,
+            "value": 0,
+            "gas": gas if gas is not None else int(int(estimate[0], 16) * self.gas_estimate_margin),
+            "maxPriorityFeePerGas": tip,
+            "maxFeePerGas": 2 * int(block["baseFeePerGas"], 16) + tip,
+        }
+        async with self.nonces.reserve(sender.address) as nonce:
+            signed = sender.sign_transaction({**transaction, "nonce": nonce})
+            # Queued in nonce order and sent in batches, so writes of one account share round trips.
+            sent = self.rpc.enqueue("eth_sendRawTransaction", to_hex(signed.rawTransaction), ordered=True)
+        try:
+            tx_hash = await sent
+        except RPCError:
+            self.nonces.reset(sender.address)
+            raise
+        if not wait:
+            return tx_hash
+        receipt = await self.wait_for_receipt(tx_hash)
+        if int(receipt["status"], 16) != 1:
+            raise TransactionReverted(receipt)
+        return receipt
+
+    async def wait_for_receipt(self, tx_hash, poll_interval=RECEIPT_POLL_INTERVAL):
+        """
+        Polls the node until the transaction is mined.
+
+        Returns:
+            dict: The JSON-RPC receipt.
+        """
+        while True:
+            receipt = await self.rpc.batch_request("eth_getTransactionReceipt", tx_hash)
+            if receipt is not None:
+                return receipt
+            await asyncio.sleep(poll_interval)
+
+
+def _abi_type(param):
+    if not param["type"].startswith("tuple"):
+        return param["type"]
+    components = ",".join(_abi_type(component) for component in param["components"])
+    return f"({components}){param['type'][len('tuple'):]}"
+
+
+@lru_cache(maxsize=None)
+def _struct(names):
+    return namedtuple("Struct", names, rename=True)
+
+
+def _to_abi(value):
+    if hasattr(value, "address"):
+        return value.address
+    if isinstance(value, list):
+        return [_to_abi(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(_to_abi(item) for item in value)
+    return value
+
+
+def _from_abi(param, value):
+    kind = param["type"]
+    if kind.endswith("]"):
+        element = {**param, "type": kind[: kind.rindex("[")]}
+        return [_from_abi(element, item) for item in value]
+    if kind == "tuple":
+        components = param["components"]
+        values = [_from_abi(component, item) for component, item in zip(components, value)]
+        names = tuple(component.get("name") for component in components)
+        return _struct(names)(*values) if all(names) else tuple(values)
+    if kind == "address":
+        return to_checksum_address(value)
+    return value
+
+
+class ContractFunction:
+    """
+    One function of a contract ABI, encoding its calldata and decoding its return data.
+
+    Args:
+        abi (dict): The ABI entry of the function.
+    """
+
+    def __init__(self, abi):
+        self.abi = abi
+        self.name = abi["name"]
+        self.input_types = [_abi_type(param) for param in abi["inputs"]]
+        self.outputs = abi.get("outputs", [])
+        self.output_types = [_abi_type(param) for param in self.outputs]
+        self.selector = function_signature_to_4byte_selector(f"{self.name}({','.join(self.input_types)})")
+        self.is_view = abi.get("stateMutability") in ("view", "pure")
+
+    def encode(self, args):
+        """
+        Returns the hex-encoded calldata for `args`; accounts and contracts are passed by their address.
+        """
+        return to_hex(self.selector + encode(self.input_types, _to_abi(list(args))))
+
+    def decode(self, data):
+        """
+        Returns the decoded return value: None, the single output, or a tuple of outputs. Structs become named tuples.
+        """
+        values = [_from_abi(param, value) for param, value in zip(self.outputs, decode(self.output_types, data))]
+        if not values:
+            return None
+        return values[0] if len(values) == 1 else tuple(values)
+
+
+class AsyncContract:
+    """
+    A deployed contract with one coroutine function per ABI function.
+
+    View functions run as batched calls, e.g. `await election.winnerName()` or
+    `await election.proposals(0, block_identifier=block)`; a `sender` only sets the address
+    they are called from. Other functions send a transaction signed by `sender`, e.g.
+    `await election.vote(1, sender=voter)`, accepting `gas` and `wait` like
+    `AsyncClient.send_transaction`. Overloads are told apart by their number of arguments;
+    overloads with the same number of arguments cannot be called.
+
+    Args:
+        client (AsyncClient): The client to call and send through.
+        address (str): The contract address.
+        abi: The JSON ABI as a list of dicts, or a `ContractType`.
+    """
+
+    def __init__(self, client, address, abi):
+        if hasattr(abi, "abi"):
+            abi = [entry.model_dump(mode="json", by_alias=True, exclude_none=True) for entry in abi.abi]
+        self.client = client
+        self.address = to_checksum_address(address)
+        self._functions = defaultdict(list)
+        for entry in abi:
+            if entry.get("type") == "function":
+                self._functions[entry["name"]].append(ContractFunction(entry))
+
+    def __getattr__(self, name):
+        functions = self.__dict__.get("_functions", {})
+        if name not in functions:
+            raise AttributeError(f"{type(self).__name__} has no function {name!r}")
+        return partial(self._invoke, name)
+
+    def __dir__(self):
+        return [*super().__dir__(), *self._functions]
+
+    async def _invoke(self, name, *args, sender=None, block_identifier="latest", **transaction):
+        candidates = [function for function in self._functions[name] if len(function.input_types) == len(args)]
+        if not candidates:
+            raise ValueError(f"{name} takes no {len(args)} arguments")
+        if len(candidates) > 1:
+            signatures = ", ".join(f"{name}({','.join(function.input_types)})" for function in candidates)
+            raise ValueError(f"{name} with {len(args)} arguments is ambiguous: {signatures}")
+        function = candidates[0]
+        data = function.encode(args)
+        if function.is_view:
+            if transaction:
+                raise ValueError(f"{name} is a view and is only called; it takes no {', '.join(transaction)}")
+            caller = None if sender is None else sender.address
+            return function.decode(await self.client.call(self.address, data, block_identifier, caller))
+        if sender is None:
+            raise ValueError(f"{name} changes state; pass the account to send it with as `sender`")
+        return await self.client.send_transaction(sender, self.address, data, **transaction)
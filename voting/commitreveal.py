@@ -0,0 +1,57 @@
+import secrets
+
+from eth_abi import encode
+from eth_utils import keccak, to_checksum_address
+
+from voting.batching import chunked
+
+# Mirrors `MAX_REVEAL_BATCH_SIZE` in contracts/CommitRevealVotingApp.vy.
+MAX_REVEAL_BATCH_SIZE = 1000
+# Values of the `Phase` enum of the contract; Vyper enums are bit flags.
+COMMIT = 1
+REVEAL = 2
+CLOSED = 4
+
+
+def new_salt():
+    """
+    Returns a random 32-byte salt, so a commitment cannot be matched by trying every proposal.
+    """
+    return secrets.token_bytes(32)
+
+
+def commitment(voter, proposal, salt):
+    """
+    Computes the commitment a voter sends to `commitVote`.
+
+    Args:
+        voter (str): The voter address.
+        proposal (int): The proposal index voted for.
+        salt (bytes): The 32-byte salt, kept secret until the reveal.
+
+    Returns:
+        bytes: keccak256(abi_encode(voter, proposal, salt)), as checked by the contract.
+    """
+    return keccak(encode(["address", "uint256", "bytes32"], [to_checksum_address(voter), proposal, salt]))
+
+
+def reveal_batches(reveals, batch_size=MAX_REVEAL_BATCH_SIZE):
+    """
+    Orders reveals by proposal and splits them into `revealBatch` calls.
+
+    The contract adds each run of reveals for the same proposal to its vote count in one
+    write, so sorting by proposal leaves at most one write per proposal and batch.
+
+    Args:
+        reveals (Iterable): The `(voter, proposal, salt)` tuples.
+        batch_size (int): The maximum reveals per call.
+
+    Yields:
+        list: The reveals of the next call.
+
+    Raises:
+        ValueError: If `batch_size` is outside 1..`MAX_REVEAL_BATCH_SIZE`.
+    """
+    if not 1 <= batch_size <= MAX_REVEAL_BATCH_SIZE:
+        raise ValueError(f"batch_size must be between 1 and {MAX_REVEAL_BATCH_SIZE}")
+    yield from chunked(sorted(reveals, key=lambda reveal: reveal[1]), batch_size)
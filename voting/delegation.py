@@ -0,0 +1,185 @@
+from collections import Counter
+from itertools import islice
+
+from sortedcontainers import SortedList
+
+from voting.indexer import Tally
+
+
+class DelegationIndex(Tally):
+    """
+    A `Tally` that also keeps the delegation forest of a delegate contract, updated with every event.
+
+    Each address is a node whose parent is the address it delegated to, so every tree is
+    rooted at a final delegate that has voted or not acted yet. The index answers, without
+    walking `voters(address).delegate` hop by hop:
+
+    - `effective_weight`: the weight an address controls, like the contract's `getVotes`.
+      That is its own weight plus everything delegated to it, including weight that has
+      already been added to the proposal it voted for. It is 0 once the address delegated.
+    - `final_delegate` and `depth`: the root of the address's tree and the hops to it.
+    - `top_delegates`: the addresses that control the most weight.
+    - `depth_histogram`: how many addresses are how many hops from their final delegate.
+
+    A voter can only delegate while it is the root of its tree, and a delegation never
+    changes afterwards. A delegation therefore links one whole tree below a node of another
+    one. The trees are kept as a union-find forest that tracks each node's depth relative to
+    its set. Finding the final delegate and the depth costs amortized near-constant time.
+    Linking a tree costs the same plus one step per distinct depth in the linked tree,
+    because the histogram shifts those depths. The weights are kept in a sorted list, so
+    `top_delegates(k)` reads the first `k` entries.
+
+    Feed it with a `TallyIndexer`, e.g. `TallyIndexer(contract, tally=DelegationIndex()).sync()`.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._ids = {}
+        self._addresses = []
+        # Union-find parent of each node. At a set representative, `_offset` is the depth of the
+        # representative in its tree; elsewhere it is the depth relative to the union-find parent.
+        self._parent = []
+        self._offset = []
+        # At a representative: the number of nodes, the final delegate, and the number of
+        # nodes per depth relative to the representative.
+        self._size = []
+        self._root = []
+        self._depths = []
+        self._power = []
+        self._ranking = SortedList()
+        self._histogram = Counter()
+
+    def apply(self, event_name, args):
+        """
+        Applies one decoded event to the tally and the forest.
+
+        Raises:
+            ValueError: If a `Delegated` event would close a cycle; the state is left unchanged.
+        """
+        if event_name == "Delegated" and self.final_delegate(args["to"]) == args["voter"]:
+            raise ValueError(f"delegation of {args['voter']} to {args['to']} closes a cycle")
+        super().apply(event_name, args)
+        if event_name == "RightGranted":
+            self._add_power(self._node(args["voter"]), args["weight"])
+        elif event_name == "Voted":
+            self._node(args["voter"])
+        elif event_name == "Delegated":
+            self._link(self._node(args["voter"]), self._node(args["to"]))
+
+    def effective_weight(self, address):
+        """
+        Returns the weight `address` controls: its own and all weight delegated to it, or 0 once it delegated.
+        """
+        node = self._ids.get(address)
+        return 0 if node is None else self._power[node]
+
+    def final_delegate(self, address):
+        """
+        Returns the end of the delegation chain of `address`, the address itself if it did not delegate.
+        """
+        node = self._ids.get(address)
+        if node is None:
+            return address
+        representative, _ = self._find(node)
+        return self._addresses[self._root[representative]]
+
+    def depth(self, address):
+        """
+        Returns the number of delegation hops from `address` to its final delegate.
+        """
+        node = self._ids.get(address)
+        if node is None:
+            return 0
+        representative, depth = self._find(node)
+        return depth + self._offset[representative]
+
+    def top_delegates(self, k):
+        """
+        Returns the `k` addresses that control the most weight, heaviest first and by address on ties.
+
+        Args:
+            k (int): The number of addresses.
+
+        Returns:
+            list: `(address, effective_weight)` pairs; addresses without weight are left out.
+        """
+        return [(address, -negative_power) for negative_power, address in islice(self._ranking, k)]
+
+    def depth_histogram(self):
+        """
+        Returns how many addresses are how many delegation hops from their final delegate.
+
+        Returns:
+            dict: The number of addresses per depth, by increasing depth; final delegates have depth 0.
+        """
+        return {depth: count for depth, count in sorted(self._histogram.items()) if count}
+
+    def _node(self, address):
+        node = self._ids.get(address)
+        if node is None:
+            node = self._ids[address] = len(self._addresses)
+            self._addresses.append(address)
+            self._parent.append(node)
+            self._offset.append(0)
+            self._size.append(1)
+            self._root.append(node)
+            self._depths.append(Counter({0: 1}))
+            self._power.append(0)
+            self._histogram[0] += 1
+        return node
+
+    def _find(self, node):
+        """
+        Returns the set representative of `node` and the depth of `node` relative to it.
+        """
+        path = []
+        while self._parent[node] != node:
+            path.append(node)
+            node = self._parent[node]
+        # Point every node on the path straight at the representative, keeping its relative depth.
+        depth = 0
+        for visited in reversed(path):
+            depth += self._offset[visited]
+            self._offset[visited] = depth
+            self._parent[visited] = node
+        return node, self._offset[path[0]] if path else 0
+
+    def _set_power(self, node, power):
+        if self._power[node]:
+            self._ranking.remove((-self._power[node], self._addresses[node]))
+        if power:
+            self._ranking.add((-power, self._addresses[node]))
+        self._power[node] = power
+
+    def _add_power(self, node, amount):
+        self._set_power(node, self._power[node] + amount)
+
+    def _link(self, voter, to):
+        """
+        Hangs the tree rooted at `voter` below `to` and moves its weight to the final delegate of `to`.
+        """
+        upper, to_depth = self._find(to)
+        lower, _ = self._find(voter)
+        # `voter` is a final delegate until now, so it and every node below it move
+        # `depth(to) + 1` hops further from their final delegate.
+        shift = self._offset[upper] + to_depth + 1
+        for relative, count in self._depths[lower].items():
+            self._histogram[self._offset[lower] + relative] -= count
+            self._histogram[self._offset[lower] + shift + relative] += count
+        self._offset[lower] += shift
+
+        root = self._root[upper]
+        self._add_power(root, self._power[voter])
+        self._set_power(voter, 0)
+
+        # Union by size; the depths of the smaller set are rebased onto the larger one.
+        if self._size[lower] > self._size[upper]:
+            upper, lower = lower, upper
+        rebase = self._offset[lower] - self._offset[upper]
+        for relative, count in self._depths[lower].items():
+            self._depths[upper][relative + rebase] += count
+        self._parent[lower] = upper
+        self._offset[lower] = rebase
+        self._size[upper] += self._size[lower]
+        self._root[upper] = root
+        self._depths[lower] = None
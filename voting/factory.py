@@ -0,0 +1,50 @@
+from ape.contracts import ContractInstance
+
+from voting.batching import chunked
+
+# Mirrors `MAX_ELECTION_PAGE_SIZE` in contracts/ElectionFactory.vy.
+MAX_ELECTION_PAGE_SIZE = 100
+
+
+def create_election(factory, implementation, max_proposals, sender):
+    """
+    Creates an election as a minimal proxy clone of `implementation`.
+
+    Args:
+        factory (Contract): The deployed `ElectionFactory`.
+        implementation (Contract): A `VotingApp` or `DelegateVotingApp` registered with the factory.
+        max_proposals (int): The proposal cap of the new election.
+        sender (Account): The account creating the election; it becomes the chairperson.
+
+    Returns:
+        ContractInstance: The new election, with the ABI of `implementation`.
+    """
+    receipt = factory.createElection(implementation, max_proposals, sender=sender)
+    (created,) = factory.ElectionCreated.from_receipt(receipt)
+    return ContractInstance(created.election, implementation.contract_type, txn_hash=receipt.txn_hash)
+
+
+def list_elections(factory, page_size=MAX_ELECTION_PAGE_SIZE):
+    """
+    Reads the addresses of every election in the registry with the paginated `getElections` view.
+
+    All pages are read at the same block, so elections created meanwhile do not tear the list.
+
+    Args:
+        factory (Contract): The deployed `ElectionFactory`.
+        page_size (int): The elections per call, at most `MAX_ELECTION_PAGE_SIZE`.
+
+    Returns:
+        list: The election addresses in creation order.
+
+    Raises:
+        ValueError: If `page_size` is outside 1..`MAX_ELECTION_PAGE_SIZE`.
+    """
+    if not 1 <= page_size <= MAX_ELECTION_PAGE_SIZE:
+        raise ValueError(f"page_size must be between 1 and {MAX_ELECTION_PAGE_SIZE}")
+    block = factory.chain_manager.blocks.head.number
+    count = factory.electionCount(block_identifier=block)
+    elections = []
+    for page in chunked(range(count), page_size):
+        elections += factory.getElections(page[0], len(page), block_identifier=block)
+    return elections
@@ -0,0 +1,100 @@
+import json
+from pathlib import Path
+
+BASELINE_VERSION = 1
+DEFAULT_TOLERANCE = 0.02
+
+
+class GasRegressionError(AssertionError):
+    """
+    Raised when a measured entry point costs more gas than its recorded baseline allows.
+    """
+
+
+class GasBaseline:
+    """
+    A versioned table of gas costs keyed by benchmark scenario name.
+
+    The baseline is stored as JSON with the schema version and one entry per
+    scenario, e.g. `"VotingApp.vote[first]": 52000`. Measurements are
+    checked against it with `check` and collected so they can be written back with
+    `save` when the baseline is deliberately regenerated.
+
+    Args:
+        path (Path): Location of the baseline JSON file.
+        tolerance (float): Allowed relative increase over the baseline before a measurement fails.
+    """
+
+    def __init__(self, path, tolerance=DEFAULT_TOLERANCE):
+        self.path = Path(path)
+        self.tolerance = tolerance
+        self.entries = {}
+        self.measured = {}
+        if self.path.exists():
+            data = json.loads(self.path.read_text())
+            if data.get("version") != BASELINE_VERSION:
+                raise ValueError(
+                    f"Unsupported gas baseline version {data.get('version')} in {self.path}"
+                )
+            self.entries = data["entries"]
+
+    def record(self, name, gas):
+        """
+        Stores a measurement without comparing it to the baseline.
+
+        Args:
+            name (str): The scenario name.
+            gas (int): The gas used by the scenario.
+        """
+        self.measured[name] = int(gas)
+
+    def check(self, name, gas):
+        """
+        Records a measurement and compares it against the baseline.
+
+        Args:
+            name (str): The scenario name.
+            gas (int): The gas used by the scenario.
+
+        Raises:
+            GasRegressionError: If the scenario has no baseline entry or if `gas` exceeds the baseline by more than the tolerance.
+        """
+        self.record(name, gas)
+        if name not in self.entries:
+            raise GasRegressionError(
+                f"No gas baseline for {name!r}; regenerate it with `make update_gas_baseline`"
+            )
+        limit = self.entries[name] * (1 + self.tolerance)
+        if gas > limit:
+            raise GasRegressionError(
+                f"{name} used {gas} gas, baseline is {self.entries[name]} (+{self.tolerance:.0%} allowed)"
+            )
+
+    def save(self):
+        """
+        Writes the measured values merged over the existing entries back to the baseline file.
+        """
+        entries = {**self.entries, **self.measured}
+        data = {
+            "version": BASELINE_VERSION,
+            "entries": dict(sorted(entries.items())),
+        }
+        self.path.write_text(json.dumps(data, indent=2) + "\n")
+
+    def report(self):
+        """
+        Formats the measured values next to their baseline as a text table.
+
+        Returns:
+            str: One line per measured scenario with the baseline and the relative change.
+        """
+        lines = []
+        width = max((len(name) for name in self.measured), default=0)
+        for name, gas in sorted(self.measured.items()):
+            base = self.entries.get(name)
+            if base:
+                delta = f"{(gas - base) / base:+.2%}"
+            else:
+                delta = "new"
+            lines.append(f"{name:<{width}}  {gas:>10}  {base or '-':>10}  {delta}")
+        return "\n".join(lines)
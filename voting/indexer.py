@@ -0,0 +1,223 @@
+import sqlite3
+
+from ape.types import LogFilter
+
+# Events replayed by the indexer; `Delegated` is only emitted by the delegate contracts.
+EVENT_NAMES = ("ProposalAdded", "RightGranted", "Voted", "Delegated")
+# Blocks fetched per `eth_getLogs` request.
+DEFAULT_BLOCK_RANGE = 2000
+
+
+class Tally:
+    """
+    The election state rebuilt from the contract events, held in memory.
+
+    `block` is the last block whose events have all been applied; indexing resumes after it.
+    """
+
+    def __init__(self):
+        self.block = -1
+        self.names = {}
+        self.vote_counts = {}
+        self.weights = {}
+        self.votes = {}
+        self.delegates = {}
+
+    def apply(self, event_name, args):
+        """
+        Applies one decoded event to the state.
+
+        Args:
+            event_name (str): One of `EVENT_NAMES`.
+            args (dict): The decoded event arguments.
+        """
+        if event_name == "ProposalAdded":
+            self.names[args["proposal"]] = args["name"]
+            self.vote_counts.setdefault(args["proposal"], 0)
+        elif event_name == "RightGranted":
+            self._set_weight(args["voter"], self.weights.get(args["voter"], 0) + args["weight"])
+        elif event_name == "Voted":
+            self._set_weight(args["voter"], 0)
+            self.votes[args["voter"]] = args["proposal"]
+            self._add_votes(args["proposal"], args["weight"])
+        elif event_name == "Delegated":
+            self._set_weight(args["voter"], 0)
+            self.delegates[args["voter"]] = args["to"]
+            target = args["delegate"]
+            if target in self.votes:
+                self._add_votes(self.votes[target], args["weight"])
+            else:
+                self._set_weight(target, self.weights.get(target, 0) + args["weight"])
+
+    def _set_weight(self, voter, weight):
+        self.weights[voter] = weight
+
+    def _add_votes(self, proposal, amount):
+        self.vote_counts[proposal] = self.vote_counts.get(proposal, 0) + amount
+
+    def commit(self, block):
+        """
+        Marks every event up to and including `block` as applied.
+
+        Args:
+            block (int): The last indexed block.
+        """
+        self.block = block
+
+    def winning_proposal(self):
+        """
+        Returns the index of the proposal with the most votes, lowest index first on ties, like `winningProposal()`.
+        """
+        return min(self.vote_counts, key=lambda i: (-self.vote_counts[i], i), default=0)
+
+    def delegation_chain(self, voter):
+        """
+        Follows the recorded delegations of `voter`.
+
+        Args:
+            voter (str): The voter address.
+
+        Returns:
+            list: The addresses on the chain after `voter`, ending with the final delegate.
+        """
+        chain = []
+        while voter in self.delegates:
+            voter = self.delegates[voter]
+            chain.append(voter)
+        return chain
+
+
+class SQLiteTally(Tally):
+    """
+    A `Tally` persisted to a SQLite database.
+
+    The changes of each indexed block range are written in one transaction together with
+    the checkpoint, so a restarted indexer resumes from the last complete range.
+
+    Args:
+        path (str): The database file, created if it does not exist.
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self._db = sqlite3.connect(path)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS checkpoint (id INTEGER PRIMARY KEY CHECK (id = 0), block INTEGER NOT NULL);
+            CREATE TABLE IF NOT EXISTS proposals (proposal INTEGER PRIMARY KEY, name TEXT NOT NULL, vote_count TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS voters (voter TEXT PRIMARY KEY, weight TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS votes (voter TEXT PRIMARY KEY, proposal INTEGER NOT NULL);
+            CREATE TABLE IF NOT EXISTS delegates (voter TEXT PRIMARY KEY, delegate TEXT NOT NULL);
+            """
+        )
+        self._load()
+
+    def _load(self):
+        row = self._db.execute("SELECT block FROM checkpoint").fetchone()
+        if row is not None:
+            self.block = row[0]
+        # Counts and weights are stored as text, they can exceed the SQLite integer range.
+        for proposal, name, vote_count in self._db.execute("SELECT proposal, name, vote_count FROM proposals"):
+            self.names[proposal] = name
+            self.vote_counts[proposal] = int(vote_count)
+        self.weights = {voter: int(weight) for voter, weight in self._db.execute("SELECT voter, weight FROM voters")}
+        self.votes = dict(self._db.execute("SELECT voter, proposal FROM votes"))
+        self.delegates = dict(self._db.execute("SELECT voter, delegate FROM delegates"))
+
+    def apply(self, event_name, args):
+        super().apply(event_name, args)
+        if event_name == "ProposalAdded":
+            self._db.execute(
+                "INSERT OR REPLACE INTO proposals VALUES (?, ?, ?)",
+                (args["proposal"], args["name"], str(self.vote_counts[args["proposal"]])),
+            )
+        elif event_name == "Voted":
+            self._db.execute("INSERT OR REPLACE INTO votes VALUES (?, ?)", (args["voter"], args["proposal"]))
+        elif event_name == "Delegated":
+            self._db.execute("INSERT OR REPLACE INTO delegates VALUES (?, ?)", (args["voter"], args["to"]))
+
+    def _set_weight(self, voter, weight):
+        super()._set_weight(voter, weight)
+        self._db.execute("INSERT OR REPLACE INTO voters VALUES (?, ?)", (voter, str(weight)))
+
+    def _add_votes(self, proposal, amount):
+        super()._add_votes(proposal, amount)
+        self._db.execute(
+            "UPDATE proposals SET vote_count = ? WHERE proposal = ?",
+            (str(self.vote_counts[proposal]), proposal),
+        )
+
+    def commit(self, block):
+        super().commit(block)
+        self._db.execute("INSERT OR REPLACE INTO checkpoint VALUES (0, ?)", (block,))
+        self._db.commit()
+
+    def close(self):
+        """
+        Closes the database; uncommitted changes are discarded.
+        """
+        self._db.close()
+
+
+class TallyIndexer:
+    """
+    Streams the events of a deployed voting contract into a `Tally`, one block range at a time.
+
+    Args:
+        contract (Contract): A deployed `VotingApp`, `DelegateVotingApp` or `PackedDelegateVotingApp`.
+        tally (Tally): The state to update, a fresh in-memory `Tally` if not given.
+        start_block (int): The first block to index when the tally has no checkpoint yet,
+            usually the deployment block of the contract.
+        block_range (int): The number of blocks fetched per log request.
+    """
+
+    def __init__(self, contract, tally=None, start_block=0, block_range=DEFAULT_BLOCK_RANGE):
+        if block_range < 1:
+            raise ValueError("block_range must be at least 1")
+        self.contract = contract
+        self.tally = Tally() if tally is None else tally
+        self.start_block = start_block
+        self.block_range = block_range
+        self._events = [getattr(contract, name).abi for name in EVENT_NAMES if hasattr(contract, name)]
+
+    def logs(self, start_block, stop_block):
+        """
+        Fetches the decoded events of the contract in a block range.
+
+        Args:
+            start_block (int): The first block, inclusive.
+            stop_block (int): The last block, inclusive.
+
+        Returns:
+            Iterator[ContractLog]: The events in chain order.
+        """
+        log_filter = LogFilter(
+            addresses=[self.contract.address],
+            events=self._events,
+            start_block=start_block,
+            stop_block=stop_block,
+        )
+        return self.contract.provider.get_contract_logs(log_filter)
+
+    def sync(self, stop_block=None):
+        """
+        Applies every event after the tally checkpoint up to `stop_block`.
+
+        Args:
+            stop_block (int): The last block to index, the current chain head if not given.
+
+        Returns:
+            int: The number of events applied.
+        """
+        if stop_block is None:
+            stop_block = self.contract.chain_manager.blocks.height
+        start_block = max(self.tally.block + 1, self.start_block)
+        applied = 0
+        while start_block <= stop_block:
+            range_stop = min(start_block + self.block_range - 1, stop_block)
+            for log in self.logs(start_block, range_stop):
+                self.tally.apply(log.event_name, log.event_arguments)
+                applied += 1
+            self.tally.commit(range_stop)
+            start_block = range_stop + 1
+        return applied
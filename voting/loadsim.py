@@ -0,0 +1,270 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
+
+from ape.exceptions import ContractLogicError
+
+from voting.model import DelegateElection
+
+VOTE = "vote"
+DELEGATE = "delegate"
+# Providers that run the EVM inside this process; they are not safe to call from several threads.
+IN_PROCESS_PROVIDERS = ("test",)
+
+
+@dataclass(frozen=True)
+class Operation:
+    """
+    One transaction of a simulated election.
+
+    Attributes:
+        sender (int): Index of the sending voter.
+        kind (str): `VOTE` or `DELEGATE`.
+        target (int): The proposal index for a vote, the index of the delegate for a delegation.
+    """
+
+    sender: int
+    kind: str
+    target: int
+
+
+@dataclass
+class Outcome:
+    """
+    The result of sending one `Operation`.
+
+    Attributes:
+        operation (Operation): The operation sent.
+        latency (float): Seconds from sending to the mined receipt or the revert.
+        receipt (ReceiptAPI): The receipt, or None if the transaction reverted.
+        queued (float): Seconds spent waiting for the send lock before sending.
+    """
+
+    operation: Operation
+    latency: float
+    receipt: object = None
+    queued: float = 0.0
+
+
+@dataclass
+class LoadReport:
+    """
+    Throughput, latency and gas of a simulated election.
+
+    Attributes:
+        transactions (int): The operations sent.
+        failed (int): The operations that reverted.
+        seconds (float): Wall time of the whole run.
+        latencies (dict): Latency in seconds at the 50th, 90th and 99th percentile.
+        gas_used (int): The gas of all mined transactions.
+        queueing (dict): Time in seconds spent waiting for the send lock, at the same percentiles.
+    """
+
+    transactions: int
+    failed: int
+    seconds: float
+    latencies: dict
+    gas_used: int
+    queueing: dict = None
+
+    @property
+    def tx_per_second(self):
+        return (self.transactions - self.failed) / self.seconds if self.seconds else 0.0
+
+    def format(self):
+        """
+        Renders the report as aligned text lines.
+        """
+        lines = [
+            f"transactions  {self.transactions} ({self.failed} reverted)",
+            f"wall time     {self.seconds:.2f}s",
+            f"throughput    {self.tx_per_second:.1f} tx/s",
+        ]
+        lines += [f"latency p{q:<3}   {seconds * 1000:.1f} ms" for q, seconds in self.latencies.items()]
+        lines += [f"queued p{q:<3}    {seconds * 1000:.1f} ms" for q, seconds in (self.queueing or {}).items()]
+        lines.append(f"gas used      {self.gas_used}")
+        return "\n".join(lines)
+
+
+def plan_operations(voter_count, proposal_count, rng, delegate_share=0.4, chain_share=0.5):
+    """
+    Draws one operation per voter, in a random order.
+
+    A voter delegates with probability `delegate_share`, otherwise it votes for a uniformly
+    drawn proposal. Delegations only point at voters that act earlier in the plan, so they
+    never form a cycle. With probability `chain_share` the delegate is a voter that delegated
+    itself, which grows delegation chains; otherwise it is any earlier voter, often one that
+    already voted.
+
+    Args:
+        voter_count (int): The number of voters.
+        proposal_count (int): The number of proposals.
+        rng (random.Random): The source of randomness.
+        delegate_share (float): The share of delegations; 0 for a `VotingApp`.
+        chain_share (float): The share of delegations that extend a chain.
+
+    Returns:
+        list: The operations, in the order they are submitted.
+    """
+    order = rng.sample(range(voter_count), voter_count)
+    operations = []
+    delegators = []
+    for position, sender in enumerate(order):
+        if position > 0 and rng.random() < delegate_share:
+            if delegators and rng.random() < chain_share:
+                target = rng.choice(delegators)
+            else:
+                target = order[rng.randrange(position)]
+            operations.append(Operation(sender, DELEGATE, target))
+            delegators.append(sender)
+        else:
+            operations.append(Operation(sender, VOTE, rng.randrange(proposal_count)))
+    return operations
+
+
+def run_operations(contract, voters, operations, concurrency=1):
+    """
+    Sends the operations from up to `concurrency` threads at once.
+
+    On an in-process provider the calls are serialized with a lock, because its EVM is not
+    thread-safe; concurrency then only overlaps the client-side work. The latency of an
+    outcome starts once the lock is held, and the wait for it is recorded as `queued`.
+
+    Args:
+        contract (Contract): The deployed election.
+        voters (list): The voter accounts, indexed by `Operation.sender`.
+        operations (list): The operations to send.
+        concurrency (int): The number of transactions in flight.
+
+    Returns:
+        tuple: The outcomes in submission order and the wall time in seconds.
+    """
+    lock = threading.Lock() if contract.provider.name in IN_PROCESS_PROVIDERS else nullcontext()
+
+    def send(operation):
+        sender = voters[operation.sender]
+        submitted = time.perf_counter()
+        with lock:
+            started = time.perf_counter()
+            try:
+                if operation.kind == VOTE:
+                    receipt = contract.vote(operation.target, sender=sender)
+                else:
+                    receipt = contract.delegate(voters[operation.target], sender=sender)
+            except ContractLogicError:
+                receipt = None
+            finished = time.perf_counter()
+        return Outcome(operation, finished - started, receipt, queued=started - submitted)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(send, operations))
+    return outcomes, time.perf_counter() - started
+
+
+def percentile(values, q):
+    """
+    Returns the `q`-th percentile of `values` by the nearest-rank method.
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(outcomes, seconds):
+    """
+    Builds the `LoadReport` of a run.
+
+    Args:
+        outcomes (list): The outcomes returned by `run_operations`.
+        seconds (float): The wall time returned by `run_operations`.
+
+    Returns:
+        LoadReport: The report.
+    """
+    latencies = [outcome.latency for outcome in outcomes]
+    queued = [outcome.queued for outcome in outcomes]
+    mined = [outcome.receipt for outcome in outcomes if outcome.receipt is not None]
+    return LoadReport(
+        transactions=len(outcomes),
+        failed=len(outcomes) - len(mined),
+        seconds=seconds,
+        latencies={q: percentile(latencies, q) for q in (50, 90, 99)},
+        gas_used=sum(receipt.gas_used for receipt in mined),
+        queueing={q: percentile(queued, q) for q in (50, 90, 99)},
+    )
+
+
+def replay(model, voters, outcomes):
+    """
+    Applies the mined operations to a `DelegateElection` in the order the chain executed them.
+
+    Reverted operations left no trace on chain and are skipped.
+
+    Args:
+        model (DelegateElection): The model with the proposals and voters already registered.
+        voters (list): The voter accounts, indexed by `Operation.sender`.
+        outcomes (list): The outcomes returned by `run_operations`.
+
+    Raises:
+        Reverted: If an operation that was mined reverts in the model.
+    """
+    mined = [outcome for outcome in outcomes if outcome.receipt is not None]
+    web3 = getattr(mined[0].receipt.provider, "web3", None) if mined else None
+
+    def position(outcome):
+        receipt = outcome.receipt
+        index = web3.eth.get_transaction(receipt.txn_hash)["transactionIndex"] if web3 else 0
+        return receipt.block_number, index
+
+    for outcome in sorted(mined, key=position):
+        operation = outcome.operation
+        sender = voters[operation.sender].address
+        if operation.kind == VOTE:
+            model.vote(sender, operation.target)
+        else:
+            model.delegate(sender, voters[operation.target].address)
+
+
+def check_tallies(model, contract):
+    """
+    Compares the vote counts and the winner of the contract with the model.
+
+    Args:
+        model (DelegateElection): The replayed model.
+        contract (Contract): The deployed election.
+
+    Returns:
+        list: A description of each mismatch; empty when the tallies agree.
+    """
+    mismatches = []
+    for i, proposal in enumerate(model.proposals):
+        on_chain = contract.proposals(i).voteCount
+        if on_chain != proposal.voteCount:
+            mismatches.append(f"proposal {i}: contract {on_chain}, model {proposal.voteCount}")
+    if contract.winningProposal() != model.winningProposal():
+        mismatches.append(f"winner: contract {contract.winningProposal()}, model {model.winningProposal()}")
+    return mismatches
+
+
+def new_model(chairperson, proposal_names, registrations):
+    """
+    Builds the `DelegateElection` matching a freshly seeded contract.
+
+    Args:
+        chairperson (str): The deployer address.
+        proposal_names (list): The proposals added at deployment.
+        registrations (list): The `(address, weight)` pairs registered with `giveRightToVoteBatch`.
+
+    Returns:
+        DelegateElection: The model.
+    """
+    model = DelegateElection(chairperson, len(proposal_names))
+    for name in proposal_names:
+        model.addProposal(chairperson, name)
+    model.giveRightToVoteBatch(chairperson, registrations)
+    return model
@@ -0,0 +1,120 @@
+import asyncio
+import threading
+from collections.abc import Mapping
+
+from aiohttp import web
+
+# JSON-RPC error code for a failed call, as used by geth for reverts and rejected transactions.
+SERVER_ERROR = -32000
+
+
+def to_json_rpc(value):
+    """
+    Converts a result of a web3 provider to its JSON-RPC form: integers become hex quantities and bytes hex strings.
+    """
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, int):
+        return hex(value)
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+    if isinstance(value, Mapping):
+        return {key: to_json_rpc(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json_rpc(item) for item in value]
+    return value
+
+
+class LocalNode:
+    """
+    A JSON-RPC HTTP endpoint in front of a web3 provider, standing in for a node in tests and benchmarks.
+
+    It serves on a background thread with its own event loop and answers single and batched
+    requests through the web3 provider and its middlewares, so it shares the chain with the ape session it
+    is started from, e.g. `LocalNode(chain.provider.web3)`. Each call runs on the server thread;
+    do not use ape while a client is talking to the node. A `latency` delays every HTTP
+    response to model the round trip to a remote node.
+
+    Args:
+        web3 (Web3): The connected web3 instance to serve.
+        host (str): The interface to listen on.
+        port (int): The port to listen on; 0 picks a free one.
+        latency (float): Seconds each HTTP request is delayed.
+
+    Attributes:
+        url (str): The endpoint, set once the node is started.
+        http_requests (int): The HTTP requests served.
+        rpc_requests (int): The JSON-RPC calls answered.
+    """
+
+    def __init__(self, web3, host="127.0.0.1", port=0, latency=0.0):
+        self.web3 = web3
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.url = None
+        self.http_requests = 0
+        self.rpc_requests = 0
+        self._loop = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        """
+        Starts serving and returns once the endpoint accepts connections.
+        """
+        started = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._serve, args=(started,), name="local-node", daemon=True)
+        self._thread.start()
+        started.wait()
+
+    def stop(self):
+        """
+        Stops serving and waits for the server thread to end.
+        """
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def _serve(self, started):
+        app = web.Application()
+        app.router.add_post("/", self._handle)
+        runner = web.AppRunner(app, access_log=None)
+        self._loop.run_until_complete(runner.setup())
+        self._loop.run_until_complete(web.TCPSite(runner, self.host, self.port).start())
+        host, port = runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}"
+        started.set()
+        self._loop.run_forever()
+        self._loop.run_until_complete(runner.cleanup())
+        self._loop.close()
+
+    async def _handle(self, request):
+        body = await request.json()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.http_requests += 1
+        if isinstance(body, list):
+            return web.json_response([self._answer(payload) for payload in body])
+        return web.json_response(self._answer(body))
+
+    def _answer(self, payload):
+        self.rpc_requests += 1
+        response = {"jsonrpc": "2.0", "id": payload.get("id")}
+        try:
+            make_request = self.web3.provider.request_func(self.web3, self.web3.middleware_onion)
+            result = make_request(payload["method"], payload.get("params", []))
+        except Exception as exc:
+            response["error"] = {"code": SERVER_ERROR, "message": str(exc)}
+            return response
+        if "error" in result:
+            response["error"] = dict(result["error"])
+        else:
+            response["result"] = to_json_rpc(result["result"])
+        return response
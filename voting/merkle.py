@@ -0,0 +1,214 @@
+import os
+from pathlib import Path
+
+from eth_abi import encode
+from eth_utils import keccak, to_checksum_address
+
+# Mirrors `MAX_PROOF_DEPTH` in contracts/VotingApp.vy and contracts/DelegateVotingApp.vy.
+MAX_PROOF_DEPTH = 32
+NODE_SIZE = 32
+# Number of nodes read or written per file operation while building a level.
+_BUFFER_NODES = 4096
+
+
+def leaf_hash(address, weight):
+    """
+    Hashes a voter the way `_claimWeight` does: `keccak256(keccak256(abi.encode(address, weight)))`.
+
+    Args:
+        address (str): The voter address.
+        weight (int): The voting weight granted to the voter.
+
+    Returns:
+        bytes: The 32-byte leaf.
+    """
+    return keccak(keccak(encode(["address", "uint256"], [to_checksum_address(address), weight])))
+
+
+def hash_pair(a, b):
+    """
+    Hashes two sibling nodes in ascending order, matching `_verifyProof`.
+
+    Args:
+        a (bytes): A 32-byte node.
+        b (bytes): The sibling node.
+
+    Returns:
+        bytes: The 32-byte parent node.
+    """
+    return keccak(a + b) if a < b else keccak(b + a)
+
+
+def verify_proof(leaf, proof, root):
+    """
+    Checks a proof off-chain with the same folding as the contracts.
+
+    Args:
+        leaf (bytes): The leaf hash.
+        proof (list): The sibling hashes from the leaf level upwards.
+        root (bytes): The expected root.
+
+    Returns:
+        bool: True if the proof folds `leaf` into `root`.
+    """
+    computed = leaf
+    for node in proof:
+        computed = hash_pair(computed, node)
+    return computed == root
+
+
+class MerkleTree:
+    """
+    A Merkle tree of `(address, weight)` leaves whose levels live in binary files on disk.
+
+    Each level is stored as `level_<n>.bin`, a flat array of 32-byte nodes, so building
+    the tree and generating proofs only keeps a small buffer in memory regardless of the
+    number of voters. A node without a sibling is promoted to the next level unchanged,
+    which means the proof for it skips that level.
+
+    Args:
+        directory (Path): The directory holding the level files of an already built tree.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.sizes = []
+        while (path := self._level_path(len(self.sizes))).exists():
+            self.sizes.append(path.stat().st_size // NODE_SIZE)
+        if not self.sizes or self.sizes[0] == 0:
+            raise ValueError(f"No Merkle tree found in {self.directory}")
+
+    @classmethod
+    def build(cls, voters, directory):
+        """
+        Builds a tree by streaming voters to disk level by level.
+
+        Args:
+            voters (Iterable): The `(address, weight)` pairs, e.g. from `voting.batching.read_voters`.
+            directory (Path): The directory to write the level files to. Level files of a tree
+                built there before are deleted first, so a smaller tree leaves no stale levels.
+
+        Returns:
+            MerkleTree: The built tree.
+
+        Raises:
+            ValueError: If `voters` is empty or the tree would be deeper than `MAX_PROOF_DEPTH`.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for stale in directory.glob("level_*.bin"):
+            stale.unlink()
+        with open(directory / "level_0.bin", "wb") as out:
+            buffer = []
+            for address, weight in voters:
+                buffer.append(leaf_hash(address, weight))
+                if len(buffer) == _BUFFER_NODES:
+                    out.write(b"".join(buffer))
+                    buffer.clear()
+            out.write(b"".join(buffer))
+
+        level = 0
+        size = os.path.getsize(directory / "level_0.bin") // NODE_SIZE
+        if size == 0:
+            raise ValueError("Cannot build a Merkle tree without voters")
+        while size > 1:
+            if level == MAX_PROOF_DEPTH:
+                raise ValueError(f"Too many voters for a proof depth of {MAX_PROOF_DEPTH}")
+            size = cls._build_parent_level(directory, level)
+            level += 1
+        return cls(directory)
+
+    @staticmethod
+    def _build_parent_level(directory, level):
+        chunk = _BUFFER_NODES * NODE_SIZE
+        parents = 0
+        with open(directory / f"level_{level}.bin", "rb") as src, open(
+            directory / f"level_{level + 1}.bin", "wb"
+        ) as out:
+            while data := src.read(chunk):
+                nodes = [data[i : i + NODE_SIZE] for i in range(0, len(data), NODE_SIZE)]
+                out.write(
+                    b"".join(
+                        hash_pair(nodes[i], nodes[i + 1]) if i + 1 < len(nodes) else nodes[i]
+                        for i in range(0, len(nodes), 2)
+                    )
+                )
+                parents += (len(nodes) + 1) // 2
+        return parents
+
+    def _level_path(self, level):
+        return self.directory / f"level_{level}.bin"
+
+    def _node(self, f, index):
+        f.seek(index * NODE_SIZE)
+        return f.read(NODE_SIZE)
+
+    @property
+    def size(self):
+        """
+        int: The number of leaves.
+        """
+        return self.sizes[0]
+
+    @property
+    def depth(self):
+        """
+        int: The number of levels above the leaves, i.e. the longest proof.
+        """
+        return len(self.sizes) - 1
+
+    @property
+    def root(self):
+        """
+        bytes: The 32-byte root to pass to `setVoterRoot`.
+        """
+        with open(self._level_path(self.depth), "rb") as f:
+            return f.read(NODE_SIZE)
+
+    def proof(self, index):
+        """
+        Generates the proof for the leaf at `index` by reading one sibling per level.
+
+        Args:
+            index (int): The position of the voter in the input order.
+
+        Returns:
+            list: The sibling hashes from the leaf level upwards.
+
+        Raises:
+            IndexError: If `index` is out of range.
+        """
+        if not 0 <= index < self.size:
+            raise IndexError(f"Leaf {index} out of range for {self.size} voters")
+        proof = []
+        for level, size in enumerate(self.sizes[:-1]):
+            sibling = index ^ 1
+            if sibling < size:
+                with open(self._level_path(level), "rb") as f:
+                    proof.append(self._node(f, sibling))
+            index //= 2
+        return proof
+
+    def proofs(self, voters):
+        """
+        Streams the proof of every voter, in the same order the tree was built from.
+
+        Args:
+            voters (Iterable): The same `(address, weight)` pairs given to `build`.
+
+        Yields:
+            tuple: The address, the weight and the proof of each voter.
+        """
+        files = [open(self._level_path(level), "rb") for level in range(self.depth)]
+        try:
+            for leaf, (address, weight) in enumerate(voters):
+                proof = []
+                index = leaf
+                for f, size in zip(files, self.sizes):
+                    if index ^ 1 < size:
+                        proof.append(self._node(f, index ^ 1))
+                    index //= 2
+                yield address, weight, proof
+        finally:
+            for f in files:
+                f.close()
@@ -0,0 +1,268 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+ZERO_ADDRESS = "0x" + "0" * 40
+# Mirror the delegation constants in contracts/DelegateVotingApp.vy and contracts/PackedDelegateVotingApp.vy.
+MAX_DELEGATION_HOPS = 32
+MIN_COMPRESSED_HOPS = 4
+
+
+class Reverted(Exception):
+    """
+    Raised when the modelled contract call would revert. The model state is left unchanged.
+    """
+
+
+@dataclass
+class Voter:
+    weight: int = 0
+    voted: bool = False
+    delegate: str = ZERO_ADDRESS
+    vote: int = 0
+
+
+@dataclass
+class Proposal:
+    name: str
+    voteCount: int = 0
+
+
+def _require(condition):
+    if not condition:
+        raise Reverted()
+
+
+class Election:
+    """
+    An in-memory model of `VotingApp` used as the reference for differential tests.
+
+    Every method mirrors the contract function of the same name, checks the same
+    conditions in the same order and raises `Reverted` without touching the state when
+    the contract would revert. Methods take the transaction sender as first argument.
+
+    Args:
+        chairperson (str): The deployer address.
+        max_proposals (int): The proposal cap given to the constructor.
+    """
+
+    def __init__(self, chairperson, max_proposals):
+        _require(max_proposals > 0)
+        self.chairperson = chairperson
+        self.max_proposals = max_proposals
+        self.voters = {}
+        self.proposals = []
+        self.voterCount = 0
+        self.granted = {}
+
+    def voter(self, addr):
+        """
+        Returns the state of `addr`, like the `voters(address)` getter.
+
+        Args:
+            addr (str): The voter address.
+
+        Returns:
+            Voter: The voter, or an empty voter if `addr` is unknown.
+        """
+        return self.voters.get(addr, Voter())
+
+    def directlyVoted(self, addr):
+        voter = self.voter(addr)
+        return voter.voted and voter.delegate == ZERO_ADDRESS
+
+    def addProposal(self, sender, name):
+        _require(sender == self.chairperson)
+        _require(len(self.proposals) < self.max_proposals)
+        self.proposals.append(Proposal(name))
+
+    def giveRightToVote(self, sender, addr, weight):
+        self.giveRightToVoteBatch(sender, [(addr, weight)])
+
+    def giveRightToVoteBatch(self, sender, voters):
+        _require(sender == self.chairperson)
+        granted = {}
+        for addr, weight in voters:
+            voter = granted.get(addr) or self.voter(addr)
+            _require(not voter.voted)
+            _require(voter.weight == 0)
+            granted[addr] = Voter(weight=weight)
+        self.voters.update(granted)
+        self.granted.update((addr, voter.weight) for addr, voter in granted.items())
+        self.voterCount += len(voters)
+
+    def vote(self, sender, proposal):
+        voter = self.voter(sender)
+        _require(not voter.voted)
+        _require(proposal < len(self.proposals))
+        self.proposals[proposal].voteCount += voter.weight
+        self.voters[sender] = Voter(weight=0, voted=True, delegate=voter.delegate, vote=proposal)
+
+    def winningProposal(self):
+        winner = 0
+        for i, proposal in enumerate(self.proposals):
+            if proposal.voteCount > self.proposals[winner].voteCount:
+                winner = i
+        return winner
+
+
+class DelegateElection(Election):
+    """
+    An in-memory model of `DelegateVotingApp` and `PackedDelegateVotingApp`.
+
+    The path-compression shortcuts are modelled as well, because they decide whether a
+    delegation fits within `MAX_DELEGATION_HOPS`.
+
+    Args:
+        chairperson (str): The deployer address.
+        max_proposals (int): The proposal cap given to the constructor.
+        max_delegation_hops (int): The per-call bound of the delegation walk.
+    """
+
+    def __init__(self, chairperson, max_proposals, max_delegation_hops=MAX_DELEGATION_HOPS):
+        super().__init__(chairperson, max_proposals)
+        self.max_delegation_hops = max_delegation_hops
+        self.shortcuts = {}
+        self.cast = {}
+
+    def getVotes(self, addr):
+        """
+        Returns the voting power of `addr` like the `getVotes` view of `DelegateVotingApp`: its unspent weight plus the weight it cast directly or that reached its vote through delegations.
+        """
+        return self.voter(addr).weight + self.cast.get(addr, 0)
+
+    def delegated(self, addr):
+        return self.voter(addr).delegate != ZERO_ADDRESS
+
+    def _next_hop(self, addr, follow_shortcut):
+        return (follow_shortcut and self.shortcuts.get(addr)) or self.voter(addr).delegate
+
+    def _resolve_delegate(self, origin, min_compressed_hops):
+        visited = []
+        target = self._next_hop(origin, False)
+        for _ in range(self.max_delegation_hops):
+            if target == origin or not self.delegated(target):
+                break
+            visited.append(target)
+            target = self._next_hop(target, len(visited) > MIN_COMPRESSED_HOPS)
+        if len(visited) <= min_compressed_hops:
+            return target, {}
+        return target, {node: target for node in visited[:-1]}
+
+    def compressDelegation(self, sender, addr):
+        if not self.delegated(addr):
+            return True
+        target, shortcuts = self._resolve_delegate(addr, 0)
+        self.shortcuts.update(shortcuts)
+        return not self.delegated(target)
+
+    def vote(self, sender, proposal):
+        weight = self.voter(sender).weight
+        super().vote(sender, proposal)
+        self.cast[sender] = weight
+
+    def delegate(self, sender, to):
+        voter = self.voter(sender)
+        _require(not voter.voted)
+        _require(to != sender)
+        _require(to != ZERO_ADDRESS)
+        _require(voter.weight > 0)
+
+        # The contract records the delegation before walking the chain.
+        self.voters[sender] = Voter(weight=voter.weight, voted=True, delegate=to, vote=voter.vote)
+        try:
+            target, shortcuts = self._resolve_delegate(sender, MIN_COMPRESSED_HOPS)
+            _require(target != sender)
+            _require(not self.delegated(target))
+        except Reverted:
+            self.voters[sender] = voter
+            raise
+        self.shortcuts.update(shortcuts)
+
+        self.voters[sender].weight = 0
+        receiver = self.voters.setdefault(target, Voter())
+        if self.directlyVoted(target):
+            self.proposals[receiver.vote].voteCount += voter.weight
+            self.cast[target] += voter.weight
+        else:
+            receiver.weight += voter.weight
+
+
+@dataclass
+class VoterArrays:
+    """
+    The final state of an election as NumPy arrays indexed by voter, for tallying millions of voters at once.
+
+    Attributes:
+        weights (np.ndarray): The granted weight of each voter, `uint64`.
+        votes (np.ndarray): The proposal each voter voted for directly, -1 if it did not, `int64`.
+        delegates (np.ndarray): The index of each voter's direct delegate, -1 if it did not delegate, `int64`.
+    """
+
+    weights: np.ndarray
+    votes: np.ndarray
+    delegates: np.ndarray
+
+    @classmethod
+    def from_election(cls, election):
+        """
+        Converts the state of an `Election` or `DelegateElection`.
+
+        Args:
+            election (Election): The model.
+
+        Returns:
+            tuple: The `VoterArrays` and the list of addresses giving the voter order.
+        """
+        addresses = sorted(election.voters)
+        index = {address: i for i, address in enumerate(addresses)}
+        voters = [election.voters[address] for address in addresses]
+        arrays = cls(
+            weights=np.array([election.granted.get(a, 0) for a in addresses], dtype=np.uint64),
+            votes=np.array([v.vote if v.voted and v.delegate == ZERO_ADDRESS else -1 for v in voters], dtype=np.int64),
+            delegates=np.array([index.get(v.delegate, -1) for v in voters], dtype=np.int64),
+        )
+        return arrays, addresses
+
+    def final_delegates(self):
+        """
+        Resolves every delegation chain to its last voter by pointer doubling.
+
+        Each round replaces every pointer by its pointer's pointer, so chains of length `L`
+        are resolved in `ceil(log2(L)) + 1` vectorized rounds.
+
+        Returns:
+            np.ndarray: The index of the final delegate of each voter, itself if it did not delegate.
+
+        Raises:
+            ValueError: If the delegations contain a cycle.
+        """
+        count = len(self.delegates)
+        roots = np.where(self.delegates < 0, np.arange(count), self.delegates)
+        for _ in range(max(count, 1).bit_length() + 1):
+            jumped = roots[roots]
+            if np.array_equal(jumped, roots):
+                return roots
+            roots = jumped
+        raise ValueError("The delegations contain a cycle")
+
+    def tally(self, proposal_count):
+        """
+        Computes the vote count of each proposal.
+
+        The result equals the contract's incremental tally: the weight of every voter ends
+        up with the proposal its final delegate voted for directly, whatever the order of
+        the votes and delegations. Weight delegated to a voter that has not voted yet is
+        not counted.
+
+        Args:
+            proposal_count (int): The number of proposals.
+
+        Returns:
+            np.ndarray: The `uint64` vote count of each proposal; the total weight must stay below 2**64.
+        """
+        final_votes = self.votes[self.final_delegates()]
+        counted = final_votes >= 0
+        counts = np.zeros(proposal_count, dtype=np.uint64)
+        np.add.at(counts, final_votes[counted], self.weights[counted])
+        return counts
@@ -0,0 +1,64 @@
+from eth_utils import keccak
+
+
+def proposal_name_hash(name):
+    """
+    Hashes a proposal name the way `PackedDelegateVotingApp.addProposal` stores it.
+
+    Args:
+        name (str): The proposal name.
+
+    Returns:
+        bytes: The 32-byte keccak256 hash of the UTF-8 encoded name.
+    """
+    return keccak(text=name)
+
+
+class ProposalNames:
+    """
+    The off-chain metadata table mapping the proposal name hashes of a `PackedDelegateVotingApp` back to their names.
+
+    Args:
+        names (Iterable): The proposal names, in any order.
+    """
+
+    def __init__(self, names=()):
+        self._names = {}
+        for name in names:
+            self.add(name)
+
+    def add(self, name):
+        """
+        Adds a proposal name to the table.
+
+        Args:
+            name (str): The proposal name.
+        """
+        self._names[proposal_name_hash(name)] = name
+
+    def name(self, name_hash):
+        """
+        Resolves a name hash read from the contract.
+
+        Args:
+            name_hash (bytes): The `nameHash` of a proposal or the result of `winnerNameHash()`.
+
+        Returns:
+            str: The proposal name.
+
+        Raises:
+            KeyError: If the hash does not belong to a known proposal.
+        """
+        return self._names[bytes(name_hash)]
+
+    def winner_name(self, contract):
+        """
+        Reads the winning proposal of `contract` and resolves its name, the counterpart of `winnerName()` on the unpacked contracts.
+
+        Args:
+            contract (Contract): A deployed `PackedDelegateVotingApp` instance.
+
+        Returns:
+            str: The name of the winning proposal.
+        """
+        return self.name(contract.winnerNameHash())
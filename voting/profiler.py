@@ -0,0 +1,384 @@
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from vyper.compiler.phases import CompilerData
+from vyper.semantics.types import HashMapT, StructT
+
+# Opcodes whose stack arguments the profiler reads before they run.
+SLOAD = 0x54
+SSTORE = 0x55
+SHA3 = 0x20
+# Largest slot a plain storage variable can have; a larger slot is a hash of a map key.
+MAX_PLAIN_SLOT = 2**32
+# Furthest a struct member or string word lies past the hash its slot is derived from.
+MAX_MEMBER_OFFSET = 2**16
+MINIMAL_PROXY_PREFIX = bytes.fromhex("363d3d373d3d3d363d73")
+PROXY_LABEL = "EIP1167Proxy"
+DEFAULT_REPORT_ROWS = 20
+_DEF = re.compile(r"^def (\w+)\(")
+
+
+def _function_lines(source):
+    """
+    Returns the `(line, name)` of every function definition in a Vyper source, in order.
+    """
+    return [(number, match[1]) for number, line in enumerate(source.splitlines(), 1) if (match := _DEF.match(line))]
+
+
+def _member(typ, offset):
+    """
+    Returns the struct member path, e.g. `.voteCount`, of the word `offset` slots into a value of `typ`.
+    """
+    if not isinstance(typ, StructT):
+        return ""
+    for name, member in typ.members.items():
+        size = member.storage_size_in_words
+        if offset < size:
+            return f".{name}{_member(member, offset)}"
+        offset -= size
+    return ""
+
+
+class ContractProfile:
+    """
+    What the profiler knows about one compiled contract: how to recognise its code, which
+    function each program counter belongs to and which variable each storage slot holds.
+
+    Args:
+        contract_type (ContractType): The compiled contract, with its `pcmap`.
+        source (str): The Vyper source the contract was compiled from.
+    """
+
+    def __init__(self, contract_type, source):
+        self.name = contract_type.name
+        self.runtime_code = bytes(contract_type.runtime_bytecode.to_bytes())
+        self.deployment_code = bytes(contract_type.deployment_bytecode.to_bytes())
+        self.selectors = {
+            bytes.fromhex(selector[2:]): signature.split("(")[0]
+            for signature, selector in contract_type.method_identifiers.items()
+        }
+        self.functions = {}
+        lines = _function_lines(source)
+        for pc, item in (contract_type.pcmap.root if contract_type.pcmap else {}).items():
+            location = item.get("location")
+            owners = [name for number, name in lines if location and number <= location[0]]
+            if owners:
+                self.functions[int(pc)] = owners[-1]
+        global_ctx = CompilerData(source).global_ctx
+        self.variables = sorted(
+            (info.position.position, info.typ.storage_size_in_words, name, info.typ)
+            for name, info in global_ctx.variables.items()
+            if not (info.is_constant or info.is_immutable)
+        )
+
+    def variable(self, slot):
+        """
+        Returns the name and type of the plain storage variable that spans `slot`, or None.
+        """
+        for start, size, name, typ in self.variables:
+            if start <= slot < start + size:
+                return f"{name}{_member(typ, slot - start)}", typ
+        return None
+
+
+@dataclass
+class Frame:
+    """
+    One call frame of a profiled transaction.
+
+    Attributes:
+        contract (ContractProfile): The contract whose code runs in the frame, or None if unknown.
+        label (str): The contract name, or the code address if the code is unknown.
+        entry (str): The external function selected by the calldata, `__init__` for a deployment.
+        is_create (bool): Whether the frame runs init code.
+        child_gas (int): Gas used so far by the frames this one called.
+    """
+
+    contract: ContractProfile
+    label: str
+    entry: str
+    is_create: bool
+    child_gas: int = 0
+
+
+@dataclass
+class GasProfile:
+    """
+    Gas aggregated over the profiled transactions. Every table maps a key tuple to `[count, gas]`.
+
+    Attributes:
+        transactions (dict): Per `(contract, function)` called by a transaction, the transactions and their gas used.
+        functions (dict): Per `(contract, function)`, the executed opcodes and their gas, excluding calls to other frames.
+        storage (dict): Per `(contract, variable, opcode, access)`, the `SLOAD`/`SSTORE` accesses and their gas, where access is `cold` or `warm`.
+        opcodes (dict): Per opcode mnemonic, the executions and their gas.
+    """
+
+    transactions: dict = field(default_factory=dict)
+    functions: dict = field(default_factory=dict)
+    storage: dict = field(default_factory=dict)
+    opcodes: dict = field(default_factory=dict)
+
+    @property
+    def gas_used(self):
+        return sum(gas for _, gas in self.transactions.values())
+
+    @property
+    def execution_gas(self):
+        return sum(gas for _, gas in self.opcodes.values())
+
+    def to_json(self):
+        """
+        Returns the profile as a JSON-serializable dict with every table ranked by gas.
+        """
+
+        def ranked(table, names):
+            rows = sorted(table.items(), key=lambda item: (-item[1][1], item[0]))
+            return [{**dict(zip(names, key)), "count": count, "gas": gas} for key, (count, gas) in rows]
+
+        return {
+            "gas_used": self.gas_used,
+            "execution_gas": self.execution_gas,
+            "transactions": ranked(self.transactions, ("contract", "function")),
+            "functions": ranked(self.functions, ("contract", "function")),
+            "storage": ranked(self.storage, ("contract", "variable", "opcode", "access")),
+            "opcodes": ranked(self.opcodes, ("opcode",)),
+        }
+
+    def format(self, rows=DEFAULT_REPORT_ROWS):
+        """
+        Renders the hottest `rows` entries of each table as aligned text.
+        """
+        data = self.to_json()
+        count = sum(row["count"] for row in data["transactions"])
+        lines = [
+            f"transactions    {count}",
+            f"gas used        {data['gas_used']}",
+            f"execution gas   {data['execution_gas']} (the rest is intrinsic gas, code deposits and refunds)",
+        ]
+        sections = (
+            ("transactions", "Transactions", ("contract", "function")),
+            ("functions", "Functions (own gas)", ("contract", "function")),
+            ("storage", "Storage accesses", ("contract", "variable", "opcode", "access")),
+            ("opcodes", "Opcodes", ("opcode",)),
+        )
+        total = data["execution_gas"] or 1
+        for key, title, names in sections:
+            entries = data[key][:rows]
+            labels = [" ".join(str(row[name]) for name in names) for row in entries]
+            width = max(map(len, labels), default=0)
+            lines += ["", title]
+            for label, row in zip(labels, entries):
+                share = f"{row['gas'] / total:6.1%}" if key != "transactions" else ""
+                lines.append(f"  {label:<{width}}  {row['count']:>8}  {row['gas']:>12}  {share}".rstrip())
+        return "\n".join(lines)
+
+    def write(self, path, rows=DEFAULT_REPORT_ROWS):
+        """
+        Writes the profile as JSON to `path` and as text next to it with a `.txt` suffix.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_json(), indent=2) + "\n")
+        path.with_suffix(".txt").write_text(self.format(rows) + "\n")
+
+
+class GasProfiler:
+    """
+    Traces every transaction mined by the local eth-tester chain opcode by opcode and
+    aggregates the gas into a `GasProfile`.
+
+    The profiler wraps the opcodes of the chain's py-evm computation class while it is
+    installed. Only transactions are traced; calls and gas estimates run untraced. Gas is
+    attributed to the Vyper function a program counter belongs to through the contract's
+    `pcmap`, and storage slots are named after the variable, map entry and struct member
+    they hold by remembering the preimages of the 64-byte hashes Vyper derives map slots from.
+
+    Args:
+        contracts (list): `(contract_type, source)` pairs of the contracts to recognise.
+    """
+
+    def __init__(self, contracts):
+        self.contracts = [ContractProfile(contract_type, source) for contract_type, source in contracts]
+        self.profile = GasProfile()
+        self._code_contracts = {}
+        self._slot_names = {}
+        self._preimages = {}
+        self._frames = []
+        self._entry = None
+        self._tracing = False
+        self._patches = []
+
+    def install(self, provider):
+        """
+        Starts tracing the transactions of `provider`.
+
+        Raises:
+            ValueError: If `provider` does not run a py-evm chain in this process.
+        """
+        backend = getattr(provider, "evm_backend", None)
+        if backend is None:
+            raise ValueError(f"gas profiling needs the local eth-tester provider, not {provider.name!r}")
+        chain_class = type(backend.chain)
+        computation_class = backend.chain.get_vm().get_state_class().computation_class
+        apply_transaction = chain_class.apply_transaction
+        apply_computation = computation_class.apply_computation.__func__
+        profiler = self
+
+        def traced_transaction(chain, transaction):
+            gas_before = chain.header.gas_used
+            profiler._tracing = True
+            try:
+                result = apply_transaction(chain, transaction)
+            finally:
+                profiler._tracing = False
+            profiler._end_transaction(result[1].gas_used - gas_before)
+            return result
+
+        def traced_computation(cls, state, message, transaction_context, parent_computation=None):
+            if not profiler._tracing:
+                return apply_computation(cls, state, message, transaction_context, parent_computation)
+            frame = profiler._enter(message)
+            try:
+                computation = apply_computation(cls, state, message, transaction_context, parent_computation)
+            finally:
+                profiler._frames.pop()
+            if profiler._frames:
+                parent = profiler._frames[-1]
+                parent.child_gas += computation.get_gas_used()
+                if parent.label == PROXY_LABEL and frame.contract is not None:
+                    # A clone's transaction is reported as a call of the implementation.
+                    parent.label, parent.entry = frame.label, frame.entry
+            else:
+                profiler._entry = frame
+            return computation
+
+        opcodes = {opcode: self._wrap(opcode, function) for opcode, function in computation_class.opcodes.items()}
+        self._patch(chain_class, "apply_transaction", traced_transaction)
+        self._patch(computation_class, "apply_computation", classmethod(traced_computation))
+        self._patch(computation_class, "opcodes", opcodes)
+
+    def uninstall(self):
+        """
+        Restores the chain and computation classes patched by `install`.
+        """
+        for owner, name, original in reversed(self._patches):
+            if original is None:
+                delattr(owner, name)
+            else:
+                setattr(owner, name, original)
+        self._patches = []
+
+    def _patch(self, owner, name, value):
+        self._patches.append((owner, name, owner.__dict__.get(name)))
+        setattr(owner, name, value)
+
+    def _contract(self, code):
+        """
+        Returns the known contract whose runtime or init code starts `code`, or None.
+        """
+        if code not in self._code_contracts:
+            self._code_contracts[code] = next(
+                (
+                    contract
+                    for contract in self.contracts
+                    if code.startswith(contract.runtime_code) or code.startswith(contract.deployment_code)
+                ),
+                None,
+            )
+        return self._code_contracts[code]
+
+    def _enter(self, message):
+        code = bytes(message.code)
+        contract = self._contract(code)
+        selector = bytes(message.data[:4])
+        if contract is not None:
+            label, entry = contract.name, contract.selectors.get(selector, "0x" + selector.hex())
+        elif code.startswith(MINIMAL_PROXY_PREFIX):
+            label, entry = PROXY_LABEL, "forward"
+        else:
+            label, entry = "0x" + bytes(message.code_address).hex(), "0x" + selector.hex() if code else "transfer"
+        if message.is_create:
+            entry = "__init__"
+        frame = Frame(contract, label, entry, message.is_create)
+        self._frames.append(frame)
+        return frame
+
+    def _end_transaction(self, gas_used):
+        frame = self._entry
+        self._add(self.profile.transactions, (frame.label, frame.entry), gas_used)
+
+    @staticmethod
+    def _add(table, key, gas):
+        entry = table.get(key)
+        if entry is None:
+            table[key] = [1, gas]
+        else:
+            entry[0] += 1
+            entry[1] += gas
+
+    def _slot_name(self, contract, slot):
+        """
+        Names a storage slot after the variable it belongs to, following map slots back through their hash preimages.
+        """
+        key = (contract.name, slot)
+        if key not in self._slot_names:
+            resolved = self._resolve(contract, slot)
+            self._slot_names[key] = resolved[0] if resolved else f"0x{slot:x}"
+        return self._slot_names[key]
+
+    def _resolve(self, contract, slot):
+        if slot < MAX_PLAIN_SLOT:
+            return contract.variable(slot)
+        for offset in range(MAX_MEMBER_OFFSET):
+            base = self._preimages.get(slot - offset)
+            if base is not None:
+                parent = self._resolve(contract, base)
+                if parent is None or not isinstance(parent[1], HashMapT):
+                    return None
+                value = parent[1].value_type
+                return f"{parent[0]}[]{_member(value, offset)}", value
+        return None
+
+    def _wrap(self, opcode, function):
+        mnemonic = getattr(function, "mnemonic", None) or getattr(function.__wrapped__, "mnemonic", f"0x{opcode:02x}")
+        profile = self.profile
+        frames = self._frames
+        add = self._add
+
+        def traced(computation):
+            if not frames:
+                return function(computation=computation)
+            frame = frames[-1]
+            contract = frame.contract
+            pc = computation.code.program_counter - 1
+            gas_before = computation.get_gas_remaining()
+            child_before = frame.child_gas
+            stack = computation._stack.values
+            storage = (opcode == SLOAD or opcode == SSTORE) and contract is not None and len(stack) >= 1
+            hashing = opcode == SHA3 and len(stack) >= 2 and _word(stack[-2]) == 64
+            if storage:
+                slot = _word(stack[-1])
+                address = computation.msg.storage_address
+                access = "warm" if computation.state.is_storage_warm(address, slot) else "cold"
+            elif hashing:
+                start = _word(stack[-1])
+            try:
+                function(computation=computation)
+            finally:
+                gas = gas_before - computation.get_gas_remaining() - (frame.child_gas - child_before)
+                add(profile.opcodes, (mnemonic,), gas)
+                name = contract.functions.get(pc) if contract and not frame.is_create else None
+                add(profile.functions, (frame.label, name or frame.entry), gas)
+                if storage:
+                    add(profile.storage, (frame.label, self._slot_name(contract, slot), mnemonic, access), gas)
+            if hashing:
+                self._preimages[_word(stack[-1])] = _word(computation.memory_read_bytes(start, 32))
+
+        traced.mnemonic = mnemonic
+        return traced
+
+
+def _word(value):
+    return value if isinstance(value, int) else int.from_bytes(value, "big")
@@ -0,0 +1,265 @@
+from dataclasses import dataclass, field, replace
+
+from ape.exceptions import ContractLogicError
+from eth_account import Account
+from eth_account.messages import encode_typed_data
+from eth_utils import to_checksum_address
+
+from voting.batching import GAS_LIMIT_MARGIN
+
+ZERO_ADDRESS = "0x" + "0" * 40
+# Mirrors `MAX_RELAY_BATCH_SIZE` in contracts/DelegateVotingApp.vy.
+MAX_RELAY_BATCH_SIZE = 500
+# Gas of one `relayBatch` call excluding the intents, and the gas each intent adds. Measured
+# by tests/test_gas_benchmark.py and rounded up; a delegation is budgeted for a short chain
+# to a delegate that gets its first voting power checkpoint of the block. A delegation down a
+# long chain costs more, so these only size the first try; `Relayer` checks each batch with
+# a gas estimate before sending it.
+RELAY_BASE_GAS = 80_000
+GAS_PER_RELAYED_VOTE = 40_000
+GAS_PER_RELAYED_DELEGATION = 120_000
+
+EIP712_TYPES = {
+    "EIP712Domain": [
+        {"name": "name", "type": "string"},
+        {"name": "version", "type": "string"},
+        {"name": "chainId", "type": "uint256"},
+        {"name": "verifyingContract", "type": "address"},
+    ],
+    "Vote": [
+        {"name": "voter", "type": "address"},
+        {"name": "proposal", "type": "uint256"},
+        {"name": "nonce", "type": "uint256"},
+    ],
+    "Delegate": [
+        {"name": "voter", "type": "address"},
+        {"name": "to", "type": "address"},
+        {"name": "nonce", "type": "uint256"},
+    ],
+}
+
+
+@dataclass(frozen=True)
+class Intent:
+    """
+    A vote or delegation signed by a voter, in the field order of the contract's `Intent` struct.
+
+    Attributes:
+        voter (str): The signing voter.
+        is_delegation (bool): True for a delegation to `to`, False for a vote for `proposal`.
+        proposal (int): The proposal voted for; 0 for a delegation.
+        to (str): The delegate; the zero address for a vote.
+        nonce (int): The voter's `nonces(voter)` at signing time.
+        v (int): The signature recovery id.
+        r (bytes): The signature `r`, 32 bytes.
+        s (bytes): The signature `s`, 32 bytes.
+    """
+
+    voter: str
+    is_delegation: bool
+    proposal: int
+    to: str
+    nonce: int
+    v: int = 0
+    r: bytes = field(default=b"\x00" * 32, repr=False)
+    s: bytes = field(default=b"\x00" * 32, repr=False)
+
+    def as_tuple(self):
+        return (self.voter, self.is_delegation, self.proposal, self.to, self.nonce, self.v, self.r, self.s)
+
+
+def eip712_domain(contract):
+    """
+    Reads the EIP-712 domain of a contract through its EIP-5267 `eip712Domain` view.
+
+    The domain is read rather than rebuilt locally because it holds the chain id the EVM
+    reports to the contract, which a local test chain may not share with its RPC.
+
+    Args:
+        contract (Contract): The `DelegateVotingApp` or one of its clones.
+
+    Returns:
+        dict: The `name`, `version`, `chainId` and `verifyingContract` of the domain.
+    """
+    _, name, version, chain_id, verifying_contract, _, _ = contract.eip712Domain()
+    return {"name": name, "version": version, "chainId": chain_id, "verifyingContract": verifying_contract}
+
+
+def typed_data(domain, intent):
+    """
+    Builds the EIP-712 typed data a voter signs for an intent.
+
+    Args:
+        domain (dict): The domain returned by `eip712_domain`.
+        intent (Intent): The intent; the signature fields are ignored.
+
+    Returns:
+        dict: The full typed data message.
+    """
+    if intent.is_delegation:
+        primary_type, message = "Delegate", {"voter": intent.voter, "to": intent.to, "nonce": intent.nonce}
+    else:
+        primary_type, message = "Vote", {"voter": intent.voter, "proposal": intent.proposal, "nonce": intent.nonce}
+    return {
+        "types": {"EIP712Domain": EIP712_TYPES["EIP712Domain"], primary_type: EIP712_TYPES[primary_type]},
+        "primaryType": primary_type,
+        "domain": domain,
+        "message": message,
+    }
+
+
+def sign_intent(account, contract, proposal=None, to=None, nonce=None, domain=None):
+    """
+    Signs a vote for `proposal` or a delegation to `to` with `account`.
+
+    Args:
+        account (Account): The voter.
+        contract (Contract): The `DelegateVotingApp` the intent is for.
+        proposal (int): The proposal to vote for.
+        to (str): The delegate, instead of `proposal`.
+        nonce (int): The nonce to sign; defaults to the voter's current `nonces`.
+        domain (dict): The contract's `eip712_domain`, read from the contract if not given.
+
+    Returns:
+        Intent: The signed intent.
+
+    Raises:
+        ValueError: Unless exactly one of `proposal` and `to` is given.
+    """
+    if (proposal is None) == (to is None):
+        raise ValueError("sign either a vote (proposal) or a delegation (to)")
+    if nonce is None:
+        nonce = contract.nonces(account.address)
+    unsigned = Intent(
+        voter=account.address,
+        is_delegation=to is not None,
+        proposal=proposal or 0,
+        to=ZERO_ADDRESS if to is None else to_checksum_address(str(getattr(to, "address", to))),
+        nonce=nonce,
+    )
+    message = encode_typed_data(full_message=typed_data(domain or eip712_domain(contract), unsigned))
+    signature = account.sign_message(message)
+    return replace(unsigned, v=signature.v, r=signature.r.rjust(32, b"\x00"), s=signature.s.rjust(32, b"\x00"))
+
+
+def recover_signer(domain, intent):
+    """
+    Returns the address that signed `intent` for the contract of the EIP-712 `domain`.
+    """
+    message = encode_typed_data(full_message=typed_data(domain, intent))
+    return Account.recover_message(message, vrs=(intent.v, intent.r, intent.s))
+
+
+def intent_gas(intent):
+    """
+    Returns the gas budgeted for one intent in a `relayBatch` call.
+    """
+    return GAS_PER_RELAYED_DELEGATION if intent.is_delegation else GAS_PER_RELAYED_VOTE
+
+
+@dataclass
+class RelayResult:
+    """
+    The outcome of `Relayer.submit`.
+
+    Attributes:
+        receipts (list): The receipts of the `relayBatch` transactions sent.
+        relayed (list): The intents applied on chain.
+        rejected (list): The intents dropped because they revert on their own.
+    """
+
+    receipts: list = field(default_factory=list)
+    relayed: list = field(default_factory=list)
+    rejected: list = field(default_factory=list)
+
+
+class Relayer:
+    """
+    Collects signed intents and submits them through `relayBatch`, batched by a gas budget.
+
+    Each batch is simulated with a gas estimate before it is sent. A batch that would revert,
+    or whose estimate exceeds the gas budget, is split in half and each half is handled the
+    same way, one after the other. A single invalid intent is thus isolated in a logarithmic
+    number of calls while the valid ones are still relayed, and delegations down long chains
+    end up in smaller batches than the flat per-intent budget suggests. A single intent that
+    alone exceeds the budget is still relayed on its own.
+
+    Args:
+        contract (Contract): The `DelegateVotingApp` to relay to.
+        sender (Account): The account that pays for the relay transactions.
+        gas_budget (int): The gas a batch may use. Defaults to a share of the latest block's gas limit.
+        max_batch_size (int): The most intents per batch, at most `MAX_RELAY_BATCH_SIZE`.
+    """
+
+    def __init__(self, contract, sender, gas_budget=None, max_batch_size=MAX_RELAY_BATCH_SIZE):
+        if not 1 <= max_batch_size <= MAX_RELAY_BATCH_SIZE:
+            raise ValueError(f"max_batch_size must be between 1 and {MAX_RELAY_BATCH_SIZE}")
+        if gas_budget is None:
+            gas_budget = int(contract.chain_manager.blocks.head.gas_limit * GAS_LIMIT_MARGIN)
+        if gas_budget < RELAY_BASE_GAS + GAS_PER_RELAYED_DELEGATION:
+            raise ValueError(f"gas budget {gas_budget} is too low for a relay batch")
+        self.contract = contract
+        self.sender = sender
+        self.gas_budget = gas_budget
+        self.max_batch_size = max_batch_size
+        self.domain = eip712_domain(contract)
+        self.pending = []
+
+    def add(self, intent):
+        """
+        Queues a signed intent.
+
+        Raises:
+            ValueError: If the intent is not signed by its voter for this contract.
+        """
+        if recover_signer(self.domain, intent) != intent.voter:
+            raise ValueError(f"intent of {intent.voter} is not signed by the voter")
+        self.pending.append(intent)
+
+    def batches(self):
+        """
+        Splits the pending intents into batches that fit the gas budget by the per-intent estimates `intent_gas`, in the order they were added. `submit` splits a batch further if its actual gas estimate is higher.
+
+        Returns:
+            list: The batches, each a list of intents.
+        """
+        batches, batch, gas = [], [], RELAY_BASE_GAS
+        for intent in self.pending:
+            if batch and (gas + intent_gas(intent) > self.gas_budget or len(batch) == self.max_batch_size):
+                batches.append(batch)
+                batch, gas = [], RELAY_BASE_GAS
+            batch.append(intent)
+            gas += intent_gas(intent)
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def submit(self):
+        """
+        Relays every pending intent and clears the queue.
+
+        Returns:
+            RelayResult: The receipts and which intents were relayed or rejected.
+        """
+        result = RelayResult()
+        for batch in self.batches():
+            self._relay(batch, result)
+        self.pending = []
+        return result
+
+    def _relay(self, intents, result):
+        calldata = [intent.as_tuple() for intent in intents]
+        try:
+            fits = self.contract.relayBatch.estimate_gas_cost(calldata, sender=self.sender) <= self.gas_budget
+        except ContractLogicError:
+            if len(intents) == 1:
+                result.rejected += intents
+                return
+            fits = False
+        if not fits and len(intents) > 1:
+            middle = len(intents) // 2
+            self._relay(intents[:middle], result)
+            self._relay(intents[middle:], result)
+            return
+        result.receipts.append(self.contract.relayBatch(calldata, sender=self.sender))
+        result.relayed += intents
@@ -0,0 +1,86 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from voting.batching import chunked
+
+# Mirror `MAX_PROPOSAL_PAGE_SIZE` and `MAX_VOTER_PAGE_SIZE` in the contracts.
+MAX_PROPOSAL_PAGE_SIZE = 100
+MAX_VOTER_PAGE_SIZE = 1000
+
+
+@dataclass
+class Snapshot:
+    """
+    The state of one election read at a single block.
+
+    Attributes:
+        block (int): The block the state was read at.
+        proposals (list): The `proposals(i)` structs in index order.
+        voters (dict): The `voters(address)` struct of each requested address.
+        winning_proposal (int): The result of `winningProposal()`.
+    """
+
+    block: int
+    proposals: list
+    voters: dict
+    winning_proposal: int
+
+
+def _map(function, items, max_workers):
+    if max_workers <= 1:
+        return [function(item) for item in items]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(function, items))
+
+
+def fetch_snapshot(contract, voters, proposal_page_size=MAX_PROPOSAL_PAGE_SIZE, voter_page_size=MAX_VOTER_PAGE_SIZE, max_workers=1):
+    """
+    Reads the proposals and the given voters of an election with the paginated `getProposals` and `getVoters` views.
+
+    All calls are pinned to the same block, so the snapshot is consistent even while
+    transactions land. A snapshot of `M` proposals and `N` voters takes
+    `ceil(M / proposal_page_size) + ceil(N / voter_page_size) + 2` contract calls, the two
+    extra ones being `amountProposals` and `winningProposal`, after one read of the block height.
+
+    Args:
+        contract (Contract): A deployed `VotingApp`, `DelegateVotingApp` or `PackedDelegateVotingApp`.
+        voters (Iterable): The voter addresses to read, e.g. from `voting.batching.read_voters` or an indexer.
+        proposal_page_size (int): Proposals per `getProposals` call.
+        voter_page_size (int): Voters per `getVoters` call.
+        max_workers (int): The number of pages fetched in parallel; 1 fetches them one by one.
+
+    Returns:
+        Snapshot: The election state.
+
+    Raises:
+        ValueError: If a page size is outside the bounds of the contract.
+    """
+    if not 1 <= proposal_page_size <= MAX_PROPOSAL_PAGE_SIZE:
+        raise ValueError(f"proposal_page_size must be between 1 and {MAX_PROPOSAL_PAGE_SIZE}")
+    if not 1 <= voter_page_size <= MAX_VOTER_PAGE_SIZE:
+        raise ValueError(f"voter_page_size must be between 1 and {MAX_VOTER_PAGE_SIZE}")
+
+    block = contract.chain_manager.blocks.height
+    amount = contract.amountProposals(block_identifier=block)
+    starts = range(0, amount, proposal_page_size)
+    proposal_pages = _map(
+        lambda start: contract.getProposals(start, proposal_page_size, block_identifier=block),
+        starts,
+        max_workers,
+    )
+    voter_batches = list(chunked(voters, voter_page_size))
+    voter_pages = _map(
+        lambda batch: contract.getVoters(batch, block_identifier=block),
+        voter_batches,
+        max_workers,
+    )
+    return Snapshot(
+        block=block,
+        proposals=[proposal for page in proposal_pages for proposal in page],
+        voters={
+            address: voter
+            for batch, page in zip(voter_batches, voter_pages)
+            for address, voter in zip(batch, page)
+        },
+        winning_proposal=contract.winningProposal(block_identifier=block),
+    )